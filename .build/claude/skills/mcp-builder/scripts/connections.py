@@ -1,13 +1,21 @@
 """Lightweight connection handling for MCP servers."""
 
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from contextlib import AsyncExitStack
-from typing import Any
+from contextlib import AsyncExitStack, asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable
 
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.sse import sse_client
 from mcp.client.stdio import stdio_client
 from mcp.client.streamable_http import streamablehttp_client
+from mcp.types import CallToolResult
+
+# Seconds the current task has spent waiting for a free pooled session.
+# Callers reset it before a call to find out how long that call queued.
+checkout_wait: ContextVar[float] = ContextVar("checkout_wait", default=0.0)
 
 
 class MCPConnection(ABC):
@@ -15,6 +23,7 @@ class MCPConnection(ABC):
 
     def __init__(self):
         self.session = None
+        self.server_info = None
         self._stack = None
 
     @abstractmethod
@@ -39,7 +48,8 @@ class MCPConnection(ABC):
 
             session_ctx = ClientSession(read, write)
             self.session = await self._stack.enter_async_context(session_ctx)
-            await self.session.initialize()
+            initialized = await self.session.initialize()
+            self.server_info = initialized.serverInfo
             return self
         except BaseException:
             await self._stack.__aexit__(None, None, None)
@@ -64,9 +74,13 @@ class MCPConnection(ABC):
             for tool in response.tools
         ]
 
+    async def call_tool_result(self, tool_name: str, arguments: dict[str, Any]) -> CallToolResult:
+        """Call a tool, returning the full result including its isError flag."""
+        return await self.session.call_tool(tool_name, arguments=arguments)
+
     async def call_tool(self, tool_name: str, arguments: dict[str, Any]) -> Any:
         """Call a tool on the MCP server with provided arguments."""
-        result = await self.session.call_tool(tool_name, arguments=arguments)
+        result = await self.call_tool_result(tool_name, arguments)
         return result.content
 
 
@@ -149,3 +163,231 @@ def create_connection(
 
     else:
         raise ValueError(f"Unsupported transport type: {transport}. Use 'stdio', 'sse', or 'http'")
+
+
+class _PoolSlot:
+    """One pooled connection, owned by its own task.
+
+    The transports open anyio task groups that must be closed by the task
+    that opened them, so each connection lives inside a dedicated task and
+    can be recycled from whichever task notices it is broken.
+    """
+
+    def __init__(self, factory: Callable[[], MCPConnection]):
+        self._factory = factory
+        self.connection: MCPConnection | None = None
+        self.last_used = 0.0
+        self.in_flight = 0  # shared calls currently using the connection
+        self.checked_out = False  # held through MCPConnectionPool.connection()
+        self.lock = asyncio.Lock()  # held while the connection is checked or recycled
+        self._task: asyncio.Task | None = None
+        self._stop: asyncio.Event | None = None
+
+    @property
+    def alive(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        ready = asyncio.get_running_loop().create_future()
+        self._stop = asyncio.Event()
+        self.connection = self._factory()
+        self._task = asyncio.create_task(self._run(self.connection, self._stop, ready))
+        await ready
+        self.last_used = time.monotonic()
+
+    @staticmethod
+    async def _run(connection: MCPConnection, stop: asyncio.Event, ready: asyncio.Future):
+        try:
+            async with connection:
+                ready.set_result(None)
+                await stop.wait()
+        except BaseException as e:
+            if not ready.done():
+                ready.set_exception(e)
+            elif not isinstance(e, Exception):
+                raise
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._stop.set()
+        try:
+            await self._task
+        except Exception:
+            pass  # a connection that died on its own has nothing left to close
+        self._task = None
+        self.connection = None
+
+
+class MCPConnectionPool:
+    """Pool of initialized MCP connections built with create_connection.
+
+    Keeps `size` sessions open (one server process each for stdio). An MCP
+    session multiplexes requests, so `call_tool` and `shared()` send each
+    call to the least busy session with several calls in flight per
+    session; `connection()` checks a session out exclusively instead, for
+    callers that need one to themselves. The pool can stand in for a single
+    MCPConnection.
+
+    When a call through a session raises, the session is pinged and
+    replaced if the ping fails. Sessions idle longer than `ping_after`
+    seconds are pinged before they are used.
+    """
+
+    def __init__(self, size: int, ping_after: float = 30.0, ping_timeout: float = 5.0, **connection_args):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        create_connection(**connection_args)  # validate arguments up front
+        self.size = size
+        self.ping_after = ping_after
+        self.ping_timeout = ping_timeout
+        self._connection_args = connection_args
+        self._slots = [_PoolSlot(lambda: create_connection(**connection_args)) for _ in range(size)]
+        self._idle: asyncio.Queue | None = None
+        self._next = 0
+        self._tools: list[dict[str, Any]] | None = None
+        self.stats = {"checkouts": 0, "waits": 0, "shared": 0, "recycled": 0}
+
+    async def __aenter__(self):
+        """Open all connections concurrently."""
+        results = await asyncio.gather(*(slot.start() for slot in self._slots), return_exceptions=True)
+        errors = [r for r in results if isinstance(r, BaseException)]
+        if errors:
+            await self._close_all()
+            raise errors[0]
+        self._idle = asyncio.Queue()
+        for slot in self._slots:
+            self._idle.put_nowait(slot)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Close every connection, checked out or not."""
+        await self._close_all()
+        self._idle = None
+
+    async def _close_all(self):
+        await asyncio.gather(*(slot.stop() for slot in self._slots))
+
+    async def _healthy(self, slot: _PoolSlot) -> bool:
+        if not slot.alive:
+            return False
+        try:
+            await asyncio.wait_for(slot.connection.session.send_ping(), self.ping_timeout)
+        except Exception:
+            return False
+        return True
+
+    async def _recycle(self, slot: _PoolSlot):
+        self.stats["recycled"] += 1
+        await slot.stop()
+        await slot.start()
+
+    async def _prepare(self, slot: _PoolSlot):
+        """Replace the slot's connection if it died or stopped answering while idle."""
+        async with slot.lock:
+            stale = time.monotonic() - slot.last_used > self.ping_after
+            if not slot.alive or (stale and not await self._healthy(slot)):
+                await self._recycle(slot)
+
+    async def _recover(self, slot: _PoolSlot):
+        """After a failed call, replace the connection if it no longer answers."""
+        # Tool failures come back as results, so an exception may mean a dead
+        # transport (a closed stdio pipe surfaces as McpError too). Calls that
+        # failed together recycle it once: later ones find it healthy again.
+        async with slot.lock:
+            if not await self._healthy(slot):
+                try:
+                    await self._recycle(slot)
+                except Exception:
+                    pass  # retried the next time the slot is used
+
+    @asynccontextmanager
+    async def _use(self, slot: _PoolSlot) -> AsyncIterator[MCPConnection]:
+        await self._prepare(slot)
+        try:
+            yield slot.connection
+        except Exception:
+            await self._recover(slot)
+            raise
+        finally:
+            slot.last_used = time.monotonic()
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[MCPConnection]:
+        """Check out a connection for exclusive use, returning it afterwards.
+
+        No shared call is sent to it while it is checked out, though shared
+        calls already running on it finish normally.
+        """
+        if self._idle is None:
+            raise RuntimeError("Pool is not open; use 'async with MCPConnectionPool(...)'")
+        self.stats["checkouts"] += 1
+        if self._idle.empty():
+            self.stats["waits"] += 1
+        wait_start = time.monotonic()
+        slot = await self._idle.get()
+        checkout_wait.set(checkout_wait.get() + time.monotonic() - wait_start)
+        slot.checked_out = True
+        try:
+            async with self._use(slot) as connection:
+                yield connection
+        finally:
+            slot.checked_out = False
+            self._idle.put_nowait(slot)
+
+    def _least_busy(self) -> _PoolSlot | None:
+        """The free slot with the fewest calls in flight, round-robin among equals."""
+        count = len(self._slots)
+        start, self._next = self._next, (self._next + 1) % count
+        rotated = (self._slots[(start + i) % count] for i in range(count))
+        free = [slot for slot in rotated if not slot.checked_out]
+        return min(free, key=lambda slot: slot.in_flight, default=None)
+
+    @asynccontextmanager
+    async def shared(self) -> AsyncIterator[MCPConnection]:
+        """A connection to send calls on alongside other callers.
+
+        Picks the session with the fewest calls in flight. Waits for an
+        exclusive checkout only if every session is checked out.
+        """
+        if self._idle is None:
+            raise RuntimeError("Pool is not open; use 'async with MCPConnectionPool(...)'")
+        slot = self._least_busy()
+        if slot is None:
+            async with self.connection() as connection:
+                yield connection
+            return
+        self.stats["shared"] += 1
+        slot.in_flight += 1
+        try:
+            async with self._use(slot) as connection:
+                yield connection
+        finally:
+            slot.in_flight -= 1
+
+    async def list_tools(self) -> list[dict[str, Any]]:
+        """Tools of the pooled server, fetched once and cached."""
+        if self._tools is None:
+            async with self.shared() as connection:
+                self._tools = await connection.list_tools()
+        return self._tools
+
+    @property
+    def server_info(self):
+        """Server name and version reported by the first pooled session."""
+        connection = self._slots[0].connection
+        return connection.server_info if connection else None
+
+    def invalidate_tools(self):
+        """Forget cached tools, e.g. after the server changed them."""
+        self._tools = None
+
+    async def call_tool_result(self, tool_name: str, arguments: dict[str, Any]) -> CallToolResult:
+        """Call a tool on the least busy connection, returning the full result."""
+        async with self.shared() as connection:
+            return await connection.call_tool_result(tool_name, arguments)
+
+    async def call_tool(self, tool_name: str, arguments: dict[str, Any]) -> Any:
+        """Call a tool on the least busy connection."""
+        result = await self.call_tool_result(tool_name, arguments)
+        return result.content
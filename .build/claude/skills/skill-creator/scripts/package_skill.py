@@ -2,27 +2,151 @@
 """
 Skill Packager - Creates a distributable zip file of a skill folder
 
+Archives are reproducible: entries are sorted and carry fixed timestamps and
+permissions, so the same skill tree always produces the same bytes. Caches
+(__pycache__, *.pyc, .DS_Store, ...) are left out and already-compressed
+media is stored as is. The archive comment records a hash of the skill
+tree; when it matches, the existing archive is kept instead of rebuilt.
+
 Usage:
     python utils/package_skill.py <path/to/skill-folder> [output-directory]
+    python utils/package_skill.py --all [ROOT ...] [-o output-directory] [-j JOBS]
 
 Example:
     python utils/package_skill.py skills/public/my-skill
     python utils/package_skill.py skills/public/my-skill ./dist
+    python utils/package_skill.py --all -o ./dist          # skills/ and document-skills/
 """
 
+import argparse
+import hashlib
+import os
+import stat
 import sys
 import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from quick_validate import validate_skill
 
+# Bump when the archive layout changes so existing archives are rebuilt
+PACKAGER_VERSION = 1
+
+# Roots searched by --all when none are given
+DEFAULT_ROOTS = ("skills", "document-skills")
+
+# Earliest timestamp a zip entry can hold
+FIXED_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+EXCLUDED_DIRS = {"__pycache__", ".git", ".pytest_cache", ".mypy_cache", ".ruff_cache", ".ipynb_checkpoints"}
+EXCLUDED_NAMES = {".DS_Store", "Thumbs.db"}
+EXCLUDED_SUFFIXES = {".pyc", ".pyo"}
+
+# Formats that are already compressed; deflating them again only costs time
+STORED_SUFFIXES = {
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".ico",
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".skill",
+    ".docx", ".xlsx", ".pptx", ".odt", ".ods", ".odp",
+    ".mp3", ".mp4", ".m4a", ".mov", ".webm", ".ogg",
+    ".woff", ".woff2",
+}
+
+TREE_HASH_PREFIX = b"skill-tree-sha256:"
+
+
+def collect_files(skill_path):
+    """
+    Read the files to package.
+
+    Returns:
+        Sorted list of (arcname, executable, data) tuples, arcnames relative
+        to the skill folder's parent
+    """
+    entries = []
+    for root, dirs, names in os.walk(skill_path):
+        dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
+        for name in names:
+            if name in EXCLUDED_NAMES or os.path.splitext(name)[1] in EXCLUDED_SUFFIXES:
+                continue
+            path = Path(root) / name
+            if not path.is_file():
+                continue
+            executable = bool(path.stat().st_mode & stat.S_IXUSR)
+            entries.append((path.relative_to(skill_path.parent).as_posix(), executable, path.read_bytes()))
+    entries.sort()
+    return entries
+
+
+def tree_hash(entries):
+    """Hash of everything that ends up in the archive."""
+    digest = hashlib.sha256(f"package_skill v{PACKAGER_VERSION}\n".encode())
+    for arcname, executable, data in entries:
+        digest.update(f"{arcname}\0{int(executable)}\0".encode())
+        digest.update(hashlib.sha256(data).digest())
+    return digest.hexdigest()
+
+
+def archive_tree_hash(zip_filename):
+    """The tree hash recorded in an existing archive, or None."""
+    try:
+        with zipfile.ZipFile(zip_filename) as zipf:
+            comment = zipf.comment
+    except (OSError, zipfile.BadZipFile):
+        return None
+    if comment.startswith(TREE_HASH_PREFIX):
+        return comment[len(TREE_HASH_PREFIX):].decode("ascii", "replace")
+    return None
+
+
+def write_archive(zip_filename, entries, digest, verbose=False):
+    """Write entries to zip_filename atomically; returns the number stored uncompressed."""
+    stored = 0
+    tmp_filename = zip_filename.with_name(zip_filename.name + ".tmp")
+    try:
+        with zipfile.ZipFile(tmp_filename, "w") as zipf:
+            zipf.comment = TREE_HASH_PREFIX + digest.encode("ascii")
+            for arcname, executable, data in entries:
+                info = zipfile.ZipInfo(arcname, date_time=FIXED_DATE_TIME)
+                info.create_system = 3  # Unix, so permissions are kept everywhere
+                info.external_attr = (0o100755 if executable else 0o100644) << 16
+                if os.path.splitext(arcname)[1].lower() in STORED_SUFFIXES:
+                    info.compress_type = zipfile.ZIP_STORED
+                    stored += 1
+                else:
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                zipf.writestr(info, data)
+                if verbose:
+                    print(f"  Added: {arcname}")
+        os.replace(tmp_filename, zip_filename)
+    finally:
+        if tmp_filename.exists():
+            tmp_filename.unlink()
+    return stored
+
+
+def build_archive(skill_path, zip_filename, force=False, verbose=False):
+    """
+    Package skill_path into zip_filename unless it is already up to date.
+
+    Returns:
+        Tuple of (rebuilt, file_count, stored_count)
+    """
+    entries = collect_files(skill_path)
+    digest = tree_hash(entries)
+    if not force and archive_tree_hash(zip_filename) == digest:
+        return (False, len(entries), 0)
+    stored = write_archive(zip_filename, entries, digest, verbose=verbose)
+    return (True, len(entries), stored)
 
-def package_skill(skill_path, output_dir=None):
+
+def package_skill(skill_path, output_dir=None, force=False, verbose=False):
     """
     Package a skill folder into a zip file.
 
     Args:
         skill_path: Path to the skill folder
         output_dir: Optional output directory for the zip file (defaults to current directory)
+        force: Rebuild even if the existing archive matches the skill tree
+        verbose: Print a line per file added
 
     Returns:
         Path to the created zip file, or None if error
@@ -65,40 +189,115 @@ def package_skill(skill_path, output_dir=None):
 
     # Create the zip file
     try:
-        with zipfile.ZipFile(zip_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # Walk through the skill directory
-            for file_path in skill_path.rglob('*'):
-                if file_path.is_file():
-                    # Calculate the relative path within the zip
-                    arcname = file_path.relative_to(skill_path.parent)
-                    zipf.write(file_path, arcname)
-                    print(f"  Added: {arcname}")
-
-        print(f"\n✅ Successfully packaged skill to: {zip_filename}")
-        return zip_filename
-
+        rebuilt, files, stored = build_archive(skill_path, zip_filename, force=force, verbose=verbose)
     except Exception as e:
         print(f"❌ Error creating zip file: {e}")
         return None
 
+    if rebuilt:
+        print(f"✅ Successfully packaged skill to: {zip_filename} ({files} files, {stored} stored uncompressed)")
+    else:
+        print(f"✅ Up to date: {zip_filename} ({files} files unchanged)")
+    return zip_filename
+
+
+def find_skills(roots):
+    """Skill folders (directories with a SKILL.md) under the given roots, sorted by name."""
+    skills = []
+    for root in roots:
+        for skill_md in Path(root).rglob("SKILL.md"):
+            if not EXCLUDED_DIRS.intersection(skill_md.parts) and skill_md.parent != Path(root):
+                skills.append(skill_md.parent.resolve())
+    return sorted(skills, key=lambda p: p.name)
+
+
+def _package_one(skill_path, output_path, force):
+    """Batch worker: returns (skill_name, status, detail) without printing."""
+    if not (skill_path / "SKILL.md").exists():
+        return (skill_path.name, "error", "SKILL.md not found")
+    valid, message = validate_skill(skill_path)
+    if not valid:
+        return (skill_path.name, "invalid", message)
+    try:
+        rebuilt, files, stored = build_archive(skill_path, output_path / f"{skill_path.name}.zip", force=force)
+    except Exception as e:
+        return (skill_path.name, "error", str(e))
+    if rebuilt:
+        return (skill_path.name, "built", f"{files} files, {stored} stored")
+    return (skill_path.name, "unchanged", f"{files} files")
+
+
+def package_all(roots, output_dir, force=False, jobs=None):
+    """
+    Package every skill under roots into output_dir, one archive per worker process.
+
+    Returns:
+        Dict mapping status ("built", "unchanged", "invalid", "error") to skill names
+    """
+    skills = find_skills(roots)
+    output_path = Path(output_dir).resolve()
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    seen = {}
+    for skill_path in skills:
+        if skill_path.name in seen:
+            raise ValueError(f"Two skills would both be packaged as {skill_path.name}.zip: "
+                             f"{seen[skill_path.name]} and {skill_path}")
+        seen[skill_path.name] = skill_path
+
+    results = {"built": [], "unchanged": [], "invalid": [], "error": []}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(_package_one, skill_path, output_path, force) for skill_path in skills]
+        for future in futures:
+            name, status, detail = future.result()
+            results[status].append(name)
+            icon = {"built": "📦", "unchanged": "✔ ", "invalid": "❌", "error": "❌"}[status]
+            print(f"{icon} {name}: {status} ({detail})")
+    return results
+
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python utils/package_skill.py <path/to/skill-folder> [output-directory]")
+    parser = argparse.ArgumentParser(description="Package skill folders into distributable zip files")
+    parser.add_argument("skill_path", nargs="?", help="Skill folder to package")
+    parser.add_argument("output_dir", nargs="?", help="Output directory (default: current directory)")
+    parser.add_argument("--all", nargs="*", metavar="ROOT", dest="roots",
+                        help=f"Package every skill under each ROOT (default: {' '.join(DEFAULT_ROOTS)})")
+    parser.add_argument("-o", "--output-dir", dest="output_option", metavar="DIR", help="Output directory (default: current directory, or ./dist with --all)")
+    parser.add_argument("-j", "--jobs", type=int, help="Worker processes for --all (default: one per CPU)")
+    parser.add_argument("-f", "--force", action="store_true", help="Rebuild archives even if they are up to date")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print every file added")
+    args = parser.parse_args()
+
+    if args.roots is not None:
+        roots = args.roots or [root for root in DEFAULT_ROOTS if Path(root).is_dir()]
+        output_dir = args.output_option or "dist"
+        print(f"📦 Packaging all skills in: {', '.join(roots)}")
+        print(f"   Output directory: {output_dir}\n")
+        try:
+            results = package_all(roots, output_dir, force=args.force, jobs=args.jobs)
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+        failed = len(results["invalid"]) + len(results["error"])
+        print(f"\n{len(results['built'])} built, {len(results['unchanged'])} unchanged, {failed} failed")
+        sys.exit(1 if failed else 0)
+
+    if not args.skill_path:
+        parser.print_usage()
         print("\nExample:")
         print("  python utils/package_skill.py skills/public/my-skill")
         print("  python utils/package_skill.py skills/public/my-skill ./dist")
+        print("  python utils/package_skill.py --all -o ./dist")
         sys.exit(1)
 
-    skill_path = sys.argv[1]
-    output_dir = sys.argv[2] if len(sys.argv) > 2 else None
+    output_dir = args.output_option or args.output_dir
 
-    print(f"📦 Packaging skill: {skill_path}")
+    print(f"📦 Packaging skill: {args.skill_path}")
     if output_dir:
         print(f"   Output directory: {output_dir}")
     print()
 
-    result = package_skill(skill_path, output_dir)
+    result = package_skill(args.skill_path, output_dir, force=args.force, verbose=args.verbose)
 
     if result:
         sys.exit(0)
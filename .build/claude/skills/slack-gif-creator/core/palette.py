@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Palette - Fast global palette construction and frame mapping.
+
+Builds one palette for a whole animation from a stratified pixel sample
+(every frame contributes equally), then maps frames to palette indices with a
+cached RGB lookup cube so the whole frame stack is quantized in a single
+vectorized pass. Frames stay as palette indices; converting back to RGB is
+only needed for display.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+import os
+
+import numpy as np
+from PIL import Image
+
+
+PALETTE_METHODS = ('median_cut', 'octree', 'kmeans')
+DITHER_MODES = ('none', 'ordered', 'floyd_steinberg')
+
+# 8x8 Bayer threshold matrix, normalized to [-0.5, 0.5)
+_BAYER_8 = np.array([
+    [0, 32, 8, 40, 2, 34, 10, 42],
+    [48, 16, 56, 24, 50, 18, 58, 26],
+    [12, 44, 4, 36, 14, 46, 6, 38],
+    [60, 28, 52, 20, 62, 30, 54, 22],
+    [3, 35, 11, 43, 1, 33, 9, 41],
+    [51, 19, 59, 27, 49, 17, 57, 25],
+    [15, 47, 7, 39, 13, 45, 5, 37],
+    [63, 31, 55, 23, 61, 29, 53, 21],
+], dtype=np.float32) / 64.0 - 0.5
+
+
+class Palette:
+    """
+    A fixed set of RGB colors with a cached RGB -> index lookup cube.
+
+    The cube has ``2**bits`` bins per channel; each bin stores the index of
+    the palette color nearest to the bin center, so mapping a pixel is a
+    single table lookup.
+    """
+
+    def __init__(self, colors: np.ndarray, bits: int = 5):
+        """
+        Initialize palette.
+
+        Args:
+            colors: (K, 3) array of RGB colors, K <= 256
+            bits: Lookup cube precision per channel (5 = 32x32x32 bins)
+        """
+        colors = np.asarray(colors, dtype=np.uint8).reshape(-1, 3)
+        if not 1 <= len(colors) <= 256:
+            raise ValueError(f"Palette must have 1-256 colors, got {len(colors)}")
+        self.colors = colors
+        self.bits = bits
+        self._cube: Optional[np.ndarray] = None
+        self._image: Optional[Image.Image] = None
+
+    def __len__(self) -> int:
+        return len(self.colors)
+
+    @property
+    def cube(self) -> np.ndarray:
+        """Lookup cube of shape (2**bits,) * 3 holding palette indices."""
+        if self._cube is None:
+            self._cube = _build_lookup_cube(self.colors, self.bits)
+        return self._cube
+
+    def to_image(self) -> Image.Image:
+        """Palette as a 'P' mode image, for use with PIL's quantize()."""
+        if self._image is None:
+            image = Image.new('P', (1, 1))
+            image.putpalette(self.colors.flatten().tolist())
+            self._image = image
+        return self._image
+
+    def map(self, frames: np.ndarray, dither: str = 'none', strength: float = 1.0) -> np.ndarray:
+        """
+        Map RGB pixels to palette indices via the lookup cube.
+
+        Args:
+            frames: RGB array of shape (..., H, W, 3), e.g. a whole (N, H, W, 3)
+                frame stack
+            dither: 'none' or 'ordered' (Bayer 8x8, vectorized)
+            strength: Ordered dither amplitude relative to palette spacing
+
+        Returns:
+            uint8 index array of shape (..., H, W)
+        """
+        frames = np.asarray(frames)
+        shift = 8 - self.bits
+
+        if dither == 'ordered':
+            height, width = frames.shape[-3:-1]
+            threshold = np.tile(_BAYER_8, (height // 8 + 1, width // 8 + 1))[:height, :width]
+            # Average spacing between palette colors along one channel
+            spread = 255.0 / max(1.0, len(self.colors) ** (1 / 3)) * strength
+            frames = frames.astype(np.float32) + (threshold * spread)[..., None]
+            frames = np.clip(frames, 0, 255).astype(np.uint8)
+        elif dither != 'none':
+            raise ValueError(f"Vectorized mapping supports 'none' or 'ordered' dither, got {dither!r}")
+
+        binned = frames >> shift
+        return self.cube[binned[..., 0], binned[..., 1], binned[..., 2]]
+
+    def to_rgb(self, indices: np.ndarray) -> np.ndarray:
+        """Convert palette indices back to RGB."""
+        return self.colors[indices]
+
+
+def _nearest(pixels: np.ndarray, colors: np.ndarray, chunk: int = 65536) -> np.ndarray:
+    """Index of the nearest color for each pixel (squared RGB distance)."""
+    pixels = pixels.astype(np.float32)
+    colors = colors.astype(np.float32)
+    color_norms = (colors ** 2).sum(axis=1)
+    result = np.empty(len(pixels), dtype=np.uint8)
+    for start in range(0, len(pixels), chunk):
+        block = pixels[start:start + chunk]
+        # |p - c|^2 = |p|^2 - 2 p.c + |c|^2; |p|^2 is constant per row
+        distances = color_norms[None, :] - 2.0 * block @ colors.T
+        result[start:start + chunk] = distances.argmin(axis=1)
+    return result
+
+
+def _build_lookup_cube(colors: np.ndarray, bits: int) -> np.ndarray:
+    """Precompute the nearest palette index for every cube bin center."""
+    size = 1 << bits
+    step = 256 // size
+    centers = np.arange(size, dtype=np.float32) * step + (step - 1) / 2
+    r, g, b = np.meshgrid(centers, centers, centers, indexing='ij')
+    grid = np.stack([r.ravel(), g.ravel(), b.ravel()], axis=1)
+    return _nearest(grid, colors).reshape(size, size, size)
+
+
+def stratified_sample(frames: np.ndarray | list[np.ndarray], sample_size: int = 65536,
+                      seed: int = 0) -> np.ndarray:
+    """
+    Sample pixels evenly across all frames.
+
+    Every frame contributes the same number of randomly positioned pixels, so
+    colors that appear only late in an animation still reach the palette.
+
+    Args:
+        frames: (N, H, W, 3) array or list of (H, W, 3) RGB frames
+        sample_size: Total number of pixels to sample
+        seed: Random seed
+
+    Returns:
+        (M, 3) uint8 array of sampled pixels
+    """
+    rng = np.random.default_rng(seed)
+    per_frame = max(1, sample_size // max(1, len(frames)))
+    samples = []
+    for frame in frames:
+        pixels = np.asarray(frame).reshape(-1, 3)
+        if len(pixels) <= per_frame:
+            samples.append(pixels)
+        else:
+            samples.append(pixels[rng.choice(len(pixels), per_frame, replace=False)])
+    return np.concatenate(samples).astype(np.uint8)
+
+
+def _pil_palette(pixels: np.ndarray, num_colors: int, method: int) -> np.ndarray:
+    """Run one of PIL's quantizers over sampled pixels and return its colors."""
+    total = len(pixels)
+    width = max(1, min(512, int(np.sqrt(total))))
+    height = (total + width - 1) // width
+    # Pad by repeating pixels rather than black so padding doesn't skew the palette
+    padded = np.resize(pixels, (width * height, 3)).reshape(height, width, 3)
+    quantized = Image.fromarray(padded.astype(np.uint8), mode='RGB').quantize(
+        colors=num_colors, method=method)
+    colors = np.array(quantized.getpalette(), dtype=np.uint8).reshape(-1, 3)
+    return colors[:num_colors]
+
+
+def _kmeans(pixels: np.ndarray, initial: np.ndarray, iterations: int = 8) -> np.ndarray:
+    """Refine palette colors with Lloyd's k-means over the sample."""
+    data = pixels.astype(np.float32)
+    centers = initial.astype(np.float32)
+    for _ in range(iterations):
+        labels = _nearest(data, centers)
+        counts = np.bincount(labels, minlength=len(centers))
+        sums = np.stack([np.bincount(labels, weights=data[:, c], minlength=len(centers))
+                         for c in range(3)], axis=1)
+        occupied = counts > 0
+        updated = centers.copy()
+        updated[occupied] = sums[occupied] / counts[occupied, None]
+        if np.allclose(updated, centers, atol=0.5):
+            centers = updated
+            break
+        centers = updated
+    return np.clip(np.rint(centers), 0, 255).astype(np.uint8)
+
+
+def build_palette(frames: np.ndarray | list[np.ndarray], num_colors: int = 128,
+                  method: str = 'median_cut', sample_size: int = 65536,
+                  pixels: Optional[np.ndarray] = None) -> Palette:
+    """
+    Build one global palette for a set of frames.
+
+    Args:
+        frames: (N, H, W, 3) array or list of RGB frames
+        num_colors: Target number of colors (2-256)
+        method: 'median_cut' (default), 'octree' (faster), or 'kmeans'
+            (octree seeds refined with k-means; slowest, best color fidelity)
+        sample_size: Pixels sampled across all frames
+        pixels: Pre-sampled (N, 3) pixels; skips sampling when given
+
+    Returns:
+        Palette
+    """
+    if method not in PALETTE_METHODS:
+        raise ValueError(f"Unknown palette method {method!r}. Use one of {PALETTE_METHODS}")
+    if pixels is None:
+        pixels = stratified_sample(frames, sample_size)
+
+    if method == 'median_cut':
+        colors = _pil_palette(pixels, num_colors, Image.Quantize.MEDIANCUT)
+    else:
+        colors = _pil_palette(pixels, num_colors, Image.Quantize.FASTOCTREE)
+        if method == 'kmeans':
+            colors = _kmeans(pixels, colors)
+
+    return Palette(colors)
+
+
+def _dither_frame(args: tuple[np.ndarray, bytes]) -> np.ndarray:
+    """Floyd-Steinberg dither one frame onto a palette (process-pool worker)."""
+    frame, palette_bytes = args
+    palette_image = Image.new('P', (1, 1))
+    palette_image.putpalette(palette_bytes)
+    quantized = Image.fromarray(frame).quantize(palette=palette_image,
+                                                dither=Image.Dither.FLOYDSTEINBERG)
+    return np.asarray(quantized)
+
+
+def dither_frames(frames: np.ndarray | list[np.ndarray], palette: Palette,
+                  workers: Optional[int] = None) -> np.ndarray:
+    """
+    Floyd-Steinberg dither frames onto a palette, optionally in parallel.
+
+    Error diffusion is sequential within a frame, so frames are distributed
+    across a process pool instead.
+
+    Args:
+        frames: (N, H, W, 3) array or list of RGB frames
+        palette: Target palette
+        workers: Number of processes (None or 1 = in-process)
+
+    Returns:
+        (N, H, W) uint8 index array
+    """
+    palette_bytes = palette.colors.tobytes()
+    jobs = [(np.ascontiguousarray(frame, dtype=np.uint8), palette_bytes) for frame in frames]
+
+    if workers is None or workers <= 1 or len(jobs) < 2:
+        results = [_dither_frame(job) for job in jobs]
+    else:
+        workers = min(workers, len(jobs), os.cpu_count() or 1)
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_dither_frame, jobs, chunksize=chunksize))
+
+    return np.stack(results)
+
+
+def quantize_frames(frames: np.ndarray | list[np.ndarray], palette: Palette,
+                    dither: str = 'floyd_steinberg', workers: Optional[int] = None) -> np.ndarray:
+    """
+    Map a stack of RGB frames onto a palette.
+
+    Args:
+        frames: (N, H, W, 3) array or list of RGB frames
+        palette: Target palette
+        dither: 'none' or 'ordered' (vectorized lookup), or
+            'floyd_steinberg' (error diffusion, per frame)
+        workers: Process count for Floyd-Steinberg dithering
+
+    Returns:
+        (N, H, W) uint8 index array
+    """
+    if dither not in DITHER_MODES:
+        raise ValueError(f"Unknown dither mode {dither!r}. Use one of {DITHER_MODES}")
+    if dither == 'floyd_steinberg':
+        return dither_frames(frames, palette, workers=workers)
+    return palette.map(np.asarray(frames), dither=dither)
@@ -6,12 +6,14 @@ Creates horizontal and vertical flips with perspective.
 """
 
 import sys
+from typing import Optional
 from pathlib import Path
 import math
 
 sys.path.append(str(Path(__file__).parent.parent))
 
 from PIL import Image
+from core.frame_scheduler import render_frames
 from core.gif_builder import GIFBuilder
 from core.frame_composer import create_blank_frame, draw_emoji_enhanced
 from core.easing import interpolate
@@ -27,7 +29,8 @@ def create_flip_animation(
     center_pos: tuple[int, int] = (240, 240),
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    workers: Optional[int] = None
 ) -> list[Image.Image]:
     """
     Create 3D-style flip animation.
@@ -43,16 +46,15 @@ def create_flip_animation(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
+        workers: Worker processes for parallel rendering (None = serial, 0 = one per CPU)
 
     Returns:
         List of frames
     """
-    frames = []
-
     if object2_data is None:
         object2_data = object1_data
 
-    for i in range(num_frames):
+    def render_frame(i: int) -> Image.Image:
         t = i / (num_frames - 1) if num_frames > 1 else 0
         frame = create_blank_frame(frame_width, frame_height, bg_color)
 
@@ -71,8 +73,7 @@ def create_flip_animation(
 
         # Don't draw when edge-on (very thin)
         if scale_factor < 0.05:
-            frames.append(frame)
-            continue
+            return frame
 
         if object_type == 'emoji':
             size = current_object['size']
@@ -187,9 +188,9 @@ def create_flip_animation(
             frame_rgba.paste(text_cropped, (paste_x, paste_y), text_cropped)
             frame = frame_rgba.convert('RGB')
 
-        frames.append(frame)
+        return frame
 
-    return frames
+    return render_frames(render_frame, num_frames, workers=workers)
 
 
 def create_quick_flip(
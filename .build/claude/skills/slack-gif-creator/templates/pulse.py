@@ -6,12 +6,14 @@ Creates pulsing, heartbeat, and throbbing effects.
 """
 
 import sys
+from typing import Optional
 from pathlib import Path
 import math
 
 sys.path.append(str(Path(__file__).parent.parent))
 
 from PIL import Image
+from core.frame_scheduler import render_frames
 from core.gif_builder import GIFBuilder
 from core.frame_composer import create_blank_frame, draw_emoji_enhanced, draw_circle
 from core.easing import interpolate
@@ -27,7 +29,8 @@ def create_pulse_animation(
     center_pos: tuple[int, int] = (240, 240),
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    workers: Optional[int] = None
 ) -> list[Image.Image]:
     """
     Create pulsing/scaling animation.
@@ -43,12 +46,11 @@ def create_pulse_animation(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
+        workers: Worker processes for parallel rendering (None = serial, 0 = one per CPU)
 
     Returns:
         List of frames
     """
-    frames = []
-
     # Default object data
     if object_data is None:
         if object_type == 'emoji':
@@ -58,7 +60,7 @@ def create_pulse_animation(
 
     min_scale, max_scale = scale_range
 
-    for i in range(num_frames):
+    def render_frame(i: int) -> Image.Image:
         frame = create_blank_frame(frame_width, frame_height, bg_color)
         t = i / (num_frames - 1) if num_frames > 1 else 0
 
@@ -148,9 +150,9 @@ def create_pulse_animation(
                 centered=True
             )
 
-        frames.append(frame)
+        return frame
 
-    return frames
+    return render_frames(render_frame, num_frames, workers=workers)
 
 
 def create_attention_pulse(
@@ -7,10 +7,13 @@ Use this for impact effects, emphasis, or nervous/excited reactions.
 
 import sys
 import math
+from typing import Optional
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
 
+from PIL import Image
+from core.frame_scheduler import render_frames
 from core.gif_builder import GIFBuilder
 from core.frame_composer import create_blank_frame, draw_circle, draw_emoji, draw_text
 from core.easing import ease_out_quad
@@ -26,7 +29,8 @@ def create_shake_animation(
     direction: str = 'horizontal',  # 'horizontal', 'vertical', or 'both'
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    workers: Optional[int] = None
 ) -> list:
     """
     Create frames for a shaking animation.
@@ -42,12 +46,11 @@ def create_shake_animation(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
+        workers: Worker processes for parallel rendering (None = serial, 0 = one per CPU)
 
     Returns:
         List of frames
     """
-    frames = []
-
     # Default object data
     if object_data is None:
         if object_type == 'emoji':
@@ -55,7 +58,7 @@ def create_shake_animation(
         elif object_type == 'text':
             object_data = {'text': 'SHAKE!', 'font_size': 50, 'color': (255, 0, 0)}
 
-    for i in range(num_frames):
+    def render_frame(i: int) -> Image.Image:
         frame = create_blank_frame(frame_width, frame_height, bg_color)
 
         # Calculate progress
@@ -104,9 +107,9 @@ def create_shake_animation(
                 fill_color=object_data.get('color', (100, 100, 255))
             )
 
-        frames.append(frame)
+        return frame
 
-    return frames
+    return render_frames(render_frame, num_frames, workers=workers)
 
 
 # Example usage
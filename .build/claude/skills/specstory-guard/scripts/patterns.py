@@ -8,54 +8,67 @@ import re
 class SecretPattern:
     name: str
     regex: re.Pattern[str]
+    # Literals every match starts with (compared case-insensitively when the
+    # regex is). Files containing none of them skip the pattern entirely.
+    anchors: tuple[str, ...] = ()
 
 
 PATTERNS = [
     SecretPattern(
         name="private-key-block",
         regex=re.compile(r"-----BEGIN (?:RSA|EC|DSA|OPENSSH|PRIVATE) KEY-----"),
+        anchors=("-----BEGIN ",),
     ),
     SecretPattern(
         name="aws-access-key-id",
         regex=re.compile(r"\b(AKIA|ASIA)[0-9A-Z]{16}\b"),
+        anchors=("AKIA", "ASIA"),
     ),
     SecretPattern(
         name="aws-secret-access-key",
         regex=re.compile(
             r"(?i)\baws_secret_access_key\b\s*[:=]\s*['\"]?[A-Za-z0-9/+=]{40}"
         ),
+        anchors=("aws_secret_access_key",),
     ),
     SecretPattern(
         name="github-token",
         regex=re.compile(r"\bgh[pousr]_[A-Za-z0-9]{36}\b"),
+        anchors=("ghp_", "gho_", "ghu_", "ghs_", "ghr_"),
     ),
     SecretPattern(
         name="gitlab-token",
         regex=re.compile(r"\bglpat-[0-9A-Za-z\-_]{20,}\b"),
+        anchors=("glpat-",),
     ),
     SecretPattern(
         name="slack-token",
         regex=re.compile(r"\bxox[baprs]-[0-9A-Za-z-]{10,}\b"),
+        anchors=("xox",),
     ),
     SecretPattern(
         name="google-api-key",
         regex=re.compile(r"\bAIza[0-9A-Za-z\-_]{35}\b"),
+        anchors=("AIza",),
     ),
     SecretPattern(
         name="stripe-live-key",
         regex=re.compile(r"\bsk_live_[0-9a-zA-Z]{24}\b"),
+        anchors=("sk_live_",),
     ),
     SecretPattern(
         name="jwt",
         regex=re.compile(
             r"\beyJ[A-Za-z0-9_-]{10,}\.[A-Za-z0-9_-]{10,}\.[A-Za-z0-9_-]{10,}\b"
         ),
+        anchors=("eyJ",),
     ),
     SecretPattern(
         name="generic-credential-assignment",
         regex=re.compile(
             r"(?i)\b(api[_-]?key|secret|token|password)\b\s*[:=]\s*['\"]?[A-Za-z0-9_\-\/+=]{16,}"
         ),
+        anchors=("api", "secret", "token", "password"),
     ),
 ]
 
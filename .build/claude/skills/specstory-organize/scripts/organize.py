@@ -6,11 +6,23 @@ Organize SpecStory history files into YYYY/MM subdirectories.
 Moves .md files from .specstory/history/ into .specstory/history/YYYY/MM/
 based on the timestamp in the filename (not the file's modification time).
 
+The directory is scanned once and the full move plan is computed up front.
+Before anything is moved, the plan is written to a journal in the history
+directory. If a run is interrupted, the journal lets the next run resume
+the remaining moves (--resume) or put every file back (--rollback).
+
+Usage:
+    organize.py [--dry-run|-n] [--verbose|-v]
+    organize.py --resume
+    organize.py --rollback
+
 Compatible with Python 2.7+ and Python 3.x
 """
 
 from __future__ import print_function
 
+import errno
+import json
 import os
 import re
 import shutil
@@ -22,6 +34,14 @@ import sys
 #   2025-10-15_02-58-52Z.md
 DATE_PATTERN = re.compile(r'^(\d{4})-(\d{2})-\d{2}_')
 
+# Journal of the move in progress, kept in the history directory
+JOURNAL_NAME = '.organize-journal.json'
+JOURNAL_VERSION = 1
+
+# os.replace overwrites atomically on every platform (Python 3.3+); on
+# Python 2 os.rename does the same on POSIX
+_replace = getattr(os, 'replace', os.rename)
+
 
 def find_specstory_history():
     """
@@ -45,92 +65,277 @@ def extract_year_month(filename):
     return None
 
 
-def organize_history(history_dir, dry_run=False):
+def iter_files(history_dir):
     """
-    Organize .md files in history_dir into YYYY/MM subdirectories.
+    Yield names of the regular files directly in history_dir.
 
-    Args:
-        history_dir: Path to the .specstory/history directory
-        dry_run: If True, only print what would be done without moving files
+    Uses a single os.scandir pass where available, so no per-file stat
+    call is needed; falls back to listdir on Python 2.
+    """
+    scandir = getattr(os, 'scandir', None)
+    if scandir is not None:
+        for entry in scandir(history_dir):
+            if not entry.is_dir():
+                yield entry.name
+        return
+    for name in os.listdir(history_dir):
+        if not os.path.isdir(os.path.join(history_dir, name)):
+            yield name
+
+
+def plan_moves(history_dir):
+    """
+    Compute the full move plan for history_dir.
 
     Returns:
-        Tuple of (moved_count, skipped_count, error_count)
+        Tuple of (moves, skipped) where moves is a sorted list of
+        (filename, 'YYYY/MM') pairs and skipped is a list of
+        (filename, reason) pairs
     """
-    moved = 0
-    skipped = 0
-    errors = 0
+    moves = []
+    skipped = []
+    for name in iter_files(history_dir):
+        if name == JOURNAL_NAME:
+            continue
+        if not name.endswith('.md'):
+            skipped.append((name, 'non-.md file'))
+            continue
+        date_parts = extract_year_month(name)
+        if date_parts is None:
+            skipped.append((name, 'file without valid timestamp'))
+            continue
+        moves.append((name, '%s/%s' % date_parts))
+    moves.sort()
+    skipped.sort()
+    return (moves, skipped)
+
+
+def count_by_month(moves):
+    """Number of planned moves per 'YYYY/MM' folder."""
+    counts = {}
+    for _, folder in moves:
+        counts[folder] = counts.get(folder, 0) + 1
+    return counts
+
+
+def journal_path(history_dir):
+    return os.path.join(history_dir, JOURNAL_NAME)
+
+
+def write_journal(history_dir, moves, created_dirs):
+    """Durably record the plan before the first file is moved."""
+    path = journal_path(history_dir)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as handle:
+        json.dump({
+            'version': JOURNAL_VERSION,
+            'created_dirs': created_dirs,
+            'moves': moves,
+        }, handle)
+        handle.flush()
+        os.fsync(handle.fileno())
+    _replace(tmp_path, path)
+
 
-    # Get list of files in history directory (not subdirectories)
+def read_journal(history_dir):
+    """
+    Load the journal of an interrupted run.
+    Returns the journal dict, or None if there is none.
+    """
+    path = journal_path(history_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path) as handle:
+        journal = json.load(handle)
+    if journal.get('version') != JOURNAL_VERSION:
+        raise ValueError('unsupported journal version: %r' % journal.get('version'))
+    return journal
+
+
+def remove_journal(history_dir):
     try:
-        entries = os.listdir(history_dir)
+        os.remove(journal_path(history_dir))
     except OSError as e:
-        print("Error listing directory: %s" % e)
-        return (0, 0, 1)
+        if e.errno != errno.ENOENT:
+            raise
 
-    for entry in entries:
-        entry_path = os.path.join(history_dir, entry)
 
-        # Skip directories
-        if os.path.isdir(entry_path):
-            continue
+def move_file(src, dest):
+    """Rename src over dest, copying only if they are on different filesystems."""
+    try:
+        _replace(src, dest)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        if os.path.exists(dest):
+            os.remove(dest)
+        shutil.move(src, dest)
 
-        # Skip non-.md files
-        if not entry.endswith('.md'):
-            print("Skipping non-.md file: %s" % entry)
-            skipped += 1
-            continue
 
-        # Extract year and month from filename
-        date_parts = extract_year_month(entry)
-        if date_parts is None:
-            print("Skipping file without valid timestamp: %s" % entry)
-            skipped += 1
+def make_dirs(history_dir, moves):
+    """
+    Create every target directory the plan needs.
+    Returns the directories that did not exist yet, parents first.
+    """
+    created = []
+    folders = sorted(set(folder for _, folder in moves))
+    for year in sorted(set(folder.split('/')[0] for folder in folders)):
+        year_dir = os.path.join(history_dir, year)
+        if not os.path.isdir(year_dir):
+            os.mkdir(year_dir)
+            created.append(year)
+    for folder in folders:
+        month_dir = os.path.join(history_dir, *folder.split('/'))
+        if not os.path.isdir(month_dir):
+            os.mkdir(month_dir)
+            created.append(folder)
+    return created
+
+
+def apply_moves(history_dir, moves, verbose=False):
+    """
+    Move each planned file that is still in history_dir.
+
+    Files already at their destination (from an interrupted run) are
+    counted as moved. Existing destination files are overwritten.
+
+    Returns:
+        Tuple of (moved_count, error_count)
+    """
+    moved = 0
+    errors = 0
+    for name, folder in moves:
+        src = os.path.join(history_dir, name)
+        dest = os.path.join(history_dir, folder, name)
+        try:
+            move_file(src, dest)
+        except OSError as e:
+            if e.errno == errno.ENOENT and os.path.exists(dest):
+                moved += 1
+                continue
+            print("Error moving %s: %s" % (name, e))
+            errors += 1
             continue
+        if verbose:
+            print("Moved: %s -> %s/" % (name, folder))
+        moved += 1
+    return (moved, errors)
 
-        year, month = date_parts
 
-        # Build destination directory path
-        dest_dir = os.path.join(history_dir, year, month)
-        dest_path = os.path.join(dest_dir, entry)
+def organize_history(history_dir, dry_run=False, verbose=False):
+    """
+    Organize .md files in history_dir into YYYY/MM subdirectories.
 
-        if dry_run:
-            print("Would move: %s -> %s/%s/" % (entry, year, month))
-            moved += 1
-            continue
+    Args:
+        history_dir: Path to the .specstory/history directory
+        dry_run: If True, only report what would be done without moving files
+        verbose: If True, print a line per file
 
-        try:
-            # Create year directory if needed
-            year_dir = os.path.join(history_dir, year)
-            if not os.path.exists(year_dir):
-                os.mkdir(year_dir)
+    Returns:
+        Tuple of (moved_count, skipped_count, error_count, counts_by_month)
+    """
+    try:
+        moves, skipped = plan_moves(history_dir)
+    except OSError as e:
+        print("Error listing directory: %s" % e)
+        return (0, 0, 1, {})
+
+    if verbose:
+        for name, reason in skipped:
+            print("Skipping %s: %s" % (reason, name))
+
+    if dry_run:
+        if verbose:
+            for name, folder in moves:
+                print("Would move: %s -> %s/" % (name, folder))
+        return (len(moves), len(skipped), 0, count_by_month(moves))
+
+    if not moves:
+        return (0, len(skipped), 0, {})
 
-            # Create month directory if needed
-            if not os.path.exists(dest_dir):
-                os.mkdir(dest_dir)
+    try:
+        created_dirs = make_dirs(history_dir, moves)
+        write_journal(history_dir, moves, created_dirs)
+    except OSError as e:
+        print("Error preparing move: %s" % e)
+        return (0, len(skipped), 1, {})
+
+    moved, errors = apply_moves(history_dir, moves, verbose=verbose)
+    if not errors:
+        remove_journal(history_dir)
+    return (moved, len(skipped), errors, count_by_month(moves))
 
-            # Remove destination file if it exists (to allow overwrite)
-            if os.path.exists(dest_path):
-                os.remove(dest_path)
 
-            # Move the file
-            shutil.move(entry_path, dest_path)
-            print("Moved: %s -> %s/%s/" % (entry, year, month))
-            moved += 1
+def resume_history(history_dir, verbose=False):
+    """
+    Finish the moves of an interrupted run.
+
+    Returns:
+        Tuple of (moved_count, error_count), or None if there is no journal
+    """
+    journal = read_journal(history_dir)
+    if journal is None:
+        return None
+    moves = [tuple(move) for move in journal['moves']]
+    make_dirs(history_dir, moves)
+    moved, errors = apply_moves(history_dir, moves, verbose=verbose)
+    if not errors:
+        remove_journal(history_dir)
+    return (moved, errors)
+
+
+def rollback_history(history_dir, verbose=False):
+    """
+    Move files of an interrupted run back to history_dir and remove the
+    directories it created (if empty). Files that replaced an existing
+    destination cannot restore the replaced copy.
 
+    Returns:
+        Tuple of (restored_count, error_count), or None if there is no journal
+    """
+    journal = read_journal(history_dir)
+    if journal is None:
+        return None
+    restored = 0
+    errors = 0
+    for name, folder in journal['moves']:
+        src = os.path.join(history_dir, name)
+        dest = os.path.join(history_dir, folder, name)
+        if os.path.exists(src) or not os.path.exists(dest):
+            continue
+        try:
+            move_file(dest, src)
         except OSError as e:
-            print("Error moving %s: %s" % (entry, e))
-            errors += 1
-        except Exception as e:
-            print("Unexpected error moving %s: %s" % (entry, e))
+            print("Error restoring %s: %s" % (name, e))
             errors += 1
+            continue
+        if verbose:
+            print("Restored: %s/%s -> %s" % (folder, name, name))
+        restored += 1
 
-    return (moved, skipped, errors)
+    for folder in reversed(journal['created_dirs']):
+        try:
+            os.rmdir(os.path.join(history_dir, *folder.split('/')))
+        except OSError:
+            pass  # not empty: something else lives there now
+
+    if not errors:
+        remove_journal(history_dir)
+    return (restored, errors)
+
+
+def print_breakdown(counts):
+    for folder in sorted(counts, reverse=True):
+        print("  %s/: %d file%s" % (folder, counts[folder], '' if counts[folder] == 1 else 's'))
 
 
 def main():
     """Main entry point."""
-    # Check for --dry-run flag
-    dry_run = '--dry-run' in sys.argv or '-n' in sys.argv
+    args = sys.argv[1:]
+    dry_run = '--dry-run' in args or '-n' in args
+    verbose = '--verbose' in args or '-v' in args
+    resume = '--resume' in args
+    rollback = '--rollback' in args
 
     # Find the history directory
     history_dir = find_specstory_history()
@@ -142,16 +347,47 @@ def main():
         sys.exit(1)
 
     print("Organizing: %s" % history_dir)
+
+    try:
+        pending = read_journal(history_dir) is not None
+    except (OSError, ValueError) as e:
+        print("Error reading journal %s: %s" % (journal_path(history_dir), e))
+        sys.exit(1)
+
+    if resume or rollback:
+        if not pending:
+            print("Nothing to %s: no interrupted run found." % ('resume' if resume else 'roll back'))
+            return
+        if rollback:
+            done, errors = rollback_history(history_dir, verbose=verbose)
+            print("Rolled back: %d restored, %d errors" % (done, errors))
+        else:
+            done, errors = resume_history(history_dir, verbose=verbose)
+            print("Resumed: %d moved, %d errors" % (done, errors))
+        if errors > 0:
+            sys.exit(1)
+        return
+
+    if pending and not dry_run:
+        print("Error: a previous run was interrupted (%s)." % JOURNAL_NAME)
+        print("Run with --resume to finish it or --rollback to undo it.")
+        sys.exit(1)
+
     if dry_run:
         print("(Dry run - no files will be moved)")
     print("")
 
-    moved, skipped, errors = organize_history(history_dir, dry_run=dry_run)
+    moved, skipped, errors, counts = organize_history(history_dir, dry_run=dry_run, verbose=verbose)
 
-    print("")
-    print("Complete: %d moved, %d skipped, %d errors" % (moved, skipped, errors))
+    if verbose:
+        print("")
+    print("Complete: %d %s, %d skipped, %d errors" % (
+        moved, 'would move' if dry_run else 'moved', skipped, errors))
+    print_breakdown(counts)
 
     if errors > 0:
+        if os.path.exists(journal_path(history_dir)):
+            print("Journal kept at %s; run with --resume to retry." % journal_path(history_dir))
         sys.exit(1)
 
 
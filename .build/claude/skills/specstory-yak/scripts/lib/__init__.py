@@ -1,6 +1,6 @@
 """Specstory Yak Shave Analyzer library modules."""
 
-from .models import DomainShift, SessionAnalysis
+from .models import DomainShift, SessionAnalysis, SessionEvent
 from .parser import (
     parse_date_from_filename,
     extract_title_from_filename,
@@ -8,19 +8,34 @@ from .parser import (
     extract_messages,
     extract_file_refs,
     extract_tool_calls,
+    tokenize_session,
     summarize_message,
     detect_goal,
 )
 from .scoring import (
+    DomainClassifier,
+    DEFAULT_CLASSIFIER,
     infer_domain,
     detect_domain_shifts,
     compute_yak_shave_score,
+    session_features,
     analyze_session,
+    analyze_content,
+    analyze_events,
+    SessionTally,
 )
-from .report import format_report, get_score_quip, get_leaderboard_title
+from .analytics import (
+    score_matrix,
+    score_sessions,
+    aggregate_scores,
+    session_trends,
+)
+from .index import SessionIndex, default_index_path
+from .report import format_report, format_trends, get_score_quip, get_leaderboard_title
 from .utils import (
     find_specstory_path,
     get_git_author,
+    GitAuthorResolver,
     detect_platform,
     get_install_instructions,
 )
@@ -28,23 +43,39 @@ from .utils import (
 __all__ = [
     "DomainShift",
     "SessionAnalysis",
+    "SessionEvent",
     "parse_date_from_filename",
     "extract_title_from_filename",
     "extract_session_id",
     "extract_messages",
     "extract_file_refs",
     "extract_tool_calls",
+    "tokenize_session",
     "summarize_message",
     "detect_goal",
+    "DomainClassifier",
+    "DEFAULT_CLASSIFIER",
     "infer_domain",
     "detect_domain_shifts",
     "compute_yak_shave_score",
     "analyze_session",
+    "analyze_content",
+    "analyze_events",
+    "SessionTally",
+    "session_features",
+    "score_matrix",
+    "score_sessions",
+    "aggregate_scores",
+    "session_trends",
+    "SessionIndex",
+    "default_index_path",
     "format_report",
+    "format_trends",
     "get_score_quip",
     "get_leaderboard_title",
     "find_specstory_path",
     "get_git_author",
+    "GitAuthorResolver",
     "detect_platform",
     "get_install_instructions",
 ]
@@ -8,6 +8,11 @@ These validators help ensure your GIFs meet Slack's size and dimension constrain
 from pathlib import Path
 
 
+# Slack upload limits
+EMOJI_SIZE_LIMIT_KB = 64
+MESSAGE_SIZE_LIMIT_KB = 2048
+
+
 def check_slack_size(gif_path: str | Path, is_emoji: bool = True) -> tuple[bool, dict]:
     """
     Check if GIF meets Slack size limits.
@@ -28,7 +33,7 @@ def check_slack_size(gif_path: str | Path, is_emoji: bool = True) -> tuple[bool,
     size_kb = size_bytes / 1024
     size_mb = size_kb / 1024
 
-    limit_kb = 64 if is_emoji else 2048
+    limit_kb = EMOJI_SIZE_LIMIT_KB if is_emoji else MESSAGE_SIZE_LIMIT_KB
     limit_mb = limit_kb / 1024
 
     passes = size_kb <= limit_kb
@@ -149,24 +154,20 @@ def validate_gif(gif_path: str | Path, is_emoji: bool = True) -> tuple[bool, dic
             width, height = img.size
             dim_pass, dim_info = validate_dimensions(width, height, is_emoji)
 
-            # Count frames
+            # Count frames and sum their delays (frames may have different
+            # delays when identical frames were merged)
             frame_count = 0
+            total_ms = 0
             try:
                 while True:
                     img.seek(frame_count)
+                    total_ms += img.info.get('duration', 100)
                     frame_count += 1
             except EOFError:
                 pass
 
-            # Get duration if available
-            try:
-                duration_ms = img.info.get('duration', 100)
-                total_duration = (duration_ms * frame_count) / 1000
-                fps = frame_count / total_duration if total_duration > 0 else 0
-            except:
-                duration_ms = None
-                total_duration = None
-                fps = None
+            total_duration = total_ms / 1000
+            fps = frame_count / total_duration if total_duration > 0 else 0
 
     except Exception as e:
         return False, {'error': f'Failed to read GIF: {e}'}
@@ -228,6 +229,8 @@ def get_optimization_suggestions(results: dict) -> list[str]:
                 suggestions.append("  - Use fewer colors (128 → 64)")
                 suggestions.append("  - Reduce dimensions")
 
+            suggestions.append("  - Or let GIFBuilder.save_for_slack() search for settings that fit")
+
         # Dimension suggestions
         if not dim_info.get('optimal', True) and dim_info.get('type') == 'emoji':
             suggestions.append("For optimal emoji GIF:")
@@ -6,11 +6,14 @@ Use this to make objects bounce up and down or horizontally with realistic physi
 """
 
 import sys
+from typing import Optional
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
+from PIL import Image
+from core.frame_scheduler import render_frames
 from core.gif_builder import GIFBuilder
 from core.frame_composer import create_blank_frame, draw_circle, draw_emoji
 from core.easing import ease_out_bounce, interpolate
@@ -25,7 +28,8 @@ def create_bounce_animation(
     start_x: int = 240,
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    workers: Optional[int] = None
 ) -> list:
     """
     Create frames for a bouncing animation.
@@ -40,12 +44,11 @@ def create_bounce_animation(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
+        workers: Worker processes for parallel rendering (None = serial, 0 = one per CPU)
 
     Returns:
         List of frames
     """
-    frames = []
-
     # Default object data
     if object_data is None:
         if object_type == 'circle':
@@ -53,7 +56,7 @@ def create_bounce_animation(
         elif object_type == 'emoji':
             object_data = {'emoji': '⚽', 'size': 60}
 
-    for i in range(num_frames):
+    def render_frame(i: int) -> Image.Image:
         # Create blank frame
         frame = create_blank_frame(frame_width, frame_height, bg_color)
 
@@ -79,9 +82,9 @@ def create_bounce_animation(
                 size=object_data['size']
             )
 
-        frames.append(frame)
+        return frame
 
-    return frames
+    return render_frames(render_frame, num_frames, workers=workers)
 
 
 # Example usage
@@ -6,12 +6,14 @@ Creates smooth opacity transitions for appearing, disappearing, and transitionin
 """
 
 import sys
+from typing import Optional
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
 
 from PIL import Image, ImageDraw
 import numpy as np
+from core.frame_scheduler import render_frames
 from core.gif_builder import GIFBuilder
 from core.frame_composer import create_blank_frame, draw_emoji_enhanced
 from core.easing import interpolate
@@ -26,7 +28,8 @@ def create_fade_animation(
     center_pos: tuple[int, int] = (240, 240),
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    workers: Optional[int] = None
 ) -> list[Image.Image]:
     """
     Create fade animation.
@@ -41,18 +44,17 @@ def create_fade_animation(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
+        workers: Worker processes for parallel rendering (None = serial, 0 = one per CPU)
 
     Returns:
         List of frames
     """
-    frames = []
-
     # Default object data
     if object_data is None:
         if object_type == 'emoji':
             object_data = {'emoji': '✨', 'size': 100}
 
-    for i in range(num_frames):
+    def render_frame(i: int) -> Image.Image:
         t = i / (num_frames - 1) if num_frames > 1 else 0
 
         # Calculate opacity based on fade type
@@ -141,9 +143,9 @@ def create_fade_animation(
         else:
             frame = frame_bg
 
-        frames.append(frame)
+        return frame
 
-    return frames
+    return render_frames(render_frame, num_frames, workers=workers)
 
 
 def apply_opacity(image: Image.Image, opacity: float) -> Image.Image:
@@ -6,6 +6,7 @@ Apply kaleidoscope effects to frames or objects for psychedelic visuals.
 """
 
 import sys
+from typing import Optional
 from pathlib import Path
 import math
 
@@ -13,6 +14,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from PIL import Image, ImageOps, ImageDraw
 import numpy as np
+from core.frame_scheduler import render_frames
 
 
 def apply_kaleidoscope(frame: Image.Image, segments: int = 8,
@@ -143,7 +145,8 @@ def create_kaleidoscope_animation(
     segments: int = 8,
     rotation_speed: float = 1.0,
     width: int = 480,
-    height: int = 480
+    height: int = 480,
+    workers: Optional[int] = None
 ) -> list[Image.Image]:
     """
     Create animated kaleidoscope effect.
@@ -155,12 +158,11 @@ def create_kaleidoscope_animation(
         rotation_speed: How fast pattern rotates (0.5-2.0)
         width: Frame width if generating demo
         height: Frame height if generating demo
+        workers: Worker processes for parallel rendering (None = serial, 0 = one per CPU)
 
     Returns:
         List of frames with kaleidoscope effect
     """
-    frames = []
-
     # Create demo pattern if no base frame
     if base_frame is None:
         base_frame = Image.new('RGB', (width, height), (255, 255, 255))
@@ -178,7 +180,7 @@ def create_kaleidoscope_animation(
             draw.ellipse([x - 40, y - 40, x + 40, y + 40], fill=color)
 
     # Rotate base frame and apply kaleidoscope
-    for i in range(num_frames):
+    def render_frame(i: int) -> Image.Image:
         angle = (i / num_frames) * 360 * rotation_speed
 
         # Rotate base frame
@@ -187,9 +189,9 @@ def create_kaleidoscope_animation(
         # Apply kaleidoscope
         kaleido_frame = apply_kaleidoscope(rotated, segments=segments)
 
-        frames.append(kaleido_frame)
+        return kaleido_frame
 
-    return frames
+    return render_frames(render_frame, num_frames, workers=workers)
 
 
 # Example usage
@@ -6,11 +6,14 @@ Provides flexible movement primitives for objects along linear, arc, or custom p
 """
 
 import sys
+from typing import Optional
 from pathlib import Path
 import math
 
 sys.path.append(str(Path(__file__).parent.parent))
 
+from PIL import Image
+from core.frame_scheduler import render_frames
 from core.gif_builder import GIFBuilder
 from core.frame_composer import create_blank_frame, draw_circle, draw_emoji_enhanced
 from core.easing import interpolate, calculate_arc_motion
@@ -27,7 +30,8 @@ def create_move_animation(
     motion_params: dict | None = None,
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    workers: Optional[int] = None
 ) -> list:
     """
     Create frames showing object moving along a path.
@@ -44,12 +48,11 @@ def create_move_animation(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
+        workers: Worker processes for parallel rendering (None = serial, 0 = one per CPU)
 
     Returns:
         List of frames
     """
-    frames = []
-
     # Default object data
     if object_data is None:
         if object_type == 'circle':
@@ -61,7 +64,7 @@ def create_move_animation(
     if motion_params is None:
         motion_params = {}
 
-    for i in range(num_frames):
+    def render_frame(i: int) -> Image.Image:
         frame = create_blank_frame(frame_width, frame_height, bg_color)
 
         t = i / (num_frames - 1) if num_frames > 1 else 0
@@ -152,9 +155,9 @@ def create_move_animation(
                 shadow=object_data.get('shadow', True)
             )
 
-        frames.append(frame)
+        return frame
 
-    return frames
+    return render_frames(render_frame, num_frames, workers=workers)
 
 
 def create_path_from_points(points: list[tuple[int, int]],
@@ -6,12 +6,14 @@ Creates zoom in, zoom out, and dramatic scaling effects.
 """
 
 import sys
+from typing import Optional
 from pathlib import Path
 import math
 
 sys.path.append(str(Path(__file__).parent.parent))
 
 from PIL import Image, ImageFilter
+from core.frame_scheduler import render_frames
 from core.gif_builder import GIFBuilder
 from core.frame_composer import create_blank_frame, draw_emoji_enhanced
 from core.easing import interpolate
@@ -28,7 +30,8 @@ def create_zoom_animation(
     center_pos: tuple[int, int] = (240, 240),
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    workers: Optional[int] = None
 ) -> list[Image.Image]:
     """
     Create zoom animation.
@@ -45,12 +48,11 @@ def create_zoom_animation(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
+        workers: Worker processes for parallel rendering (None = serial, 0 = one per CPU)
 
     Returns:
         List of frames
     """
-    frames = []
-
     # Default object data
     if object_data is None:
         if object_type == 'emoji':
@@ -59,7 +61,7 @@ def create_zoom_animation(
     base_size = object_data.get('size', 100) if object_type == 'emoji' else object_data.get('font_size', 60)
     start_scale, end_scale = scale_range
 
-    for i in range(num_frames):
+    def render_frame(i: int) -> Image.Image:
         t = i / (num_frames - 1) if num_frames > 1 else 0
 
         # Calculate scale based on zoom type
@@ -143,9 +145,9 @@ def create_zoom_animation(
             top = (canvas_size - frame_height) // 2
             frame = text_canvas.crop((left, top, left + frame_width, top + frame_height))
 
-        frames.append(frame)
+        return frame
 
-    return frames
+    return render_frames(render_frame, num_frames, workers=workers)
 
 
 def create_explosion_zoom(
@@ -9,20 +9,25 @@ Usage:
     python parse_webfetch.py <file_or_glob_pattern> [...]
     python parse_webfetch.py .specstory/history/*.md
     python parse_webfetch.py .specstory/history/2026-01-22*.md
+    python parse_webfetch.py --ndjson --workers 0 .specstory/history/*.md
 
-Output: JSON array to stdout
+Output: JSON array to stdout, or one JSON object per line with --ndjson
 """
 
+import argparse
+import os
 import sys
 import re
 import json
 import glob
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Iterator, Optional
 from dataclasses import dataclass, asdict
 
-# Import the URL extraction helper
-from extract_urls_context import extract_url_from_context
+# Import the URL extraction helpers
+from extract_urls_context import UrlContext, choose_url
 
 
 @dataclass
@@ -63,83 +68,129 @@ WEBFETCH_START = re.compile(
 # End of tool-use block
 TOOLUSE_END = '</tool-use>'
 
+# Lines without any of these are plain text: no tags, message headers,
+# rules, URLs or code fences
+LINE_MARKERS = re.compile(r'<|_\*\*|://|---|```')
+
+
+def read_blocks(f, block_size: int = 1 << 20) -> Iterator[str]:
+    """Read text in blocks that end on a line boundary (except the last)."""
+    rest = ''
+    while True:
+        chunk = f.read(block_size)
+        if not chunk:
+            if rest:
+                yield rest
+            return
+        chunk = rest + chunk
+        cut = chunk.rfind('\n') + 1
+        if cut == 0:
+            # A single line longer than the block: keep reading
+            rest = chunk
+            continue
+        rest = chunk[cut:]
+        yield chunk[:cut]
+
 
 def parse_file(filepath: Path) -> Iterator[WebFetchResult]:
     """
     Parse a single SpecStory history file for WebFetch uses.
 
-    Uses line-by-line streaming to handle large files.
+    Streams the file in one pass: URL attribution state is updated
+    incrementally (see UrlContext), and only the result text of the current
+    WebFetch block is held in memory. Runs of lines without any marker are
+    handled in bulk rather than line by line.
     """
     try:
-        with open(filepath, 'r', encoding='utf-8', errors='replace') as f:
-            lines = f.readlines()
+        f = open(filepath, 'r', encoding='utf-8', errors='replace')
     except Exception as e:
         print(f"Warning: Could not read {filepath}: {e}", file=sys.stderr)
         return
 
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-
-        # Look for WebFetch block start
-        if WEBFETCH_START.search(line):
-            webfetch_start_line = i + 1  # 1-indexed for reporting
-
-            # Extract the content of this WebFetch block
-            content_lines = []
-            in_code_block = False
-            j = i + 1
-
-            while j < len(lines):
-                current_line = lines[j]
+    with f:
+        context = UrlContext()
+        block = None  # (start line, url candidates) of the open WebFetch block
+        content_lines: list[str] = []
+        in_code_block = False
+
+        for chunk in read_blocks(f):
+            pos = 0
+            size = len(chunk)
+            while pos < size:
+                marker = LINE_MARKERS.search(chunk, pos)
+                run_end = max(pos, chunk.rfind('\n', pos, marker.start()) + 1) if marker else size
+                if run_end > pos:
+                    run = chunk[pos:run_end]
+                    if block is not None and in_code_block:
+                        content_lines.append(run)
+                    context.feed_plain(run)
+                    pos = run_end
+                    continue
+
+                newline = chunk.find('\n', pos)
+                line_end = size if newline == -1 else newline + 1
+                line = chunk[pos:line_end]
+                pos = line_end
+
+                if block is not None:
+                    # Check for end of tool-use
+                    if TOOLUSE_END in line:
+                        yield build_result(filepath, block, content_lines)
+                        block = None
+                    else:
+                        # Track code blocks (where the result content is)
+                        if line.strip().startswith('```'):
+                            if in_code_block:
+                                in_code_block = False
+                            else:
+                                in_code_block = True
+                                context.feed(line)
+                                continue
 
-                # Check for end of tool-use
-                if TOOLUSE_END in current_line:
-                    break
+                        if in_code_block:
+                            content_lines.append(line)
 
-                # Track code blocks (where the result content is)
-                if current_line.strip().startswith('```'):
-                    if in_code_block:
-                        in_code_block = False
-                    else:
-                        in_code_block = True
-                        j += 1
-                        continue
+                # Look for WebFetch block start
+                elif WEBFETCH_START.search(line):
+                    # Attribution only looks at lines before the block (1-indexed for reporting)
+                    block = (context.line_count + 1, context.candidates())
+                    content_lines = []
+                    in_code_block = False
 
-                if in_code_block:
-                    content_lines.append(current_line)
+                context.feed(line)
 
-                j += 1
+        if block is not None:
+            yield build_result(filepath, block, content_lines)
 
-            # Process the extracted content
-            content = ''.join(content_lines).strip()
 
-            # Find the URL from context (pass content for result-based inference)
-            url, url_source = extract_url_from_context(lines, i, result_content=content)
+def build_result(filepath: Path, block: tuple, content_lines: list[str]) -> WebFetchResult:
+    """Turn a finished WebFetch block into a WebFetchResult."""
+    webfetch_start_line, (found, domain) = block
 
-            # Determine success/failure and extract error info
-            success, error, error_raw = analyze_result(content)
+    # Process the extracted content
+    content = ''.join(content_lines).strip()
 
-            # Generate summary for successful fetches
-            summary = None
-            if success and content:
-                summary = generate_summary(content)
+    # Find the URL from context (pass content for result-based inference)
+    url, url_source = choose_url(found, domain, result_content=content)
 
-            yield WebFetchResult(
-                url=url,
-                url_source=url_source,
-                success=success,
-                summary=summary,
-                error=error,
-                error_raw=error_raw if error else None,
-                line_number=webfetch_start_line,
-                file=str(filepath)
-            )
+    # Determine success/failure and extract error info
+    success, error, error_raw = analyze_result(content)
 
-            # Move past this block
-            i = j
+    # Generate summary for successful fetches
+    summary = None
+    if success and content:
+        summary = generate_summary(content)
 
-        i += 1
+    return WebFetchResult(
+        url=url,
+        url_source=url_source,
+        success=success,
+        summary=summary,
+        error=error,
+        error_raw=error_raw if error else None,
+        line_number=webfetch_start_line,
+        file=str(filepath)
+    )
 
 
 def analyze_result(content: str) -> tuple[bool, Optional[str], Optional[str]]:
@@ -238,14 +289,52 @@ def expand_paths(patterns: list[str]) -> list[Path]:
     return sorted(unique_files, key=lambda p: p.name)
 
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: python parse_webfetch.py <file_or_pattern> [...]", file=sys.stderr)
-        print("Example: python parse_webfetch.py .specstory/history/*.md", file=sys.stderr)
-        sys.exit(1)
+def parse_file_dicts(filepath: Path) -> list[dict]:
+    """All WebFetch results of one file as dicts (process pool worker)."""
+    return [asdict(result) for result in parse_file(filepath)]
 
-    patterns = sys.argv[1:]
-    files = expand_paths(patterns)
+
+def parse_files(files: list[Path], workers: int = 1) -> Iterator[dict]:
+    """
+    Yield WebFetch results for files in order, parsing up to ``workers`` files at once.
+
+    Only a few files' results are in flight at a time, so memory stays
+    bounded however many files are given.
+    """
+    if workers <= 1 or len(files) <= 1:
+        for filepath in files:
+            for result in parse_file(filepath):
+                yield asdict(result)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        queued = iter(files)
+        for filepath in queued:
+            pending.append(pool.submit(parse_file_dicts, filepath))
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            results = pending.popleft().result()
+            for filepath in queued:
+                pending.append(pool.submit(parse_file_dicts, filepath))
+                break
+            yield from results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Extract WebFetch tool uses from SpecStory history files.",
+        epilog="Example: python parse_webfetch.py .specstory/history/*.md",
+    )
+    parser.add_argument("patterns", nargs="+", help="History files or glob patterns")
+    parser.add_argument("--ndjson", action="store_true",
+                        help="Stream one JSON object per line instead of a JSON array")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Parse files in parallel processes (0 = one per CPU)")
+    args = parser.parse_args()
+
+    files = expand_paths(args.patterns)
 
     if not files:
         print("No files found matching the provided patterns.", file=sys.stderr)
@@ -253,15 +342,20 @@ def main():
 
     print(f"Processing {len(files)} file(s)...", file=sys.stderr)
 
-    results = []
-    for filepath in files:
-        for result in parse_file(filepath):
-            results.append(asdict(result))
-
-    # Output JSON to stdout
-    print(json.dumps(results, indent=2))
-
-    print(f"Found {len(results)} WebFetch instance(s).", file=sys.stderr)
+    workers = args.workers or os.cpu_count() or 1
+    results = parse_files(files, workers)
+    count = 0
+    if args.ndjson:
+        for result in results:
+            sys.stdout.write(json.dumps(result) + '\n')
+            count += 1
+    else:
+        results = list(results)
+        count = len(results)
+        # Output JSON to stdout
+        print(json.dumps(results, indent=2))
+
+    print(f"Found {count} WebFetch instance(s).", file=sys.stderr)
 
 
 if __name__ == '__main__':
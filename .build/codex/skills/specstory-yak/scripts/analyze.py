@@ -8,6 +8,7 @@ drifted off track from their original goal.
 
 import argparse
 import json
+import sqlite3
 import sys
 from dataclasses import asdict
 from datetime import datetime, timedelta
@@ -15,11 +16,15 @@ from pathlib import Path
 
 from lib import (
     SessionAnalysis,
+    SessionIndex,
+    default_index_path,
     parse_date_from_filename,
     analyze_session,
+    score_sessions,
+    session_trends,
     format_report,
     find_specstory_path,
-    get_git_author,
+    GitAuthorResolver,
     get_install_instructions,
 )
 
@@ -37,6 +42,10 @@ def main():
     parser.add_argument("--verbose", action="store_true", help="Show detailed analysis")
     parser.add_argument("--by-mtime", action="store_true", help="Filter by file modification time instead of filename date")
     parser.add_argument("-o", "--output", help="Write report to markdown file (e.g., yak-report.md)")
+    parser.add_argument("--index", help="Session index database (default: ~/.cache/specstory-yak/)")
+    parser.add_argument("--no-index", action="store_true", help="Re-analyze every session without the index")
+    parser.add_argument("--rebuild-index", action="store_true", help="Discard the session index and rebuild it")
+    parser.add_argument("--trends", action="store_true", help="Add per-week and per-author score trends")
 
     args = parser.parse_args()
 
@@ -61,6 +70,24 @@ def main():
     else:
         end_date = datetime.now()
 
+    # Open the session index; unchanged sessions are not re-read or re-parsed
+    index = None
+    author_cache = None
+    if not args.no_index:
+        index_path = Path(args.index) if args.index else default_index_path(history_path)
+        author_cache = index_path.with_name(index_path.stem + "-authors.json")
+        try:
+            if args.rebuild_index:
+                for stale in (index_path, author_cache):
+                    if stale.exists():
+                        stale.unlink()
+            index = SessionIndex(index_path)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Session index unavailable ({e}); analyzing without it", file=sys.stderr)
+
+    # One git log for all session authors, instead of a blame per file
+    authors = GitAuthorResolver(history_path, author_cache)
+
     # Find matching files
     analyses = []
     for filepath in sorted(history_path.glob("*.md")):
@@ -71,22 +98,43 @@ def main():
             file_date = parse_date_from_filename(filepath.name)
 
         if file_date and start_date <= file_date <= end_date:
-            analysis = analyze_session(filepath)
+            analysis = index.analyze(filepath) if index else analyze_session(filepath, score=False)
             if analysis:
-                # Get git author for this file
-                analysis.author = get_git_author(filepath)
+                # Get git author for this file (the index remembers known authors)
+                if analysis.author == "unknown":
+                    analysis.author = authors.author(filepath)
+                    if index:
+                        index.set_author(filepath, analysis.author)
                 analyses.append(analysis)
 
+    if index:
+        index.prune(history_path)
+        if args.verbose:
+            stats = index.stats
+            print(f"Session index: {stats['cached']} cached, {stats['rehashed']} rehashed, "
+                  f"{stats['parsed']} parsed ({index.db_path})", file=sys.stderr)
+        index.close()
+    if args.verbose:
+        print(f"Git authors: {authors.stats['batched']} from git log, "
+              f"{authors.stats['blamed']} from blame", file=sys.stderr)
+
+    # Score every session in one batch, then aggregate those scores
+    scores = score_sessions(analyses)
+    trends = session_trends(analyses, scores) if args.trends else None
+
     # Generate output
     if args.json:
-        output_content = json.dumps({
+        report = {
             "date_range": {"from": start_date.isoformat(), "to": end_date.isoformat()},
             "sessions_analyzed": len(analyses),
             "average_score": sum(a.yak_shave_score for a in analyses) / len(analyses) if analyses else 0,
             "sessions": [asdict(a) for a in sorted(analyses, key=lambda x: x.yak_shave_score, reverse=True)]
-        }, indent=2, default=str)
+        }
+        if trends:
+            report["trends"] = trends
+        output_content = json.dumps(report, indent=2, default=str)
     else:
-        output_content = format_report(analyses, args)
+        output_content = format_report(analyses, args, trends)
 
     # Write to file or stdout
     if args.output:
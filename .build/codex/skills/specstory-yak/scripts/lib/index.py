@@ -0,0 +1,227 @@
+"""SQLite index of analyzed specstory sessions."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from dataclasses import asdict
+from pathlib import Path
+from typing import Optional
+
+from .models import SessionAnalysis
+from .parser import (
+    extract_title_from_filename,
+    parse_date_from_filename,
+    tokenize_session,
+)
+from .scoring import SessionTally
+
+
+# Bump when parsing or scoring changes so stale analyses are recomputed
+INDEX_VERSION = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    author TEXT
+);
+CREATE INDEX IF NOT EXISTS files_by_hash ON files (content_hash);
+CREATE TABLE IF NOT EXISTS sessions (
+    content_hash TEXT PRIMARY KEY,
+    session_id TEXT,
+    analysis TEXT
+);
+CREATE TABLE IF NOT EXISTS messages (
+    content_hash TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    timestamp TEXT,
+    text TEXT,
+    PRIMARY KEY (content_hash, seq)
+);
+CREATE TABLE IF NOT EXISTS tool_calls (
+    content_hash TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (content_hash, tool)
+);
+CREATE TABLE IF NOT EXISTS file_refs (
+    content_hash TEXT NOT NULL,
+    ref TEXT NOT NULL,
+    PRIMARY KEY (content_hash, ref)
+);
+"""
+
+
+def default_index_path(history_path: Path) -> Path:
+    """Per-history index file in the user cache dir (never inside the repo)."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(Path.home(), ".cache")
+    key = hashlib.sha256(str(history_path.resolve()).encode("utf-8")).hexdigest()[:16]
+    return Path(cache_home) / "specstory-yak" / f"index-{key}.sqlite"
+
+
+def hash_file(filepath: Path, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SessionIndex:
+    """
+    Parsed sessions stored by content hash, with a stat cache per path.
+
+    Files whose size and mtime are unchanged are answered from the index
+    without being read; changed files are hashed, and only content that was
+    never seen before is parsed.
+    """
+
+    def __init__(self, db_path: Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(str(db_path))
+        self.stats = {"cached": 0, "rehashed": 0, "parsed": 0}
+        self._migrate()
+
+    def _migrate(self):
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != INDEX_VERSION:
+            for table in ("files", "sessions", "messages", "tool_calls", "file_refs"):
+                self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self.conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def analyze(self, filepath: Path) -> Optional[SessionAnalysis]:
+        """
+        Analysis for a session file, parsing it only if its content is new.
+
+        The analysis is not scored; score sessions in one batch with
+        score_sessions.
+        """
+        path = str(filepath.resolve())
+        try:
+            stat = filepath.stat()
+        except OSError as e:
+            print(f"Error reading {filepath}: {e}", file=sys.stderr)
+            return None
+
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, content_hash, author FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            self.stats["cached"] += 1
+            return self._load(row[2], filepath.name, row[3])
+
+        try:
+            content_hash = hash_file(filepath)
+            known = self.conn.execute(
+                "SELECT 1 FROM sessions WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+            if known:
+                self.stats["rehashed"] += 1
+            else:
+                self.stats["parsed"] += 1
+                self._store(content_hash, filepath)
+        except (OSError, UnicodeError) as e:
+            print(f"Error reading {filepath}: {e}", file=sys.stderr)
+            return None
+
+        # Authorship belongs to the path, so it survives content changes
+        author = row[3] if row else None
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files (path, size, mtime_ns, content_hash, author) VALUES (?, ?, ?, ?, ?)",
+            (path, stat.st_size, stat.st_mtime_ns, content_hash, author),
+        )
+        return self._load(content_hash, filepath.name, author)
+
+    def _store(self, content_hash: str, filepath: Path):
+        """Parse a file in one streaming pass and store messages, tool counts, refs and analysis."""
+        seq = 0
+
+        def store_message(role: str, timestamp: str, text: str):
+            nonlocal seq
+            self.conn.execute(
+                "INSERT OR REPLACE INTO messages (content_hash, seq, role, timestamp, text) VALUES (?, ?, ?, ?, ?)",
+                (content_hash, seq, role, timestamp, text),
+            )
+            seq += 1
+
+        tally = SessionTally(on_message=store_message)
+        try:
+            with open(filepath, "r", encoding="utf-8") as handle:
+                for event in tokenize_session(handle):
+                    tally.feed(event)
+        except (OSError, UnicodeError):
+            self.conn.execute("DELETE FROM messages WHERE content_hash = ?", (content_hash,))
+            raise
+        analysis = tally.analysis(filepath.name, score=False)
+
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO tool_calls (content_hash, tool, count) VALUES (?, ?, ?)",
+            [(content_hash, tool, count) for tool, count in tally.tool_calls.items()],
+        )
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO file_refs (content_hash, ref) VALUES (?, ?)",
+            [(content_hash, ref) for ref in tally.file_refs],
+        )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO sessions (content_hash, session_id, analysis) VALUES (?, ?, ?)",
+            (
+                content_hash,
+                analysis.session_id if analysis else None,
+                json.dumps(asdict(analysis)) if analysis else None,
+            ),
+        )
+
+    def _load(self, content_hash: str, filename: str, author: Optional[str]) -> Optional[SessionAnalysis]:
+        row = self.conn.execute(
+            "SELECT analysis FROM sessions WHERE content_hash = ?", (content_hash,)
+        ).fetchone()
+        if not row or row[0] is None:
+            return None
+        analysis = SessionAnalysis(**json.loads(row[0]))
+        # Identical content may live under another name; filename-derived fields follow the path
+        analysis.filename = filename
+        analysis.title = extract_title_from_filename(filename)
+        analysis.timestamp = str(parse_date_from_filename(filename) or "unknown")
+        analysis.author = author or "unknown"
+        return analysis
+
+    def set_author(self, filepath: Path, author: str):
+        """Remember the git author of a path (``unknown`` is retried next run)."""
+        self.conn.execute(
+            "UPDATE files SET author = ? WHERE path = ?",
+            (None if author == "unknown" else author, str(filepath.resolve())),
+        )
+
+    def prune(self, history_path: Path):
+        """Forget deleted files under history_path and content no file uses."""
+        prefix = str(history_path.resolve()) + os.sep
+        existing = {str(p.resolve()) for p in history_path.glob("*.md")}
+        stale = [
+            (path,) for (path,) in self.conn.execute("SELECT path FROM files")
+            if path.startswith(prefix) and path not in existing
+        ]
+        self.conn.executemany("DELETE FROM files WHERE path = ?", stale)
+        for table in ("sessions", "messages", "tool_calls", "file_refs"):
+            self.conn.execute(
+                f"DELETE FROM {table} WHERE content_hash NOT IN (SELECT content_hash FROM files)"
+            )
+        self.conn.commit()
@@ -43,3 +43,13 @@ class SessionAnalysis:
 
     # Author (from git blame)
     author: str = "unknown"
+
+
+@dataclass
+class SessionEvent:
+    """A token produced by the streaming specstory tokenizer."""
+    kind: str  # "session", "message_start", "message_end", "text", "tool_open", "tool_close", "file_ref"
+    line: int
+    value: str = ""  # session id, tool name, file ref, or message text
+    role: str = ""  # message_start only
+    timestamp: str = ""  # message_start only
@@ -2,7 +2,27 @@
 
 import re
 from datetime import datetime
-from typing import Optional
+from typing import Iterator, Optional, TextIO
+
+from .models import SessionEvent
+
+
+MESSAGE_ROLES = ("user", "agent", "assistant")
+
+# Message header: _**User (timestamp)**_ or _**Agent (model ...) (timestamp)**_
+_HEADER_RE = re.compile(r"_\*\*(\w+)(?:\s+\([^)]*\))?\s*\(([^)]+)\)\*\*_")
+# A message body runs until the next User/Agent/Assistant marker
+_BODY_END_RE = re.compile(r"_\*\*(?:User|Agent|Assistant)")
+_SESSION_RE = re.compile(r"Session\s+([a-f0-9-]{36})")
+_FILE_REF_RE = re.compile(r"@([\w./\-]+(?:\.\w+)?)")
+_TOOL_USE_RE = re.compile(r"Tool use:\s*\*\*(\w+)\*\*")
+# "Tool use:" closing a line, whose **name** follows on a later line
+_TOOL_DANGLING_RE = re.compile(r"Tool use:\s*$")
+_TOOL_FOLLOW_RE = re.compile(r"\s*\*\*(\w+)\*\*")
+_TOOL_NAME_RE = re.compile(r'data-tool-name="(\w+)"')
+_TOOL_CLOSE = "</tool-use>"
+# Anything that makes a line more than plain message text
+_MARKER_HINT_RE = re.compile(r"_\*\*|@|Session|Tool use:|data-tool-name|</tool-use>")
 
 
 def parse_date_from_filename(filename: str) -> Optional[datetime]:
@@ -33,6 +53,11 @@ def extract_session_id(content: str) -> str:
     return match.group(1) if match else "unknown"
 
 
+def clean_message_text(text: str) -> str:
+    """Strip a message body and its trailing --- separator."""
+    return re.sub(r"\n---\s*$", "", text.strip()).strip()
+
+
 def extract_messages(content: str) -> list[tuple[str, str, str]]:
     """
     Extract user/agent messages from specstory content.
@@ -41,27 +66,26 @@ def extract_messages(content: str) -> list[tuple[str, str, str]]:
     messages = []
 
     # Pattern for message headers: _**User (timestamp)**_ or _**Agent (...)**_
-    pattern = r"_\*\*(\w+)(?:\s+\([^)]*\))?\s*\(([^)]+)\)\*\*_\s*(?:<!--[^>]+-->)?\s*(.*?)(?=_\*\*(?:User|Agent|Assistant)|$)"
+    # An unclosed comment after the header is body text; it never runs into the next message
+    pattern = (r"_\*\*(\w+)(?:\s+\([^)]*\))?\s*\(([^)]+)\)\*\*_\s*"
+               r"(?:<!--(?:(?!_\*\*(?:User|Agent|Assistant))[^>])+-->)?\s*(.*?)(?=_\*\*(?:User|Agent|Assistant)|$)")
 
     for match in re.finditer(pattern, content, re.DOTALL):
         role = match.group(1).lower()
         timestamp = match.group(2)
-        text = match.group(3).strip()
+        text = clean_message_text(match.group(3))
 
-        # Clean up the text - remove trailing ---
-        text = re.sub(r"\n---\s*$", "", text).strip()
-
-        if role in ("user", "agent", "assistant"):
+        if role in MESSAGE_ROLES:
             messages.append((role, timestamp, text))
 
     return messages
 
 
 def extract_file_refs(content: str) -> list[str]:
-    """Extract @file references from content."""
+    """Extract unique @file references from content, in order of appearance."""
     # Match @path/to/file or @filename patterns
-    refs = re.findall(r"@([\w./\-]+(?:\.\w+)?)", content)
-    return list(set(refs))
+    refs = _FILE_REF_RE.findall(content)
+    return list(dict.fromkeys(refs))
 
 
 def extract_tool_calls(content: str) -> dict[str, int]:
@@ -107,3 +131,179 @@ def detect_goal(initial_message: str) -> str:
             return match.group(1).strip()[:80]
 
     return summarize_message(initial_message, 80)
+
+
+def _line_markers(line: str, number: int) -> list[tuple[int, SessionEvent]]:
+    """Session ids, tool markers and file refs on one line, with their offsets."""
+    found = []
+    if "Session" in line:
+        for match in _SESSION_RE.finditer(line):
+            found.append((match.start(), SessionEvent("session", number, match.group(1))))
+    if "Tool use:" in line:
+        for match in _TOOL_USE_RE.finditer(line):
+            found.append((match.start(), SessionEvent("tool_open", number, match.group(1))))
+    if "data-tool-name" in line:
+        for match in _TOOL_NAME_RE.finditer(line):
+            found.append((match.start(), SessionEvent("tool_open", number, match.group(1))))
+    if _TOOL_CLOSE in line:
+        start = line.find(_TOOL_CLOSE)
+        while start != -1:
+            found.append((start, SessionEvent("tool_close", number)))
+            start = line.find(_TOOL_CLOSE, start + 1)
+    if "@" in line:
+        for match in _FILE_REF_RE.finditer(line):
+            found.append((match.start(), SessionEvent("file_ref", number, match.group(1))))
+    return found
+
+
+def _read_blocks(handle: TextIO, block_size: int) -> Iterator[str]:
+    """Read text in blocks that end on a line boundary (except the last)."""
+    rest = ""
+    while True:
+        chunk = handle.read(block_size)
+        if not chunk:
+            if rest:
+                yield rest
+            return
+        chunk = rest + chunk
+        cut = chunk.rfind("\n") + 1
+        if cut == 0:
+            # A single line longer than the block: keep reading
+            rest = chunk
+            continue
+        rest = chunk[cut:]
+        yield chunk[:cut]
+
+
+def tokenize_session(handle: TextIO, block_size: int = 1 << 16) -> Iterator[SessionEvent]:
+    """
+    Tokenize specstory markdown in one pass over an open text file.
+
+    Yields typed events in document order: "session" (value = session id),
+    "message_start" (role, timestamp) ... "message_end", "text" (message body,
+    one or more whole lines joined by newlines), "tool_open" (value = tool
+    name), "tool_close" and "file_ref" (value = referenced path). The file is
+    read in blocks, so memory does not grow with its size; runs of plain body
+    lines are emitted as a single text event without per-line work.
+
+    Messages, tool counts and file refs match extract_messages(),
+    extract_tool_calls() and extract_file_refs(). A body starts after its
+    header (and an optional <!-- --> comment that closes before the next
+    User/Agent/Assistant marker) and runs until that marker. A "Tool use:"
+    whose **name** is on a later line is still counted.
+    """
+    in_message = False
+    tool_dangling = False  # a line ended in "Tool use:"; the name may follow
+    # Between a header and the first body text: whitespace and one comment are skipped
+    skipping = False
+    pending: list[str] = []  # lines of a possible multi-line comment after a header
+    pending_start = 0
+
+    def body_text(text: str, number: int) -> Iterator[SessionEvent]:
+        nonlocal skipping, pending, pending_start
+        if pending:
+            pending.append(text)
+            joined = "\n".join(pending)
+            close = joined.find(">")
+            if close == -1:
+                return
+            lines_held, first = pending, pending_start
+            pending = []
+            if close >= 7 and joined[close - 2:close] == "--":
+                # Comment complete: the body starts after it
+                yield from body_text(joined[close + 1:].lstrip(), number)
+            else:
+                # Not a comment after all: everything held is body text
+                yield SessionEvent("text", first, "\n".join(lines_held))
+            return
+        if skipping:
+            stripped = text.lstrip()
+            if not stripped:
+                return
+            skipping = False
+            if stripped.startswith("<!--"):
+                close = stripped.find(">")
+                if close == -1:
+                    pending = [stripped]
+                    pending_start = number
+                    return
+                if close >= 7 and stripped[close - 2:close] == "--":
+                    text = stripped[close + 1:].lstrip()
+                    if not text:
+                        return
+                else:
+                    text = stripped
+            else:
+                text = stripped
+        yield SessionEvent("text", number, text)
+
+    def flush_pending() -> Iterator[SessionEvent]:
+        nonlocal pending
+        held, first = pending, pending_start
+        pending = []
+        if held:
+            yield SessionEvent("text", first, "\n".join(held))
+
+    number = 0
+    for block in _read_blocks(handle, block_size):
+        position = 0
+        size = len(block)
+        while position < size:
+            if in_message and not skipping and not pending and not tool_dangling:
+                # Plain body lines up to the next line that needs a closer look
+                hint = _MARKER_HINT_RE.search(block, position)
+                end = max(position, block.rfind("\n", position, hint.start()) + 1) if hint else size
+                if end > position:
+                    run = block[position:end]
+                    if run.endswith("\n"):
+                        run = run[:-1]
+                    yield SessionEvent("text", number + 1, run)
+                    number += run.count("\n") + 1
+                    position = end
+                    continue
+
+            newline = block.find("\n", position)
+            line_end = size if newline == -1 else newline
+            line = block[position:line_end]
+            position = line_end + 1
+            number += 1
+
+            events = _line_markers(line, number)
+            if tool_dangling and line.strip():
+                tool_dangling = False
+                follow = _TOOL_FOLLOW_RE.match(line)
+                if follow:
+                    events.append((line.find("**"), SessionEvent("tool_open", number, follow.group(1))))
+            if "Tool use:" in line and _TOOL_DANGLING_RE.search(line):
+                tool_dangling = True
+            start = 0
+            while True:
+                if in_message:
+                    end_match = _BODY_END_RE.search(line, start) if "_**" in line else None
+                    stop = end_match.start() if end_match else len(line)
+                    for event in body_text(line[start:stop], number):
+                        events.append((start, event))
+                    if not end_match:
+                        break
+                    events.extend((stop, event) for event in flush_pending())
+                    events.append((stop, SessionEvent("message_end", number)))
+                    in_message = False
+                    skipping = False
+                    start = stop
+                else:
+                    header = _HEADER_RE.search(line, start) if "_**" in line else None
+                    if not header:
+                        break
+                    events.append((header.start(), SessionEvent(
+                        "message_start", number, role=header.group(1).lower(), timestamp=header.group(2))))
+                    in_message = True
+                    skipping = True
+                    start = header.end()
+
+            events.sort(key=lambda item: item[0])
+            for _, event in events:
+                yield event
+
+    if in_message:
+        yield from flush_pending()
+        yield SessionEvent("message_end", number)
@@ -0,0 +1,422 @@
+"""MCP Server Load Test
+
+Replays a mix of tool calls against an MCP server at a target concurrency
+or request rate and reports throughput, latency percentiles and error
+rates per tool. Needs no model access, so it runs fully offline against a
+local stdio server.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from connections import MCPConnectionPool, create_connection
+from evaluation import parse_env_vars, parse_headers
+
+
+@dataclass
+class ToolCall:
+    """One call in the load mix."""
+    tool: str
+    arguments: dict[str, Any] = field(default_factory=dict)
+    weight: float = 1.0
+
+
+@dataclass
+class CallSample:
+    """Outcome of one call: latency includes time queued behind the target rate."""
+    tool: str
+    latency: float
+    error: str | None = None
+
+
+def load_calls(path: Path) -> tuple[list[ToolCall], bool]:
+    """Load a call mix from a JSON array or JSON lines file.
+
+    Each entry is {"tool": ..., "arguments": {...}, "weight": ...}. Returns the
+    calls and whether they are weighted: a mix without weights is a recording
+    and is replayed in order, a weighted mix is sampled at random.
+    """
+    text = path.read_text()
+    if text.lstrip().startswith("["):
+        entries = json.loads(text)
+    else:
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+    weighted = any("weight" in entry for entry in entries)
+    calls = [
+        ToolCall(
+            tool=entry["tool"],
+            arguments=entry.get("arguments") or {},
+            weight=float(entry.get("weight", 1.0)),
+        )
+        for entry in entries
+    ]
+    return calls, weighted
+
+
+def sample_value(schema: dict[str, Any]) -> Any:
+    """A plausible value for a JSON schema: default, example, enum, or a typed placeholder."""
+    if "default" in schema:
+        return schema["default"]
+    if schema.get("examples"):
+        return schema["examples"][0]
+    if schema.get("enum"):
+        return schema["enum"][0]
+    for option in schema.get("anyOf", []) + schema.get("oneOf", []):
+        if option.get("type") != "null":
+            return sample_value(option)
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "string")
+    if kind == "integer":
+        return max(1, schema.get("minimum", 1))
+    if kind == "number":
+        return max(1.0, schema.get("minimum", 1.0))
+    if kind == "boolean":
+        return False
+    if kind == "array":
+        return []
+    if kind == "object":
+        return sample_arguments(schema)
+    return "test"
+
+
+def sample_arguments(schema: dict[str, Any]) -> dict[str, Any]:
+    """Arguments filling only the required properties of an input schema."""
+    properties = schema.get("properties", {})
+    return {name: sample_value(properties.get(name, {})) for name in schema.get("required", [])}
+
+
+def synthetic_calls(tools: list[dict[str, Any]], only: list[str] | None = None) -> list[ToolCall]:
+    """An evenly weighted mix of every tool (or those in `only`), with arguments from their schemas."""
+    return [
+        ToolCall(tool=tool["name"], arguments=sample_arguments(tool.get("input_schema") or {}))
+        for tool in tools
+        if not only or tool["name"] in only
+    ]
+
+
+class CallPicker:
+    """Next call of the mix: in recorded order, or weighted-random with a fixed seed."""
+
+    def __init__(self, calls: list[ToolCall], weighted: bool, seed: int = 0):
+        self.calls = calls
+        self.weighted = weighted
+        self._random = random.Random(seed)
+        self._weights = [call.weight for call in calls]
+        self._next = 0
+
+    def next(self) -> ToolCall:
+        if self.weighted:
+            return self._random.choices(self.calls, weights=self._weights)[0]
+        call = self.calls[self._next % len(self.calls)]
+        self._next += 1
+        return call
+
+
+async def timed_call(connection: Any, call: ToolCall, scheduled_ts: float) -> CallSample:
+    """Make one call, timing it from when it was scheduled to when it finished."""
+    try:
+        if isinstance(connection, MCPConnectionPool):
+            async with connection.shared() as pooled:
+                result = await pooled.session.call_tool(call.tool, arguments=call.arguments)
+        else:
+            result = await connection.session.call_tool(call.tool, arguments=call.arguments)
+        error = None
+        if getattr(result, "isError", False):
+            text = next((block.text for block in result.content if hasattr(block, "text")), "")
+            error = f"Tool error: {text}" if text else "Tool error"
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return CallSample(tool=call.tool, latency=time.perf_counter() - scheduled_ts, error=error)
+
+
+async def run_closed_loop(connection: Any, picker: CallPicker, concurrency: int,
+                          requests: int | None, duration: float | None) -> list[CallSample]:
+    """`concurrency` workers each issue calls back to back until the budget is spent."""
+    samples: list[CallSample] = []
+    deadline = time.perf_counter() + duration if duration else None
+    issued = 0
+
+    async def worker():
+        nonlocal issued
+        while (requests is None or issued < requests) and (deadline is None or time.perf_counter() < deadline):
+            issued += 1
+            samples.append(await timed_call(connection, picker.next(), time.perf_counter()))
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples
+
+
+async def run_open_loop(connection: Any, picker: CallPicker, rate: float,
+                        requests: int | None, duration: float | None) -> list[CallSample]:
+    """Start calls on a fixed schedule of `rate` per second, whether or not earlier calls finished.
+
+    Latency is measured from each call's scheduled start, so a server that
+    falls behind shows the backlog instead of hiding it.
+    """
+    total = requests if requests is not None else max(1, int(rate * duration))
+    interval = 1.0 / rate
+    start = time.perf_counter()
+    pending = []
+    for i in range(total):
+        scheduled_ts = start + i * interval
+        delay = scheduled_ts - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        pending.append(asyncio.create_task(timed_call(connection, picker.next(), scheduled_ts)))
+    return list(await asyncio.gather(*pending))
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def latency_stats(samples: list[CallSample], elapsed: float) -> dict[str, Any]:
+    latencies = sorted(sample.latency for sample in samples)
+    errors = sum(1 for sample in samples if sample.error)
+    return {
+        "calls": len(samples),
+        "errors": errors,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "throughput_per_s": len(samples) / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+    }
+
+
+def build_results(samples: list[CallSample], elapsed: float, settings: dict[str, Any]) -> dict[str, Any]:
+    """Overall and per-tool statistics, plus the most common errors per tool."""
+    by_tool: dict[str, list[CallSample]] = {}
+    for sample in samples:
+        by_tool.setdefault(sample.tool, []).append(sample)
+
+    tools = {}
+    for tool, tool_samples in sorted(by_tool.items()):
+        stats = latency_stats(tool_samples, elapsed)
+        error_counts: dict[str, int] = {}
+        for sample in tool_samples:
+            if sample.error:
+                error_counts[sample.error] = error_counts.get(sample.error, 0) + 1
+        stats["top_errors"] = sorted(error_counts.items(), key=lambda item: -item[1])[:3]
+        tools[tool] = stats
+
+    return {
+        "settings": settings,
+        "elapsed_s": elapsed,
+        "overall": latency_stats(samples, elapsed),
+        "tools": tools,
+    }
+
+
+REPORT_HEADER = """
+# Load Test Report
+
+## Summary
+
+- **Mode**: {mode}
+- **Connections**: {connections}
+- **Calls**: {calls} in {elapsed_s:.2f}s ({throughput_per_s:.1f}/s)
+- **Errors**: {errors} ({error_rate:.1%})
+- **Latency**: p50 {p50_ms:.1f}ms, p95 {p95_ms:.1f}ms, p99 {p99_ms:.1f}ms, max {max_ms:.1f}ms
+
+---
+
+## Per Tool
+
+| Tool | Calls | Errors | p50 (ms) | p95 (ms) | p99 (ms) | Max (ms) |
+|------|-------|--------|----------|----------|----------|----------|
+"""
+
+TOOL_ROW = "| {tool} | {calls} | {errors} ({error_rate:.1%}) | {p50_ms:.1f} | {p95_ms:.1f} | {p99_ms:.1f} | {max_ms:.1f} |\n"
+
+
+def format_report(results: dict[str, Any]) -> str:
+    """Markdown report in the same layout as the evaluation report."""
+    settings = results["settings"]
+    mode = (
+        f"open loop at {settings['rate']}/s" if settings.get("rate")
+        else f"closed loop, concurrency {settings['concurrency']}"
+    )
+    report = REPORT_HEADER.format(
+        mode=mode,
+        connections=settings["pool_size"],
+        elapsed_s=results["elapsed_s"],
+        **results["overall"],
+    )
+    report += "".join(TOOL_ROW.format(tool=tool, **stats) for tool, stats in results["tools"].items())
+
+    errors = [(tool, stats["top_errors"]) for tool, stats in results["tools"].items() if stats["top_errors"]]
+    if errors:
+        report += "\n## Errors\n\n"
+        for tool, top_errors in errors:
+            for message, count in top_errors:
+                report += f"- **{tool}** (x{count}): `{message[:200]}`\n"
+    return report
+
+
+async def run_load_test(
+    connection: Any,
+    calls: list[ToolCall] | None = None,
+    weighted: bool = False,
+    concurrency: int = 1,
+    rate: float | None = None,
+    requests: int | None = None,
+    duration: float | None = None,
+    warmup: int = 0,
+    seed: int = 0,
+    only_tools: list[str] | None = None,
+) -> dict[str, Any]:
+    """Run a load test on an open connection (or pool) and return the results.
+
+    Without `calls`, a synthetic mix is built from the server's tool schemas.
+    """
+    if requests is None and duration is None:
+        requests = 100
+
+    if not calls:
+        tools = await connection.list_tools()
+        calls = synthetic_calls(tools, only_tools)
+        weighted = True
+        if not calls:
+            raise ValueError("No tools to call")
+        print(f"📋 Synthetic mix over {len(calls)} tools", file=sys.stderr)
+
+    picker = CallPicker(calls, weighted, seed)
+    for _ in range(warmup):
+        await timed_call(connection, picker.next(), time.perf_counter())
+
+    print(f"🚀 Running load test ({requests or f'{duration}s'})", file=sys.stderr)
+    start = time.perf_counter()
+    if rate:
+        samples = await run_open_loop(connection, picker, rate, requests, duration)
+    else:
+        samples = await run_closed_loop(connection, picker, concurrency, requests, duration)
+    elapsed = time.perf_counter() - start
+
+    settings = {
+        "concurrency": None if rate else concurrency,
+        "rate": rate,
+        "requests": requests,
+        "duration": duration,
+        "warmup": warmup,
+        "seed": seed,
+        "pool_size": connection.size if isinstance(connection, MCPConnectionPool) else 1,
+        "mix": "weighted" if weighted else "replay",
+    }
+    return build_results(samples, elapsed, settings)
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Load test an MCP server: throughput, latency percentiles and error rates per tool",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Synthetic mix of every tool, 8 concurrent callers, 500 calls
+  python load_test.py -t stdio -c python -a my_server.py -j 8 -n 500
+
+  # Replay recorded calls at 50 calls/s for 30 seconds over 4 server processes
+  python load_test.py -t stdio -c python -a my_server.py --calls calls.jsonl --rate 50 --duration 30 -P 4
+
+  # Save markdown and JSON reports
+  python load_test.py -t http -u https://example.com/mcp -j 16 -n 1000 -o load_report.md --json load_report.json
+        """,
+    )
+
+    parser.add_argument("-t", "--transport", choices=["stdio", "sse", "http"], default="stdio", help="Transport type (default: stdio)")
+
+    stdio_group = parser.add_argument_group("stdio options")
+    stdio_group.add_argument("-c", "--command", help="Command to run MCP server (stdio only)")
+    stdio_group.add_argument("-a", "--args", nargs="+", help="Arguments for the command (stdio only)")
+    stdio_group.add_argument("-e", "--env", nargs="+", help="Environment variables in KEY=VALUE format (stdio only)")
+
+    remote_group = parser.add_argument_group("sse/http options")
+    remote_group.add_argument("-u", "--url", help="MCP server URL (sse/http only)")
+    remote_group.add_argument("-H", "--header", nargs="+", dest="headers", help="HTTP headers in 'Key: Value' format (sse/http only)")
+
+    load_group = parser.add_argument_group("load options")
+    load_group.add_argument("--calls", type=Path, help="JSON/JSONL call mix; entries without 'weight' are replayed in order (default: synthetic mix of all tools)")
+    load_group.add_argument("--tool", nargs="+", dest="only_tools", help="Limit the synthetic mix to these tools")
+    load_group.add_argument("-j", "--concurrency", type=int, default=1, help="Concurrent callers in closed-loop mode (default: 1)")
+    load_group.add_argument("--rate", type=float, help="Calls per second in open-loop mode (overrides --concurrency)")
+    load_group.add_argument("-n", "--requests", type=int, help="Number of calls (default: 100 unless --duration is set)")
+    load_group.add_argument("--duration", type=float, help="Seconds to run instead of a fixed number of calls")
+    load_group.add_argument("--warmup", type=int, default=0, help="Untimed calls before measuring (default: 0)")
+    load_group.add_argument("-P", "--pool-size", type=int, default=1, help="Number of MCP sessions to spread calls over (default: 1)")
+    load_group.add_argument("--seed", type=int, default=0, help="Random seed for weighted mixes (default: 0)")
+
+    parser.add_argument("-o", "--output", type=Path, help="Output file for markdown report (default: stdout)")
+    parser.add_argument("--json", type=Path, dest="json_output", help="Also write results as JSON to this file")
+
+    args = parser.parse_args()
+
+    calls, weighted = None, False
+    if args.calls:
+        if not args.calls.exists():
+            print(f"Error: Call mix file not found: {args.calls}")
+            sys.exit(1)
+        calls, weighted = load_calls(args.calls)
+
+    connection_args = dict(
+        transport=args.transport,
+        command=args.command,
+        args=args.args,
+        env=parse_env_vars(args.env) if args.env else None,
+        url=args.url,
+        headers=parse_headers(args.headers) if args.headers else None,
+    )
+    try:
+        if args.pool_size > 1:
+            connection = MCPConnectionPool(args.pool_size, **connection_args)
+        else:
+            connection = create_connection(**connection_args)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(f"🔗 Connecting to MCP server via {args.transport}...", file=sys.stderr)
+
+    async with connection:
+        try:
+            results = await run_load_test(
+                connection,
+                calls=calls,
+                weighted=weighted,
+                concurrency=args.concurrency,
+                rate=args.rate,
+                requests=args.requests,
+                duration=args.duration,
+                warmup=args.warmup,
+                seed=args.seed,
+                only_tools=args.only_tools,
+            )
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
+    report = format_report(results)
+    if args.json_output:
+        args.json_output.write_text(json.dumps(results, indent=2))
+        print(f"✅ JSON results saved to {args.json_output}", file=sys.stderr)
+    if args.output:
+        args.output.write_text(report)
+        print(f"✅ Report saved to {args.output}", file=sys.stderr)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,150 @@
+"""Content-addressed caches for evaluation model responses and tool results.
+
+Model responses are keyed by everything sent to the model (model, system
+prompt, messages and tool schemas); tool results by tool name, canonical
+arguments and server version. Unchanged tasks therefore replay from disk,
+while a task whose tool results or tool descriptions changed misses the
+cache from that point on and runs live.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from anthropic.types import Message
+from mcp.types import CallToolResult
+
+CACHE_MODES = ("off", "record", "replay", "strict")
+
+
+class CacheMiss(LookupError):
+    """Raised in strict mode when a request is not in the cache."""
+
+
+def to_jsonable(value: Any) -> Any:
+    """Plain JSON data for SDK objects (pydantic models) nested anywhere in value."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    if isinstance(value, dict):
+        return {key: to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(item) for item in value]
+    return value
+
+
+def content_key(*parts: Any) -> str:
+    """SHA-256 of the canonical JSON encoding of parts."""
+    canonical = json.dumps(to_jsonable(list(parts)), sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseStore:
+    """JSON entries on disk under their content key, written atomically."""
+
+    def __init__(self, root: Path, kind: str):
+        self.root = Path(root) / kind
+        self.stats = {"hits": 0, "misses": 0, "writes": 0}
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Any | None:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return value
+
+    def put(self, key: str, value: Any):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+        self.stats["writes"] += 1
+
+
+class CachedMessages:
+    """`messages.create` served from a ResponseStore where the mode allows."""
+
+    def __init__(self, client: Any, store: ResponseStore, mode: str):
+        self._client = client
+        self._store = store
+        self._mode = mode
+
+    def create(self, **request: Any) -> Message:
+        key = content_key(
+            request.get("model"),
+            request.get("system"),
+            request.get("messages"),
+            content_key(request.get("tools")),  # tool schema hash
+            {k: v for k, v in request.items() if k not in ("model", "system", "messages", "tools")},
+        )
+        if self._mode in ("replay", "strict"):
+            cached = self._store.get(key)
+            if cached is not None:
+                return Message.model_validate(cached)
+            if self._mode == "strict":
+                raise CacheMiss(f"No cached model response for request {key[:12]}")
+        response = self._client.messages.create(**request)
+        self._store.put(key, to_jsonable(response))
+        return response
+
+
+class CachedModelClient:
+    """Wraps an Anthropic client so `client.messages.create` goes through the cache."""
+
+    def __init__(self, client: Any, cache_dir: Path, mode: str = "replay"):
+        self.store = ResponseStore(cache_dir, "model")
+        self.messages = CachedMessages(client, self.store, mode)
+
+
+class CachedToolConnection:
+    """Wraps an MCP connection (or pool) so `call_tool` results go through the cache.
+
+    Keys include the server version, taken from the server's initialize
+    response unless `server_version` is given; bump it to invalidate tool
+    results after changing the server's behaviour. Failed calls, whether
+    they raise or come back with isError set, are never cached.
+    """
+
+    def __init__(self, connection: Any, cache_dir: Path, mode: str = "replay", server_version: str | None = None):
+        self.connection = connection
+        self.store = ResponseStore(cache_dir, "tools")
+        self.mode = mode
+        self.server_version = server_version
+
+    async def __aenter__(self):
+        await self.connection.__aenter__()
+        if self.server_version is None:
+            info = getattr(self.connection, "server_info", None)
+            self.server_version = f"{info.name}@{info.version}" if info else "unknown"
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        return await self.connection.__aexit__(exc_type, exc_val, exc_tb)
+
+    async def list_tools(self) -> list[dict[str, Any]]:
+        return await self.connection.list_tools()
+
+    async def call_tool(self, tool_name: str, arguments: dict[str, Any]) -> Any:
+        key = content_key(tool_name, arguments, self.server_version)
+        if self.mode in ("replay", "strict"):
+            cached = self.store.get(key)
+            if cached is not None:
+                if isinstance(cached, list):  # MCP content blocks
+                    return CallToolResult.model_validate({"content": cached}).content
+                return cached
+            if self.mode == "strict":
+                raise CacheMiss(f"No cached result for {tool_name} {key[:12]}")
+        result = await self.connection.call_tool_result(tool_name, arguments)
+        if not result.isError:
+            self.store.put(key, to_jsonable(result.content))
+        return result.content
@@ -6,6 +6,7 @@ Creates explosion, shatter, and particle burst effects.
 """
 
 import sys
+from typing import Optional
 from pathlib import Path
 import math
 import random
@@ -14,6 +15,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from PIL import Image, ImageDraw
 import numpy as np
+from core.frame_scheduler import render_frames
 from core.gif_builder import GIFBuilder
 from core.frame_composer import create_blank_frame, draw_emoji_enhanced
 from core.visual_effects import ParticleSystem
@@ -30,7 +32,8 @@ def create_explode_animation(
     center_pos: tuple[int, int] = (240, 240),
     frame_width: int = 480,
     frame_height: int = 480,
-    bg_color: tuple[int, int, int] = (255, 255, 255)
+    bg_color: tuple[int, int, int] = (255, 255, 255),
+    workers: Optional[int] = None
 ) -> list[Image.Image]:
     """
     Create explosion animation.
@@ -46,12 +49,11 @@ def create_explode_animation(
         frame_width: Frame width
         frame_height: Frame height
         bg_color: Background color
+        workers: Worker processes for parallel rendering (None = serial, 0 = one per CPU)
 
     Returns:
         List of frames
     """
-    frames = []
-
     # Default object data
     if object_data is None:
         if object_type == 'emoji':
@@ -81,7 +83,7 @@ def create_explode_animation(
             'rotation_speed': rotation_speed
         })
 
-    for i in range(num_frames):
+    def render_frame(i: int) -> Image.Image:
         t = i / (num_frames - 1) if num_frames > 1 else 0
         frame = create_blank_frame(frame_width, frame_height, bg_color)
         draw = ImageDraw.Draw(frame)
@@ -232,9 +234,9 @@ def create_explode_animation(
                         shadow=False
                     )
 
-        frames.append(frame)
+        return frame
 
-    return frames
+    return render_frames(render_frame, num_frames, workers=workers)
 
 
 def create_particle_burst(
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Sequence
+
+from engine import Finding, scan_region
+from patterns import SecretPattern
+
+
+CACHE_FORMAT = 2
+CACHE_FILE = "scan-cache.json"
+# Prefix hashing reads the mapped file in slices of this size
+FINGERPRINT_CHUNK = 1 << 20
+# Files modified this close to their last scan may have changed again without
+# a visible size/mtime change (same idea as git's "racily clean" entries).
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def pattern_set_version(
+    patterns: Sequence[SecretPattern],
+    allowlist: list[re.Pattern[str]],
+) -> str:
+    """Hash of everything that affects findings besides file contents."""
+    digest = hashlib.sha256(f"format={CACHE_FORMAT}".encode("utf-8"))
+    for pattern in patterns:
+        digest.update(repr((pattern.name, pattern.regex.pattern, pattern.regex.flags, pattern.anchors)).encode("utf-8"))
+    for entry in allowlist:
+        digest.update(repr(("allow", entry.pattern, entry.flags)).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def default_cache_path(root: str) -> str:
+    """Cache under the repository's git dir, or .specstory/ outside git."""
+    try:
+        result = subprocess.run(
+            ["git", "-C", root, "rev-parse", "--absolute-git-dir"],
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        return os.path.join(result.stdout.strip(), "specstory-guard", CACHE_FILE)
+    except (subprocess.SubprocessError, FileNotFoundError):
+        return os.path.join(root, ".specstory", ".guard-cache", CACHE_FILE)
+
+
+def fingerprint(data: bytes | mmap.mmap, offset: int) -> str:
+    """Hash of the whole prefix ``data[:offset]``.
+
+    A file whose prefix still hashes the same only grew, so its cached
+    findings stand and scanning can resume at ``offset``. Any edit before
+    ``offset``, even one that keeps the size, forces a full rescan.
+    """
+    digest = hashlib.sha256()
+    for start in range(0, offset, FINGERPRINT_CHUNK):
+        digest.update(data[start:min(offset, start + FINGERPRINT_CHUNK)])
+    return digest.hexdigest()
+
+
+class ScanCache:
+    """Per-file findings keyed by size, mtime and a content fingerprint.
+
+    Unchanged files are answered from the cache without being opened. Files
+    that grew are rescanned from the last complete line seen before.
+    """
+
+    def __init__(self, path: str, version: str, entries: dict[str, dict[str, Any]] | None = None) -> None:
+        self.path = path
+        self.version = version
+        self.entries = entries or {}
+        self.stats = {"cached": 0, "appended": 0, "scanned": 0}
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path: str, version: str) -> "ScanCache":
+        try:
+            with open(path, "r", encoding="utf-8") as handle:
+                payload = json.load(handle)
+        except (OSError, ValueError):
+            return cls(path, version)
+        if not isinstance(payload, dict) or payload.get("version") != version:
+            return cls(path, version)
+        return cls(path, version, payload.get("files") or {})
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        directory = os.path.dirname(self.path)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".scan-cache-")
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump({"version": self.version, "files": self.entries}, handle, separators=(",", ":"))
+            os.replace(temp_path, self.path)
+            self._dirty = False
+        except OSError as exc:
+            print(f"specstory-guard: failed to write scan cache {self.path}: {exc}", file=sys.stderr)
+
+    def prune(self, keep: set[str]) -> None:
+        """Drop entries for files that no longer exist in the scan."""
+        stale = [key for key in self.entries if key not in keep]
+        for key in stale:
+            del self.entries[key]
+        self._dirty = self._dirty or bool(stale)
+
+    def scan_file(
+        self,
+        file_path: str,
+        key: str,
+        patterns: Sequence[SecretPattern],
+        allowlist: list[re.Pattern[str]],
+        max_matches_per_file: int,
+    ) -> list[Finding]:
+        """Findings for one file, scanning only what the cache cannot answer.
+
+        Raises OSError if the file cannot be read.
+        """
+        stat = os.stat(file_path)
+        findings = self._cached(file_path, key, stat, max_matches_per_file)
+        if findings is not None:
+            return findings
+
+        entry = self.entries.get(key)
+        with open(file_path, "rb") as handle:
+            if stat.st_size == 0:
+                findings, offset, lines, mark = [], 0, 0, fingerprint(b"", 0)
+            else:
+                with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    findings, offset, lines = self._scan(file_path, entry, data, patterns, allowlist, max_matches_per_file)
+                    mark = fingerprint(data, offset)
+
+        self.entries[key] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "scanned_ns": time.time_ns(),
+            "offset": offset,
+            "lines": lines,
+            "fingerprint": mark,
+            "limit": max_matches_per_file,
+            "findings": [[finding.line_number, finding.rule_name, finding.snippet] for finding in findings],
+        }
+        self._dirty = True
+        return findings
+
+    def cached_findings(self, file_path: str, key: str, max_matches_per_file: int) -> list[Finding] | None:
+        """Findings for an unchanged file straight from the cache, else None."""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return self._cached(file_path, key, stat, max_matches_per_file)
+
+    def update(self, key: str, entry: dict[str, Any], stats: dict[str, int]) -> None:
+        """Merge an entry and counters produced by a scan in another process."""
+        self.entries[key] = entry
+        for name, count in stats.items():
+            self.stats[name] += count
+        self._dirty = True
+
+    def _cached(
+        self,
+        file_path: str,
+        key: str,
+        stat: os.stat_result,
+        max_matches_per_file: int,
+    ) -> list[Finding] | None:
+        entry = self.entries.get(key)
+        if entry is None or not self._unchanged(entry, stat):
+            return None
+        findings = _load_findings(file_path, entry["findings"])
+        if len(findings) >= entry["limit"] and max_matches_per_file > len(findings):
+            return None
+        self.stats["cached"] += 1
+        return findings[:max_matches_per_file]
+
+    def _unchanged(self, entry: dict[str, Any], stat: os.stat_result) -> bool:
+        return (
+            entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns
+            and stat.st_mtime_ns < entry["scanned_ns"] - RACY_WINDOW_NS
+        )
+
+    def _scan(
+        self,
+        file_path: str,
+        entry: dict[str, Any] | None,
+        data: mmap.mmap,
+        patterns: Sequence[SecretPattern],
+        allowlist: list[re.Pattern[str]],
+        max_matches_per_file: int,
+    ) -> tuple[list[Finding], int, int]:
+        """Resume after the cached prefix when the file only grew, else scan it all."""
+        if entry is not None and len(data) >= entry["offset"] and fingerprint(data, entry["offset"]) == entry["fingerprint"]:
+            offset, lines = entry["offset"], entry["lines"]
+            kept = [f for f in _load_findings(file_path, entry["findings"]) if f.line_number <= lines]
+            # Prefix findings are complete unless the old scan stopped inside the prefix
+            if len(kept) < entry["limit"] or max_matches_per_file <= len(kept):
+                self.stats["appended"] += 1
+                if len(kept) >= max_matches_per_file:
+                    return kept[:max_matches_per_file], offset, lines
+                findings, offset, lines = scan_region(
+                    file_path,
+                    data,
+                    patterns,
+                    allowlist,
+                    max_matches_per_file - len(kept),
+                    start=offset,
+                    first_line=lines + 1,
+                )
+                return kept + findings, offset, lines
+
+        self.stats["scanned"] += 1
+        return scan_region(file_path, data, patterns, allowlist, max_matches_per_file)
+
+
+def _load_findings(file_path: str, rows: list[list[Any]]) -> list[Finding]:
+    return [
+        Finding(file_path=file_path, line_number=line_number, rule_name=rule_name, snippet=snippet)
+        for line_number, rule_name, snippet in rows
+    ]
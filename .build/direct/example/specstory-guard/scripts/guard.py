@@ -9,6 +9,7 @@ import sys
 USAGE = """Usage:
   python scripts/guard.py install [--force]
   python scripts/guard.py scan [--root PATH] [--history-dir PATH] [--format text|markdown]
+                              [--staged] [--no-cache] [--workers N] [--stats]
   python scripts/guard.py uninstall
 """
 
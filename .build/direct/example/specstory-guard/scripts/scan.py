@@ -4,21 +4,17 @@ from __future__ import annotations
 import argparse
 import os
 import re
+import subprocess
 import sys
-from dataclasses import dataclass
+import time
 from typing import Iterable
 
+from cache import ScanCache, default_cache_path, pattern_set_version
+from engine import Finding, build_snippet, match_line, scan_mapped_file, scan_region
+from parallel import scan_files_parallel
 from patterns import ALLOWLIST, PATTERNS, SecretPattern
 
 
-@dataclass(frozen=True)
-class Finding:
-    file_path: str
-    line_number: int
-    rule_name: str
-    snippet: str
-
-
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Scan .specstory/history for potential secrets.",
@@ -51,6 +47,32 @@ def parse_args() -> argparse.Namespace:
         default="text",
         help="Output format",
     )
+    parser.add_argument(
+        "--staged",
+        action="store_true",
+        help="Only scan history files staged in the git index",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Rescan every file instead of reusing cached results",
+    )
+    parser.add_argument(
+        "--cache-path",
+        default=None,
+        help="Scan cache location (default: .git/specstory-guard/scan-cache.json)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for scanning files in parallel (0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Report scan throughput (MB/s, files/s) on stderr",
+    )
     return parser.parse_args()
 
 
@@ -67,6 +89,40 @@ def iter_history_files(history_dir: str) -> Iterable[str]:
                 yield os.path.join(base, name)
 
 
+def git_paths(root: str, args: list[str]) -> list[str] | None:
+    try:
+        result = subprocess.run(
+            ["git", "-C", root, *args],
+            check=True,
+            capture_output=True,
+        )
+    except (subprocess.SubprocessError, FileNotFoundError):
+        return None
+    return [path for path in result.stdout.decode("utf-8", "surrogateescape").split("\0") if path]
+
+
+def staged_history_files(root: str, history_dir: str) -> tuple[list[str], set[str]] | None:
+    """Staged history files, plus those whose working copy differs from the index.
+
+    Returns None when git is unavailable or ``root`` is not a repository.
+    """
+    history_rel = os.path.relpath(history_dir, root)
+    staged = git_paths(
+        root,
+        ["diff", "--cached", "--name-only", "--relative", "-z", "--diff-filter=ACMR", "--", history_rel],
+    )
+    if staged is None:
+        return None
+    staged = sorted(path for path in staged if path.endswith(".md"))
+    if not staged:
+        return [], set()
+    modified = git_paths(root, ["diff", "--name-only", "--relative", "-z", "--", *staged]) or []
+    return (
+        [os.path.join(root, path) for path in staged],
+        {os.path.join(root, path) for path in modified},
+    )
+
+
 def load_user_allowlist() -> list[re.Pattern[str]]:
     raw = os.getenv("SPECSTORY_GUARD_ALLOWLIST", "").strip()
     if not raw:
@@ -80,37 +136,68 @@ def load_user_allowlist() -> list[re.Pattern[str]]:
     return patterns
 
 
-def is_allowlisted(text: str, allowlist: list[re.Pattern[str]]) -> bool:
-    return any(pattern.search(text) for pattern in allowlist)
+def scan_file(
+    file_path: str,
+    patterns: list[SecretPattern],
+    allowlist: list[re.Pattern[str]],
+    max_matches_per_file: int,
+) -> list[Finding]:
+    try:
+        return scan_mapped_file(file_path, patterns, allowlist, max_matches_per_file)
+    except (OSError, ValueError) as exc:
+        print(f"specstory-guard: failed to read {file_path}: {exc}", file=sys.stderr)
+    return []
 
 
-def build_snippet(line: str, match: re.Match[str]) -> str:
-    start, end = match.span()
-    redacted = "<redacted>"
-    snippet = f"{line[:start]}{redacted}{line[end:]}".strip()
-    if len(snippet) > 200:
-        snippet = f"{snippet[:200]}..."
-    return snippet
+def scan_file_cached(
+    cache: ScanCache,
+    file_path: str,
+    key: str,
+    patterns: list[SecretPattern],
+    allowlist: list[re.Pattern[str]],
+    max_matches_per_file: int,
+) -> list[Finding]:
+    try:
+        return cache.scan_file(file_path, key, patterns, allowlist, max_matches_per_file)
+    except (OSError, ValueError) as exc:
+        print(f"specstory-guard: failed to read {file_path}: {exc}", file=sys.stderr)
+    return []
 
 
-def scan_file(
+def scan_index_blob(
+    root: str,
     file_path: str,
     patterns: list[SecretPattern],
     allowlist: list[re.Pattern[str]],
     max_matches_per_file: int,
 ) -> list[Finding]:
+    """Scan the staged copy of a file whose working copy has unstaged edits."""
+    rel_path = os.path.relpath(file_path, root)
+    try:
+        result = subprocess.run(
+            ["git", "-C", root, "cat-file", "blob", f":./{rel_path}"],
+            check=True,
+            capture_output=True,
+        )
+    except (subprocess.SubprocessError, FileNotFoundError) as exc:
+        print(f"specstory-guard: failed to read staged {file_path}: {exc}", file=sys.stderr)
+        return []
+    findings, _, _ = scan_region(file_path, result.stdout, patterns, allowlist, max_matches_per_file)
+    return findings
+
+
+def scan_file_by_line(
+    file_path: str,
+    patterns: list[SecretPattern],
+    allowlist: list[re.Pattern[str]],
+    max_matches_per_file: int,
+) -> list[Finding]:
+    """Reference scanner: every pattern on every line. Kept for benchmarks."""
     findings: list[Finding] = []
     try:
         with open(file_path, "r", encoding="utf-8", errors="replace") as handle:
             for line_number, line in enumerate(handle, start=1):
-                if is_allowlisted(line, allowlist):
-                    continue
-                for pattern in patterns:
-                    match = pattern.regex.search(line)
-                    if not match:
-                        continue
-                    if is_allowlisted(match.group(0), allowlist):
-                        continue
+                for pattern, match in match_line(line, patterns, allowlist):
                     findings.append(
                         Finding(
                             file_path=file_path,
@@ -128,6 +215,64 @@ def scan_file(
     return findings
 
 
+def scan_files_serial(
+    files: list[str],
+    root: str,
+    index_only: set[str],
+    allowlist: list[re.Pattern[str]],
+    max_matches_per_file: int,
+    max_matches: int,
+    cache: ScanCache | None,
+) -> tuple[list[Finding], int]:
+    """Scan files in order, stopping at max_matches; returns findings and files covered."""
+    findings: list[Finding] = []
+    covered = 0
+    for file_path in files:
+        covered += 1
+        if file_path in index_only:
+            file_findings = scan_index_blob(root, file_path, PATTERNS, allowlist, max_matches_per_file)
+        elif cache is not None:
+            file_findings = scan_file_cached(
+                cache=cache,
+                file_path=file_path,
+                key=os.path.relpath(file_path, root),
+                patterns=PATTERNS,
+                allowlist=allowlist,
+                max_matches_per_file=max_matches_per_file,
+            )
+        else:
+            file_findings = scan_file(
+                file_path=file_path,
+                patterns=PATTERNS,
+                allowlist=allowlist,
+                max_matches_per_file=max_matches_per_file,
+            )
+        findings.extend(file_findings)
+        if len(findings) >= max_matches:
+            break
+    return findings, covered
+
+
+def format_throughput(files: list[str], elapsed: float, workers: int, cache: ScanCache | None) -> str:
+    total_bytes = 0
+    for file_path in files:
+        try:
+            total_bytes += os.path.getsize(file_path)
+        except OSError:
+            pass
+    megabytes = total_bytes / (1024 * 1024)
+    seconds = max(elapsed, 1e-9)
+    line = (
+        f"specstory-guard: {len(files)} files, {megabytes:.1f} MB in {elapsed:.3f}s "
+        f"with {workers} worker{'s' if workers != 1 else ''} "
+        f"({megabytes / seconds:.1f} MB/s, {len(files) / seconds:.1f} files/s)"
+    )
+    if cache is not None:
+        stats = cache.stats
+        line += f"; cache: {stats['cached']} unchanged, {stats['appended']} appended, {stats['scanned']} full scans"
+    return line
+
+
 def format_findings(findings: list[Finding], output_format: str) -> str:
     if output_format == "markdown":
         lines = ["specstory-guard: potential secrets detected:"]
@@ -155,25 +300,64 @@ def main() -> int:
         return 0
 
     allowlist = ALLOWLIST + load_user_allowlist()
-    findings: list[Finding] = []
 
-    for file_path in iter_history_files(history_dir):
-        findings.extend(
-            scan_file(
-                file_path=file_path,
-                patterns=PATTERNS,
-                allowlist=allowlist,
-                max_matches_per_file=args.max_matches_per_file,
-            )
+    cache = None
+    if not args.no_cache:
+        cache_path = args.cache_path or default_cache_path(root)
+        cache = ScanCache.load(cache_path, pattern_set_version(PATTERNS, allowlist))
+
+    files: list[str] | None = None
+    index_only: set[str] = set()
+    if args.staged:
+        selection = staged_history_files(root, history_dir)
+        if selection is None:
+            print("specstory-guard: git unavailable; scanning all history files", file=sys.stderr)
+        else:
+            files, index_only = selection
+    walk_all = files is None
+    if walk_all:
+        files = sorted(iter_history_files(history_dir))
+
+    workers = args.workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    if workers > 1 and len(files) > 1:
+        findings, covered = scan_files_parallel(
+            files=files,
+            root=root,
+            patterns=PATTERNS,
+            allowlist=allowlist,
+            max_matches_per_file=args.max_matches_per_file,
+            max_matches=args.max_matches,
+            workers=workers,
+            cache=cache,
+            scan_in_parent=lambda path: (
+                scan_index_blob(root, path, PATTERNS, allowlist, args.max_matches_per_file)
+                if path in index_only
+                else None
+            ),
         )
-        if len(findings) >= args.max_matches:
-            break
+    else:
+        findings, covered = scan_files_serial(
+            files=files,
+            root=root,
+            index_only=index_only,
+            allowlist=allowlist,
+            max_matches_per_file=args.max_matches_per_file,
+            max_matches=args.max_matches,
+            cache=cache,
+        )
+    elapsed = time.perf_counter() - started
 
-    if not findings:
-        return 0
+    if cache is not None:
+        if walk_all and covered == len(files):
+            cache.prune({os.path.relpath(path, root) for path in files})
+        cache.save()
 
-    print(format_findings(findings, args.format), file=sys.stderr)
-    return 1
+    if findings:
+        print(format_findings(findings, args.format), file=sys.stderr)
+    if args.stats:
+        print(format_throughput(files[:covered], elapsed, workers, cache), file=sys.stderr)
+    return 1 if findings else 0
 
 
 if __name__ == "__main__":
@@ -2,11 +2,14 @@
 """
 Extract URLs from context surrounding a WebFetch block.
 
-This helper scans backwards from a WebFetch position to find the likely URL
-that was fetched, using multiple discovery strategies.
+This helper finds the likely URL that was fetched from the lines before a
+WebFetch position, using multiple discovery strategies. UrlContext keeps the
+same strategies up to date line by line, so a streaming parser can attribute
+each block in constant time and memory.
 """
 
 import re
+from collections import deque
 from typing import Optional, Tuple
 
 # URL pattern - matches http:// or https:// URLs
@@ -24,6 +27,18 @@ FETCH_PATTERNS = [
 # Domain pattern for domain analysis sessions - capture full domain
 DOMAIN_PATTERN = re.compile(r'\b([a-zA-Z0-9][-a-zA-Z0-9]*(?:\.[a-zA-Z0-9][-a-zA-Z0-9]*)*\.[a-zA-Z]{2,})\b')
 
+# Lines before a WebFetch block that attribution looks at
+LOOKBACK = 50
+# Of those, how far back a bare URL or a domain mention still counts
+RECENT_URL_LINES = 20
+RECENT_DOMAIN_LINES = 30
+
+# File extensions that aren't real domains
+FAKE_TLD_PATTERN = re.compile(r'\.(?:md|js|ts|py|json|yaml|yml|sh|css|html|txt|xml|toml)$')
+
+THINK_OPEN = re.compile(r'<think>')
+TASK_OPEN = re.compile(r'<tool-use[^>]*data-tool-name="Task"[^>]*>')
+
 # Common TLDs for validation
 COMMON_TLDS = ['com', 'org', 'net', 'io', 'ai', 'dev', 'co', 'it', 'de', 'fr', 'uk', 'kr', 'ua', 'tech', 'app', 'edu', 'gov', 'ac']
 
@@ -52,33 +67,26 @@ def extract_url_from_context(
         - "inferred": Inferred from domain mention
         - "unknown": Could not determine
     """
-    start_idx = max(0, webfetch_line_idx - lookback)
-    context_lines = lines[start_idx:webfetch_line_idx]
-    context = '\n'.join(context_lines)
-
-    # Strategy 1: Look for explicit fetch patterns in user messages
-    user_msg_match = find_url_in_user_message(context_lines)
-    if user_msg_match:
-        return user_msg_match, "user_message"
-
-    # Strategy 2: Look in thinking blocks
-    think_match = find_url_in_thinking(context)
-    if think_match:
-        return think_match, "thinking"
-
-    # Strategy 3: Look in Task tool prompts (subagent spawning)
-    task_match = find_url_in_task_prompt(context)
-    if task_match:
-        return task_match, "task_prompt"
-
-    # Strategy 4: Find any URL in recent context (last 20 lines)
-    recent_context = '\n'.join(context_lines[-20:])
-    urls = URL_PATTERN.findall(recent_context)
-    if urls:
-        # Filter out common non-target URLs
-        urls = [u for u in urls if not is_noise_url(u)]
-        if urls:
-            return urls[-1], "inferred"
+    context = UrlContext(lookback)
+    for line in lines[max(0, webfetch_line_idx - lookback):webfetch_line_idx]:
+        context.feed(line)
+    found, domain = context.candidates()
+    return choose_url(found, domain, result_content)
+
+
+def choose_url(
+    found: Optional[Tuple[str, str]],
+    domain: Optional[str],
+    result_content: Optional[str] = None
+) -> Tuple[Optional[str], str]:
+    """
+    Pick the URL for a WebFetch block from UrlContext.candidates().
+
+    Context strategies (user message, thinking, task prompt, recent URL) win,
+    then the result header, then a recent domain mention.
+    """
+    if found:
+        return found
 
     # Strategy 5: Infer from result content header (e.g., "# SpecStory: Company Overview")
     if result_content:
@@ -87,13 +95,200 @@ def extract_url_from_context(
             return result_url, "result_content"
 
     # Strategy 6: Infer from domain mention (for domain analysis sessions)
-    domain_match = find_domain_for_inference(context_lines[-30:])
-    if domain_match:
-        return f"https://{domain_match}", "inferred"
+    if domain:
+        return f"https://{domain}", "inferred"
 
     return None, "unknown"
 
 
+class _BlockWatch:
+    """
+    Tracks <open>...<close> blocks (think blocks, Task tool uses) across lines.
+
+    The windowed regex in the batch helpers (find_url_in_thinking() and
+    friends) pairs the first opener inside the window with the next closing
+    tag, then resumes after it. So every closing tag ends one block per
+    opener seen since the previous close, and which of those openers starts
+    the block depends on where the window begins. Each close is kept as a
+    group of (start line, url) per opener, so latest() can pick the first
+    opener inside any window. Block text is rebuilt from the recent-lines
+    ring; openers more than `lookback` lines before their close can never
+    fall inside a window and are dropped.
+    """
+
+    def __init__(self, marker: str, opening: re.Pattern, closing: str, evaluate, lookback: int):
+        self.marker = marker  # literal every opening tag starts with
+        self.opening = opening
+        self.closing = closing
+        self.evaluate = evaluate
+        self.lookback = lookback
+        self.pending: deque = deque()  # (line, column) of openers since the last close
+        self.groups: deque = deque()  # per close: [(start line, url or None), ...]
+
+    def feed(self, index: int, line: str, recent: deque):
+        if self.marker not in line and not (self.pending and self.closing in line):
+            return
+        pos = 0
+        while True:
+            match = self.opening.search(line, pos) if self.marker in line else None
+            close = line.find(self.closing, pos)
+            if close != -1 and (match is None or close < match.start()):
+                pos = close + len(self.closing)
+                if self.pending:
+                    self._close(index, line, pos, recent)
+            elif match:
+                while self.pending and index - self.pending[0][0] >= self.lookback:
+                    self.pending.popleft()
+                self.pending.append((index, match.start()))
+                pos = match.end()
+            else:
+                return
+
+    def _close(self, index: int, line: str, end: int, recent: deque):
+        group = []
+        for start_line, column in self.pending:
+            if index - start_line >= self.lookback:
+                continue
+            if start_line == index:
+                block = line[column:end]
+            else:
+                # recent[-1] is the current line
+                parts = [recent[start_line - index - 1][column:]]
+                parts.extend(recent[k - index - 1] for k in range(start_line + 1, index))
+                parts.append(line[:end])
+                block = '\n'.join(parts)
+            group.append((start_line, self.evaluate(block)))
+        self.pending.clear()
+        if group:
+            self.groups.append(group)
+        # Groups whose last opener is out of every future window are done
+        while self.groups and index + 1 - self.groups[0][-1][0] > self.lookback:
+            self.groups.popleft()
+
+    def latest(self, window_start: int) -> Optional[Tuple[int, str]]:
+        """(start line, url) of the last block with a URL in a window starting at window_start."""
+        for group in reversed(self.groups):
+            starts = [entry for entry in group if entry[0] >= window_start]
+            if not starts:
+                return None  # earlier groups only have earlier openers
+            if starts[0][1]:
+                return starts[0]
+        return None
+
+
+class UrlContext:
+    """
+    Incrementally maintained URL-attribution state for one history file.
+
+    feed() every line in order; candidates() then answers what
+    extract_url_from_context() would for a WebFetch block on the next line.
+    Each strategy keeps only its latest candidate and the line it came from,
+    so answering is O(1), and memory is a ring of the last `lookback` lines.
+    Lines without any marker only enter the ring.
+    """
+
+    def __init__(self, lookback: int = LOOKBACK):
+        self.lookback = lookback
+        self.line_count = 0
+        self._recent: deque = deque(maxlen=lookback)
+        # Strategy 1: last message boundary, and the verdict for the latest
+        # user header as (header line, boundary line, url)
+        self._boundary: Optional[int] = None
+        self._user: Optional[Tuple[int, Optional[int], Optional[str]]] = None
+        # Strategies 2 and 3
+        self._think = _BlockWatch('<think>', THINK_OPEN, '</think>', url_in_think_block, lookback)
+        self._task = _BlockWatch('<tool-use', TASK_OPEN, '</tool-use>', url_in_task_block, lookback)
+        # Strategy 4: (line, url) of the latest non-noise URL
+        self._url: Optional[Tuple[int, str]] = None
+
+    def feed(self, line: str):
+        """Consume the next line of the file."""
+        index = self.line_count
+        self.line_count += 1
+        self._recent.append(line)
+        # Nothing below can match a line without tags, headers, rules or URLs
+        if '<' not in line and '_**' not in line and '://' not in line and not line.startswith('---'):
+            return
+
+        if '_**User' in line:
+            boundary = self._boundary
+            if boundary is None or index - boundary >= self.lookback:
+                self._user = (index, None, None)
+            else:
+                # User headers inside the segment are skipped, as in find_url_in_user_message()
+                segment = [self._recent[k - index - 1] for k in range(boundary + 1, index)]
+                content = '\n'.join(text for text in segment if '_**User' not in text)
+                self._user = (index, boundary, url_in_user_text(content))
+        elif line.startswith(('_**', '---')):
+            self._boundary = index
+
+        self._think.feed(index, line, self._recent)
+        self._task.feed(index, line, self._recent)
+
+        if '://' in line:
+            urls = [u for u in URL_PATTERN.findall(line) if not is_noise_url(u)]
+            if urls:
+                self._url = (index, urls[-1])
+
+    def feed_plain(self, text: str):
+        """
+        Consume a run of whole lines that contain no tags, headers, rules or
+        URLs; only the last `lookback` of them are kept for the ring.
+        """
+        if not text:
+            return
+        count = text.count('\n') + (not text.endswith('\n'))
+        self.line_count += count
+        tail_start = 0
+        if count > self.lookback:
+            search_end = len(text) - 1  # the run's own final newline ends its last line
+            for _ in range(self.lookback):
+                tail_start = text.rfind('\n', 0, search_end) + 1
+                search_end = tail_start - 1
+        parts = text[tail_start:].split('\n')
+        last = parts.pop()
+        self._recent.extend([part + '\n' for part in parts])
+        if last:
+            self._recent.append(last)
+
+    def candidates(self) -> Tuple[Optional[Tuple[str, str]], Optional[str]]:
+        """
+        Attribution for a block starting at the next line.
+
+        Returns ((url, source) from the context strategies or None, and the
+        domain-mention fallback or None); see choose_url().
+        """
+        window_start = max(0, self.line_count - self.lookback)
+
+        # Strategy 1: Look for explicit fetch patterns in user messages
+        if self._user:
+            header, boundary, url = self._user
+            if url and header >= window_start and boundary is not None and boundary >= window_start:
+                return (url, "user_message"), None
+
+        # Strategy 2: Look in thinking blocks
+        last = self._think.latest(window_start)
+        if last:
+            return (last[1], "thinking"), None
+
+        # Strategy 3: Look in Task tool prompts (subagent spawning)
+        last = self._task.latest(window_start)
+        if last:
+            return (last[1], "task_prompt"), None
+
+        # Strategy 4: Find any URL in recent context
+        if self._url and self._url[0] >= max(window_start, self.line_count - RECENT_URL_LINES):
+            return (self._url[1], "inferred"), None
+
+        # Strategy 6 input: most recent domain mention
+        recent = min(len(self._recent), RECENT_DOMAIN_LINES)
+        for offset in range(1, recent + 1):
+            domain = domain_in_line(self._recent[-offset])
+            if domain:
+                return None, domain
+        return None, None
+
+
 def infer_url_from_result(content: str) -> Optional[str]:
     """
     Infer the URL from the WebFetch result content.
@@ -154,40 +349,52 @@ def find_url_in_user_message(lines: list[str]) -> Optional[str]:
         if in_user_msg:
             if line.startswith('_**') or line.startswith('---'):
                 # End of user message block, check what we found
-                content = '\n'.join(reversed(user_msg_content))
-                for pattern in FETCH_PATTERNS:
-                    match = pattern.search(content)
-                    if match:
-                        return match.group(1) if match.lastindex else match.group(0)
-                # Also try simple URL extraction
-                urls = URL_PATTERN.findall(content)
-                if urls:
-                    return urls[0]
-                break
+                return url_in_user_text('\n'.join(reversed(user_msg_content)))
             user_msg_content.append(line)
 
     return None
 
 
+def url_in_user_text(content: str) -> Optional[str]:
+    """URL a user message asked to fetch, or the first URL in it."""
+    for pattern in FETCH_PATTERNS:
+        match = pattern.search(content)
+        if match:
+            return match.group(1) if match.lastindex else match.group(0)
+    # Also try simple URL extraction
+    urls = URL_PATTERN.findall(content)
+    if urls:
+        return urls[0]
+    return None
+
+
 def find_url_in_thinking(context: str) -> Optional[str]:
     """Find URL mentioned in <think> blocks."""
     think_pattern = re.compile(r'<think>.*?</think>', re.DOTALL)
     think_blocks = think_pattern.findall(context)
 
     for block in reversed(think_blocks):
-        # Look for fetch-related URL mentions
-        for pattern in FETCH_PATTERNS:
-            match = pattern.search(block)
-            if match:
-                return match.group(1) if match.lastindex else match.group(0)
-
-        # Try simple URL extraction
-        urls = URL_PATTERN.findall(block)
-        if urls:
-            urls = [u for u in urls if not is_noise_url(u)]
-            if urls:
-                return urls[-1]
+        url = url_in_think_block(block)
+        if url:
+            return url
+
+    return None
+
+
+def url_in_think_block(block: str) -> Optional[str]:
+    """URL from one <think> block."""
+    # Look for fetch-related URL mentions
+    for pattern in FETCH_PATTERNS:
+        match = pattern.search(block)
+        if match:
+            return match.group(1) if match.lastindex else match.group(0)
 
+    # Try simple URL extraction
+    urls = URL_PATTERN.findall(block)
+    if urls:
+        urls = [u for u in urls if not is_noise_url(u)]
+        if urls:
+            return urls[-1]
     return None
 
 
@@ -200,23 +407,31 @@ def find_url_in_task_prompt(context: str) -> Optional[str]:
     task_blocks = task_pattern.findall(context)
 
     for block in reversed(task_blocks):
-        urls = URL_PATTERN.findall(block)
+        url = url_in_task_block(block)
+        if url:
+            return url
+
+    return None
+
+
+def url_in_task_block(block: str) -> Optional[str]:
+    """URL (or https:// + domain) from one Task tool-use block."""
+    urls = URL_PATTERN.findall(block)
+    if urls:
+        urls = [u for u in urls if not is_noise_url(u)]
         if urls:
-            urls = [u for u in urls if not is_noise_url(u)]
-            if urls:
-                return urls[-1]
-
-        # Also look for domain patterns in task prompts
-        domains = DOMAIN_PATTERN.findall(block)
-        if domains:
-            # Reconstruct domain from tuple (DOMAIN_PATTERN captures groups)
-            for domain_parts in domains:
-                if isinstance(domain_parts, tuple):
-                    continue
-                domain = domain_parts
-                if not is_noise_domain(domain):
-                    return f"https://{domain}"
+            return urls[-1]
 
+    # Also look for domain patterns in task prompts
+    domains = DOMAIN_PATTERN.findall(block)
+    if domains:
+        # Reconstruct domain from tuple (DOMAIN_PATTERN captures groups)
+        for domain_parts in domains:
+            if isinstance(domain_parts, tuple):
+                continue
+            domain = domain_parts
+            if not is_noise_domain(domain):
+                return f"https://{domain}"
     return None
 
 
@@ -224,15 +439,23 @@ def find_domain_for_inference(lines: list[str]) -> Optional[str]:
     """Find a domain that was likely being analyzed."""
     # Look for domain patterns in recent lines
     for line in reversed(lines):
-        # Skip tool output lines
-        if '<tool-use' in line or '</tool-use>' in line:
-            continue
+        domain = domain_in_line(line)
+        if domain:
+            return domain
 
-        domains = DOMAIN_PATTERN.findall(line)
-        for domain in domains:
-            if isinstance(domain, str) and not is_noise_domain(domain):
-                return domain
+    return None
+
+
+def domain_in_line(line: str) -> Optional[str]:
+    """First non-noise domain on a line, skipping tool-use tag lines."""
+    # Skip tool output lines
+    if '<tool-use' in line or '</tool-use>' in line:
+        return None
 
+    domains = DOMAIN_PATTERN.findall(line)
+    for domain in domains:
+        if isinstance(domain, str) and not is_noise_domain(domain):
+            return domain
     return None
 
 
@@ -253,15 +476,7 @@ def is_noise_url(url: str) -> bool:
         return True
 
     # Check for file extensions that aren't real domains
-    fake_tld_patterns = [
-        r'\.md$', r'\.js$', r'\.ts$', r'\.py$', r'\.json$', r'\.yaml$', r'\.yml$',
-        r'\.sh$', r'\.css$', r'\.html$', r'\.txt$', r'\.xml$', r'\.toml$',
-    ]
-    for pattern in fake_tld_patterns:
-        if re.search(pattern, url_lower):
-            return True
-
-    return False
+    return bool(FAKE_TLD_PATTERN.search(url_lower))
 
 
 def is_noise_domain(domain: str) -> bool:
@@ -3,6 +3,7 @@
 import random
 import re
 from collections import defaultdict
+from typing import Optional
 
 from .models import SessionAnalysis
 
@@ -67,8 +68,33 @@ def get_leaderboard_title(avg_score: float) -> str:
         return "Laser-Focused Legend"
 
 
-def format_report(analyses: list[SessionAnalysis], args) -> str:
-    """Format the analysis results as a human-readable report."""
+def format_trends(trends: dict) -> list[str]:
+    """Report lines for per-week and per-author aggregates (see session_trends)."""
+    lines = ["WEEKLY TRENDS", "-" * 60]
+    for row in trends["by_week"]:
+        bar = "#" * round(row["average"] / 5)
+        lines.append(f"  {row['key']:<10} {row['average']:>5.0f}/100 avg  peak {row['peak']:>3}  "
+                     f"{row['yak_shaves']:>3}/{row['sessions']:<4} yak shaves  {bar}")
+    lines.append("")
+
+    authors = [row for row in trends["by_author"] if row["key"] != "unknown"]
+    if authors:
+        lines.append("YAK SHAVES BY AUTHOR")
+        lines.append("-" * 60)
+        for row in sorted(authors, key=lambda r: r["average"], reverse=True):
+            display_name = row["key"][:25] + "..." if len(row["key"]) > 25 else row["key"]
+            lines.append(f"  {display_name:<28} {row['average']:>5.0f}/100 avg  "
+                         f"{row['yak_shaves']}/{row['sessions']} yak shaves")
+        lines.append("")
+    return lines
+
+
+def format_report(analyses: list[SessionAnalysis], args, trends: Optional[dict] = None) -> str:
+    """
+    Format the analysis results as a human-readable report.
+
+    ``trends`` (from session_trends) adds per-week and per-author sections.
+    """
     if not analyses:
         return "No sessions found in the specified date range. Your yaks remain unshaved."
 
@@ -134,6 +160,9 @@ def format_report(analyses: list[SessionAnalysis], args) -> str:
             lines.append(f"     Avg: {avg:.0f}/100 | Peak: {peak}/100 | Sessions: {count}")
             lines.append("")
 
+    if trends:
+        lines.extend(format_trends(trends))
+
     # Dynamic sizing based on total sessions
     num_sessions = len(analyses)
     if num_sessions > 100:
@@ -1,47 +1,96 @@
 """Scoring and analysis logic for yak shave detection."""
 
+import io
+import re
 import sys
 from dataclasses import asdict
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterable, Optional
 
-from .models import DomainShift, SessionAnalysis
+from .models import DomainShift, SessionAnalysis, SessionEvent
 from .parser import (
+    MESSAGE_ROLES,
     parse_date_from_filename,
     extract_title_from_filename,
-    extract_session_id,
-    extract_messages,
-    extract_file_refs,
-    extract_tool_calls,
+    clean_message_text,
+    tokenize_session,
     summarize_message,
     detect_goal,
 )
 
 
+# Domain keywords in priority order: a ref belongs to the first domain
+# with any keyword in it, and to "code" if none match
+DOMAIN_KEYWORDS = [
+    ("testing", ["test", "spec", "__test__"]),
+    ("documentation", ["doc", "readme", "md", "changelog"]),
+    ("devops", ["ci", "github", "workflow", "jenkins", "docker", "k8s"]),
+    ("configuration", ["config", "env", "settings", "yaml", "json", "toml"]),
+    ("frontend", ["ui", "component", "page", "view", "css", "style", "tsx", "jsx"]),
+    ("backend", ["api", "server", "route", "controller", "handler"]),
+    ("database", ["db", "model", "schema", "migration", "sql"]),
+    ("auth", ["auth", "login", "session", "token"]),
+    ("tooling", ["script", "bin", "tool", "cli"]),
+]
+DEFAULT_DOMAIN = "code"
+
+# Escalation level per tool type (unknown tools count as 2)
+ESCALATION_LEVELS = {
+    "Read": 1, "Grep": 1, "Glob": 1,
+    "Edit": 2, "Write": 3,
+    "Bash": 3, "shell": 3,
+    "WebFetch": 4, "WebSearch": 4,
+    "Task": 5,
+}
+
+
+class DomainClassifier:
+    """
+    Classify file refs into domains with one compiled pattern.
+
+    The pattern is a lookahead alternation tried at every position of the
+    ref, one named group per domain in priority order. The highest-priority
+    domain hit anywhere wins, exactly like checking the keyword lists one
+    after another. Results are memoized, since refs repeat across sessions.
+    """
+
+    def __init__(self, keywords: list[tuple[str, list[str]]] = DOMAIN_KEYWORDS,
+                 default: str = DEFAULT_DOMAIN):
+        self.domains = [domain for domain, _ in keywords]
+        self.default = default
+        alternation = "|".join(
+            f"(?P<d{rank}>{'|'.join(re.escape(word) for word in words)})"
+            for rank, (_, words) in enumerate(keywords)
+        )
+        self._pattern = re.compile(f"(?=(?:{alternation}))")
+        self._cache: dict[str, str] = {}
+
+    def rank(self, file_ref: str) -> int:
+        """Priority index of the ref's domain (len(domains) for the default)."""
+        best = len(self.domains)
+        for match in self._pattern.finditer(file_ref.lower()):
+            rank = int(match.lastgroup[1:])
+            if rank < best:
+                best = rank
+                if best == 0:
+                    break
+        return best
+
+    def classify(self, file_ref: str) -> str:
+        domain = self._cache.get(file_ref)
+        if domain is None:
+            rank = self.rank(file_ref)
+            domain = self.domains[rank] if rank < len(self.domains) else self.default
+            self._cache[file_ref] = domain
+        return domain
+
+
+DEFAULT_CLASSIFIER = DomainClassifier()
+
+
 def infer_domain(file_ref: str) -> str:
     """Infer the domain/area from a file reference."""
-    ref_lower = file_ref.lower()
-
-    if any(x in ref_lower for x in ["test", "spec", "__test__"]):
-        return "testing"
-    if any(x in ref_lower for x in ["doc", "readme", "md", "changelog"]):
-        return "documentation"
-    if any(x in ref_lower for x in ["ci", "github", "workflow", "jenkins", "docker", "k8s"]):
-        return "devops"
-    if any(x in ref_lower for x in ["config", "env", "settings", "yaml", "json", "toml"]):
-        return "configuration"
-    if any(x in ref_lower for x in ["ui", "component", "page", "view", "css", "style", "tsx", "jsx"]):
-        return "frontend"
-    if any(x in ref_lower for x in ["api", "server", "route", "controller", "handler"]):
-        return "backend"
-    if any(x in ref_lower for x in ["db", "model", "schema", "migration", "sql"]):
-        return "database"
-    if any(x in ref_lower for x in ["auth", "login", "session", "token"]):
-        return "auth"
-    if any(x in ref_lower for x in ["script", "bin", "tool", "cli"]):
-        return "tooling"
-
-    return "code"
+    return DEFAULT_CLASSIFIER.classify(file_ref)
 
 
 def detect_domain_shifts(file_refs: list[str], messages: list) -> list[DomainShift]:
@@ -68,124 +117,214 @@ def detect_domain_shifts(file_refs: list[str], messages: list) -> list[DomainShi
     return shifts
 
 
-def compute_yak_shave_score(analysis: SessionAnalysis) -> tuple[int, dict]:
-    """
-    Compute yak shave score (0-100) based on various factors.
-    Returns (score, breakdown_dict)
-    """
-    breakdown = {}
+# Feature-matrix columns, the inputs of factor_scores
+FEATURES = ("domain_shifts", "initial_words", "total_messages", "max_escalation", "domain_count")
 
-    # Factor 1: Domain shifts (40% weight)
-    num_shifts = len(analysis.domain_shifts)
-    shift_score = min(100, num_shifts * 25)  # Each shift adds 25 points
-    breakdown["domain_shifts"] = {"raw": num_shifts, "score": shift_score, "weight": 0.4}
+# Factor weights of the yak shave score
+WEIGHTS = {"domain_shifts": 0.4, "length_ratio": 0.2, "tool_cascade": 0.15, "domain_diversity": 0.25}
 
-    # Factor 2: Session length vs initial message complexity (20% weight)
-    initial_words = len(analysis.initial_message.split())
-    total_messages = analysis.user_message_count + analysis.agent_message_count
 
-    # Simple request + long session = high yak shave
-    if initial_words < 20 and total_messages > 10:
-        length_score = min(100, (total_messages - 10) * 10)
-    elif initial_words < 50 and total_messages > 20:
-        length_score = min(100, (total_messages - 20) * 5)
-    else:
-        length_score = 0
-    breakdown["length_ratio"] = {"raw": f"{initial_words}w/{total_messages}m", "score": length_score, "weight": 0.2}
-
-    # Factor 3: Tool type cascade (15% weight)
-    # Read -> Edit -> Create is more escalation than just Read
-    tool_types = set(analysis.tool_calls.keys())
-    escalation_levels = {
-        "Read": 1, "Grep": 1, "Glob": 1,
-        "Edit": 2, "Write": 3,
-        "Bash": 3, "shell": 3,
-        "WebFetch": 4, "WebSearch": 4,
-        "Task": 5,
-    }
-    max_escalation = max((escalation_levels.get(t, 2) for t in tool_types), default=1)
-    tool_score = (max_escalation - 1) * 25
-    breakdown["tool_cascade"] = {"raw": list(tool_types), "score": tool_score, "weight": 0.15}
+def session_features(analysis: SessionAnalysis,
+                     classifier: DomainClassifier = DEFAULT_CLASSIFIER) -> list[int]:
+    """One feature-matrix row for a session (see FEATURES)."""
+    return [
+        len(analysis.domain_shifts),
+        len(analysis.initial_message.split()),
+        analysis.user_message_count + analysis.agent_message_count,
+        # Read -> Edit -> Create is more escalation than just Read
+        max((ESCALATION_LEVELS.get(t, 2) for t in analysis.tool_calls), default=1),
+        len({classifier.classify(ref) for ref in analysis.file_refs}),
+    ]
 
-    # Factor 4: File reference diversity (25% weight)
-    domains = set(infer_domain(ref) for ref in analysis.file_refs)
-    domain_score = min(100, (len(domains) - 1) * 25) if domains else 0
-    breakdown["domain_diversity"] = {"raw": list(domains), "score": domain_score, "weight": 0.25}
 
-    # Weighted total
-    total = (
-        shift_score * 0.4 +
-        length_score * 0.2 +
-        tool_score * 0.15 +
-        domain_score * 0.25
-    )
+def _choose(condition, if_true, if_false):
+    return if_true if condition else if_false
 
-    return int(total), breakdown
 
+def factor_scores(shifts, words, messages, escalation, domains,
+                  minimum=min, where=_choose) -> dict:
+    """
+    Score (0-100) of each weighted factor from a session's features.
 
-def analyze_session(filepath: Path) -> Optional[SessionAnalysis]:
-    """Analyze a single specstory session file."""
-    try:
-        content = filepath.read_text(encoding="utf-8")
-    except Exception as e:
-        print(f"Error reading {filepath}: {e}", file=sys.stderr)
-        return None
+    Takes plain ints by default; pass numpy.minimum and numpy.where to
+    score whole feature columns at once with the same formulas.
+    """
+    return {
+        # Each shift adds 25 points
+        "domain_shifts": minimum(100, shifts * 25),
+        # Simple request + long session = high yak shave
+        "length_ratio": where(
+            (words < 20) & (messages > 10), minimum(100, (messages - 10) * 10),
+            where((words < 50) & (messages > 20), minimum(100, (messages - 20) * 5), 0),
+        ),
+        "tool_cascade": (escalation - 1) * 25,
+        "domain_diversity": where(domains > 0, minimum(100, (domains - 1) * 25), 0),
+    }
 
-    filename = filepath.name
-    messages = extract_messages(content)
 
-    if not messages:
-        return None
+def weighted_total(scores: dict):
+    """Weighted sum of factor scores, before truncating to the final score."""
+    return sum(scores[factor] * weight for factor, weight in WEIGHTS.items())
 
-    # Get initial user message
-    initial_msg = ""
-    for role, _, text in messages:
-        if role == "user":
-            initial_msg = text
-            break
 
-    if not initial_msg:
-        return None
+def score_breakdown(analysis: SessionAnalysis, scores: dict,
+                    classifier: DomainClassifier = DEFAULT_CLASSIFIER) -> dict:
+    """Raw value, score and weight per factor, for reports."""
+    total_messages = analysis.user_message_count + analysis.agent_message_count
+    raw = {
+        "domain_shifts": len(analysis.domain_shifts),
+        "length_ratio": f"{len(analysis.initial_message.split())}w/{total_messages}m",
+        "tool_cascade": list(set(analysis.tool_calls.keys())),
+        "domain_diversity": list(set(classifier.classify(ref) for ref in analysis.file_refs)),
+    }
+    return {
+        factor: {"raw": raw[factor], "score": int(scores[factor]), "weight": weight}
+        for factor, weight in WEIGHTS.items()
+    }
+
+
+def compute_yak_shave_score(analysis: SessionAnalysis,
+                            classifier: DomainClassifier = DEFAULT_CLASSIFIER) -> tuple[int, dict]:
+    """
+    Compute yak shave score (0-100) based on various factors.
+    Returns (score, breakdown_dict)
+    """
+    scores = factor_scores(*session_features(analysis, classifier))
+    return int(weighted_total(scores)), score_breakdown(analysis, scores, classifier)
 
-    # Count messages by role
-    user_count = sum(1 for r, _, _ in messages if r == "user")
-    agent_count = sum(1 for r, _, _ in messages if r in ("agent", "assistant"))
 
-    # Extract file refs and tool calls
-    file_refs = extract_file_refs(content)
-    tool_calls = extract_tool_calls(content)
+class SessionTally:
+    """
+    Running totals for one session, fed tokenizer events in document order.
 
-    # Detect domain shifts
-    domain_shifts = detect_domain_shifts(file_refs, messages)
+    Only the first user message is kept in full (it drives goal detection);
+    other messages contribute their role and first line, so memory stays
+    flat however long the session is.
+    """
 
-    # Get last message for "ended with"
-    last_agent_msg = ""
-    for role, _, text in reversed(messages):
+    def __init__(self, on_message: Optional[Callable[[str, str, str], None]] = None):
+        """
+        Args:
+            on_message: Called with (role, timestamp, text) for every complete
+                message; forces full message text to be collected
+        """
+        self.session_id = "unknown"
+        self.headers: list[tuple[str, str]] = []  # (role, timestamp) per message
+        self.file_refs: dict[str, None] = {}  # ordered set
+        self.tool_calls: dict[str, int] = {}
+        self.initial_message: Optional[str] = None
+        self.last_agent_line: Optional[str] = None
+        self._on_message = on_message
+        self._role = ""
+        self._timestamp = ""
+        self._lines: list[str] = []
+        self._first_line: Optional[str] = None
+        self._keep_text = False
+
+    def feed(self, event: SessionEvent):
+        """Consume one tokenizer event."""
+        kind = event.kind
+        if kind == "text":
+            if self._keep_text:
+                self._lines.append(event.value)
+            if self._first_line is None:
+                stripped = event.value.strip()
+                if stripped:
+                    self._first_line = stripped.split("\n", 1)[0].strip()
+        elif kind == "message_start":
+            self._role = event.role
+            self._timestamp = event.timestamp
+            self._lines = []
+            self._first_line = None
+            self._keep_text = self._on_message is not None or (
+                event.role == "user" and self.initial_message is None)
+        elif kind == "message_end":
+            self._end_message()
+        elif kind == "tool_open":
+            self.tool_calls[event.value] = self.tool_calls.get(event.value, 0) + 1
+        elif kind == "file_ref":
+            self.file_refs[event.value] = None
+        elif kind == "session" and self.session_id == "unknown":
+            self.session_id = event.value
+
+    def _end_message(self):
+        role = self._role
+        if role not in MESSAGE_ROLES:
+            return
+        self.headers.append((role, self._timestamp))
+        if self._keep_text:
+            text = clean_message_text("\n".join(self._lines))
+            if role == "user" and self.initial_message is None:
+                self.initial_message = text
+            if self._on_message:
+                self._on_message(role, self._timestamp, text)
         if role in ("agent", "assistant"):
-            last_agent_msg = text
-            break
-
-    analysis = SessionAnalysis(
-        filename=filename,
-        session_id=extract_session_id(content),
-        timestamp=str(parse_date_from_filename(filename) or "unknown"),
-        title=extract_title_from_filename(filename),
-        initial_message=initial_msg,
-        initial_message_summary=summarize_message(initial_msg),
-        detected_goal=detect_goal(initial_msg),
-        user_message_count=user_count,
-        agent_message_count=agent_count,
-        file_refs=file_refs,
-        tool_calls=tool_calls,
-        domain_shifts=[asdict(s) for s in domain_shifts],
-        started_with=summarize_message(initial_msg, 300),
-        ended_with=summarize_message(last_agent_msg, 300) if last_agent_msg else "",
-    )
-
-    # Compute score
-    score, breakdown = compute_yak_shave_score(analysis)
-    analysis.yak_shave_score = score
-    analysis.score_breakdown = breakdown
-    analysis.is_yak_shave = score > 40
-
-    return analysis
+            self.last_agent_line = self._first_line or ""
+        self._lines = []
+
+    def analysis(self, filename: str, score: bool = True) -> Optional[SessionAnalysis]:
+        """
+        Build the SessionAnalysis once all events have been fed.
+
+        With score=False the score fields are left at their defaults, for
+        callers that score many sessions at once with score_sessions.
+        """
+        if not self.headers or not self.initial_message:
+            return None
+
+        initial_msg = self.initial_message
+        user_count = sum(1 for r, _ in self.headers if r == "user")
+        agent_count = sum(1 for r, _ in self.headers if r in ("agent", "assistant"))
+
+        file_refs = list(self.file_refs)
+        domain_shifts = detect_domain_shifts(file_refs, self.headers)
+
+        analysis = SessionAnalysis(
+            filename=filename,
+            session_id=self.session_id,
+            timestamp=str(parse_date_from_filename(filename) or "unknown"),
+            title=extract_title_from_filename(filename),
+            initial_message=initial_msg,
+            initial_message_summary=summarize_message(initial_msg),
+            detected_goal=detect_goal(initial_msg),
+            user_message_count=user_count,
+            agent_message_count=agent_count,
+            file_refs=file_refs,
+            tool_calls=dict(self.tool_calls),
+            domain_shifts=[asdict(s) for s in domain_shifts],
+            started_with=summarize_message(initial_msg, 300),
+            ended_with=summarize_message(self.last_agent_line, 300) if self.last_agent_line else "",
+        )
+
+        if score:
+            total, breakdown = compute_yak_shave_score(analysis)
+            analysis.yak_shave_score = total
+            analysis.score_breakdown = breakdown
+            analysis.is_yak_shave = total > 40
+
+        return analysis
+
+
+def analyze_events(filename: str, events: Iterable[SessionEvent],
+                   on_message: Optional[Callable[[str, str, str], None]] = None,
+                   score: bool = True) -> Optional[SessionAnalysis]:
+    """Analyze a session from its tokenizer events in a single pass."""
+    tally = SessionTally(on_message)
+    for event in events:
+        tally.feed(event)
+    return tally.analysis(filename, score)
+
+
+def analyze_session(filepath: Path, score: bool = True) -> Optional[SessionAnalysis]:
+    """Analyze a single specstory session file, streaming it line by line."""
+    try:
+        with open(filepath, "r", encoding="utf-8") as handle:
+            return analyze_events(filepath.name, tokenize_session(handle), score=score)
+    except (OSError, UnicodeError) as e:
+        print(f"Error reading {filepath}: {e}", file=sys.stderr)
+        return None
+
+
+def analyze_content(filename: str, content: str) -> Optional[SessionAnalysis]:
+    """Analyze session content that is already in memory."""
+    return analyze_events(filename, tokenize_session(io.StringIO(content)))
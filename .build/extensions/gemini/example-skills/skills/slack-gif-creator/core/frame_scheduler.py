@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Frame Scheduler - Render animation frames across a process pool.
+
+Most templates draw each frame as a pure function of the frame index (plus
+configuration fixed before the loop), so frames can be rendered in any order
+on any core. Templates declare that function and hand it to render_frames(),
+which renders in parallel and reassembles the frames in order.
+
+Workers are forked, so the per-frame function may be a closure over the
+template's local state (random piece layouts, default object data, ...) and
+never needs to be pickled. Rendered pixels are written straight into a
+shared-memory buffer instead of being pickled back to the parent.
+"""
+
+import multiprocessing as mp
+import os
+from multiprocessing import shared_memory
+from typing import Callable, Optional
+
+import numpy as np
+from PIL import Image
+
+
+# Set in the parent just before forking; inherited by the workers
+_ACTIVE_JOB: Optional[tuple[Callable[[int], Image.Image | np.ndarray], np.ndarray]] = None
+
+
+def parallel_available() -> bool:
+    """True when frames can be rendered in forked worker processes."""
+    return 'fork' in mp.get_all_start_methods()
+
+
+def _render_into_buffer(index: int):
+    """Worker: render one frame into its slot of the shared buffer."""
+    render_frame, buffer = _ACTIVE_JOB
+    pixels = np.asarray(render_frame(index))
+    if pixels.shape != buffer.shape[1:]:
+        raise ValueError(
+            f"Frame {index} has shape {pixels.shape}, expected {buffer.shape[1:]}; "
+            "all frames must share size and mode"
+        )
+    buffer[index] = pixels
+
+
+def render_frames(render_frame: Callable[[int], Image.Image | np.ndarray], num_frames: int,
+                  workers: Optional[int] = None, stateful: bool = False) -> list:
+    """
+    Render frames 0..num_frames-1, in parallel when possible.
+
+    Args:
+        render_frame: Function of the frame index returning a PIL Image or
+            numpy array. Must be pure: it may not depend on other frames
+            having been rendered before it.
+        num_frames: Number of frames
+        workers: Worker processes (None or 1 = serial, 0 = one per CPU)
+        stateful: Set for renderers that carry state from frame to frame
+            (e.g. particle systems); always renders serially
+
+    Returns:
+        List of frames in index order, of the same type render_frame returns
+    """
+    global _ACTIVE_JOB
+
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    if (stateful or workers is None or workers <= 1 or num_frames < 2
+            or not parallel_available()):
+        return [render_frame(i) for i in range(num_frames)]
+
+    # Render the first frame here to learn the frame shape
+    first = render_frame(0)
+    sample = np.asarray(first)
+    shape = (num_frames,) + sample.shape
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape)) * sample.itemsize))
+    try:
+        buffer = np.ndarray(shape, dtype=sample.dtype, buffer=shm.buf)
+        buffer[0] = sample
+
+        _ACTIVE_JOB = (render_frame, buffer)
+        try:
+            context = mp.get_context('fork')
+            workers = min(workers, num_frames - 1)
+            chunksize = max(1, (num_frames - 1) // (workers * 4))
+            with context.Pool(workers) as pool:
+                pool.map(_render_into_buffer, range(1, num_frames), chunksize=chunksize)
+        finally:
+            _ACTIVE_JOB = None
+
+        if isinstance(first, Image.Image):
+            frames = [first] + [Image.fromarray(buffer[i].copy())
+                                for i in range(1, num_frames)]
+        else:
+            frames = [first] + [buffer[i].copy() for i in range(1, num_frames)]
+        del buffer
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return frames
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+GIF Writer - Incremental GIF encoding with bounded memory.
+
+Frames are quantized against a fixed palette and appended to the output file
+as they are produced, so only the frame currently being encoded is held in
+memory. Pillow's C LZW encoder does the compression: each frame is encoded as
+a standalone single-frame GIF in memory and its image block is spliced into
+the output stream.
+"""
+
+import io
+import struct
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+import numpy as np
+from PIL import Image
+
+
+class ReservoirSampler:
+    """
+    Uniform reservoir sample of pixels across a stream of frames.
+
+    Used for palette construction when the frame count is not known up
+    front: memory stays at ``capacity`` pixels no matter how many frames
+    are fed in.
+    """
+
+    def __init__(self, capacity: int = 65536, seed: int = 0):
+        """
+        Initialize sampler.
+
+        Args:
+            capacity: Maximum number of pixels kept in the sample
+            seed: Random seed (sampling is deterministic for a given stream)
+        """
+        self.capacity = capacity
+        self.seen = 0
+        self._rng = np.random.default_rng(seed)
+        self._pixels = np.empty((capacity, 3), dtype=np.uint8)
+        self._filled = 0
+
+    def add(self, frame: np.ndarray | Image.Image):
+        """Add all pixels of a frame to the sample."""
+        if isinstance(frame, Image.Image):
+            frame = np.asarray(frame.convert('RGB'))
+        pixels = frame.reshape(-1, 3)
+
+        # Fill phase: take pixels verbatim until the reservoir is full
+        if self._filled < self.capacity:
+            take = min(self.capacity - self._filled, len(pixels))
+            self._pixels[self._filled:self._filled + take] = pixels[:take]
+            self._filled += take
+            self.seen += take
+            pixels = pixels[take:]
+            if not len(pixels):
+                return
+
+        # Replacement phase (Algorithm R, vectorized per frame): pixel number
+        # n replaces a random slot with probability capacity / n
+        positions = self.seen + np.arange(1, len(pixels) + 1)
+        accept = self._rng.random(len(pixels)) < (self.capacity / positions)
+        if accept.any():
+            slots = self._rng.integers(0, self.capacity, size=int(accept.sum()))
+            self._pixels[slots] = pixels[accept]
+        self.seen += len(pixels)
+
+    @property
+    def pixels(self) -> np.ndarray:
+        """Sampled pixels as an (N, 3) uint8 array."""
+        return self._pixels[:self._filled]
+
+
+def _skip_sub_blocks(data: bytes, pos: int) -> int:
+    """Return the offset just past a chain of GIF data sub-blocks."""
+    while True:
+        size = data[pos]
+        pos += 1
+        if size == 0:
+            return pos
+        pos += size
+
+
+def _split_single_frame_gif(data: bytes) -> tuple[bytes, bytes, bytes]:
+    """
+    Split a single-frame GIF produced by Pillow into its parts.
+
+    Returns:
+        Tuple of (global color table, image descriptor, LZW image data)
+    """
+    if data[:6] not in (b'GIF87a', b'GIF89a'):
+        raise ValueError("Not a GIF stream")
+
+    packed = data[10]
+    pos = 13
+    color_table = b''
+    if packed & 0x80:
+        table_size = 3 * (2 ** ((packed & 0x07) + 1))
+        color_table = data[pos:pos + table_size]
+        pos += table_size
+
+    while pos < len(data):
+        block = data[pos]
+        if block == 0x21:  # Extension: label byte, then sub-blocks
+            pos = _skip_sub_blocks(data, pos + 2)
+        elif block == 0x2C:  # Image descriptor
+            descriptor = data[pos:pos + 10]
+            start = pos + 10
+            if descriptor[9] & 0x80:
+                start += 3 * (2 ** ((descriptor[9] & 0x07) + 1))
+            end = _skip_sub_blocks(data, start + 1)  # +1 for LZW min code size
+            return color_table, data[pos:start], data[start:end]
+        else:
+            break
+
+    raise ValueError("GIF stream contains no image")
+
+
+def _color_table(palette_data: list[int]) -> bytes:
+    """Build a GIF color table (power-of-two length) from flat RGB palette data."""
+    raw = bytes(palette_data[:768])
+    entries = max(2, len(raw) // 3)
+    size_bits = max(0, (entries - 1).bit_length() - 1)
+    return raw.ljust(3 * (2 ** (size_bits + 1)), b'\x00')
+
+
+def dirty_bbox(previous: np.ndarray, current: np.ndarray) -> Optional[tuple[int, int, int, int]]:
+    """
+    Bounding box of pixels that differ between two frames.
+
+    Args:
+        previous: Previous frame (palette indices or RGB)
+        current: Current frame, same shape
+
+    Returns:
+        (left, top, right, bottom) box, or None if the frames are identical
+    """
+    changed = previous != current
+    if changed.ndim == 3:
+        changed = changed.any(axis=2)
+    if not changed.any():
+        return None
+    rows = np.flatnonzero(changed.any(axis=1))
+    cols = np.flatnonzero(changed.any(axis=0))
+    return int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1
+
+
+class StreamingGIFWriter:
+    """
+    Write a looping GIF one frame at a time.
+
+    Every frame is mapped onto the same palette and written as soon as the
+    next one arrives, so memory use does not grow with the number of frames.
+    Full-canvas frames are delta-encoded against the previous frame:
+
+    - Only the dirty bounding box is stored, drawn over the previous frame
+      (disposal method 1, "do not dispose")
+    - Inside the box, unchanged pixels may be replaced by a reserved
+      transparent index, which gives LZW long runs to compress; whichever
+      encoding is smaller is kept
+    - Identical consecutive frames are merged into one longer frame delay
+
+    Example:
+        with StreamingGIFWriter('out.gif', 480, 480, palette, fps=15) as writer:
+            for frame in frames:
+                writer.write_frame(frame)
+    """
+
+    def __init__(self, output: str | Path | BinaryIO, width: int, height: int,
+                 palette: Image.Image, fps: int = 15, loop: int = 0, dither: bool = True,
+                 crop_unchanged: bool = True, transparent_unchanged: bool = True,
+                 merge_duplicates: bool = True):
+        """
+        Initialize writer and emit the GIF header.
+
+        Args:
+            output: Path or writable binary file object
+            width: Canvas width in pixels
+            height: Canvas height in pixels
+            palette: 'P' mode image whose palette every frame is mapped onto
+            fps: Default frames per second (sets per-frame delay)
+            loop: Loop count (0 = infinite)
+            dither: Use Floyd-Steinberg dithering when quantizing RGB frames
+            crop_unchanged: Encode full-canvas frames as the sub-rectangle that
+                differs from the previous frame
+            transparent_unchanged: Also try marking unchanged pixels inside that
+                rectangle transparent (needs a free palette slot, i.e. < 256 colors)
+            merge_duplicates: Fold identical consecutive frames into the
+                previous frame's delay instead of writing them
+        """
+        self.width = width
+        self.height = height
+        self.palette = palette
+        self.fps = fps
+        self.dither = dither
+        self.crop_unchanged = crop_unchanged
+        self.merge_duplicates = merge_duplicates
+        self.frame_count = 0
+        self.merged_count = 0
+        self.duration_ms = 0.0
+        self.bytes_written = 0
+
+        if isinstance(output, (str, Path)):
+            self._fp = open(output, 'wb')
+            self._owns_fp = True
+        else:
+            self._fp = output
+            self._owns_fp = False
+
+        # Reserve the first unused palette slot as the transparent index
+        self._palette_data = list(palette.getpalette()[:768])
+        self._transparent: Optional[int] = None
+        if crop_unchanged and transparent_unchanged and len(self._palette_data) < 768:
+            self._transparent = len(self._palette_data) // 3
+            self._palette_data += [0, 0, 0]
+
+        # Previous full-canvas frame as palette indices (for delta encoding)
+        self._previous: Optional[np.ndarray] = None
+        # Encoded frame waiting for its final delay: [block, disposal, transparency, duration_ms]
+        self._pending: Optional[list] = None
+
+        self._color_table = _color_table(self._palette_data)
+        size_bits = (len(self._color_table) // 3).bit_length() - 2
+        self._write(b'GIF89a')
+        self._write(struct.pack('<HHBBB', width, height, 0xF0 | size_bits, 0, 0))
+        self._write(self._color_table)
+        self._write(b'\x21\xFF\x0BNETSCAPE2.0\x03\x01' + struct.pack('<H', loop) + b'\x00')
+
+    def _write(self, data: bytes):
+        self._fp.write(data)
+        self.bytes_written += len(data)
+
+    def _to_indexed(self, frame: np.ndarray | Image.Image) -> Image.Image:
+        """Map a frame onto the writer palette."""
+        if isinstance(frame, np.ndarray) and frame.ndim == 2:
+            # Already palette indices
+            indexed = Image.fromarray(frame.astype(np.uint8))
+            indexed.putpalette(self._palette_data)
+            return indexed
+        if isinstance(frame, np.ndarray):
+            frame = Image.fromarray(frame)
+        if frame.mode == 'P':
+            return frame
+        return frame.convert('RGB').quantize(palette=self.palette, dither=1 if self.dither else 0)
+
+    def _encode(self, indexed: Image.Image, position: tuple[int, int]) -> bytes:
+        """Encode an indexed image as an image descriptor plus LZW data."""
+        buffer = io.BytesIO()
+        indexed.save(buffer, format='GIF', optimize=False, interlace=False)
+        table, descriptor, image_data = _split_single_frame_gif(buffer.getvalue())
+
+        # Pillow may normalize the palette; if it no longer matches ours, carry
+        # its table along as a local color table so indices stay correct
+        descriptor = bytearray(descriptor[:10])
+        descriptor[1:5] = struct.pack('<HH', *position)
+        local_table = b''
+        if table and table[:len(self._color_table)] != self._color_table[:len(table)]:
+            local_table = table
+            descriptor[9] = (descriptor[9] & 0x40) | 0x80 | ((len(table) // 3).bit_length() - 2)
+        else:
+            descriptor[9] &= 0x40
+        return bytes(descriptor) + local_table + image_data
+
+    def _encode_delta(self, previous: np.ndarray,
+                      indices: np.ndarray) -> tuple[bytes, int, Optional[int]]:
+        """Encode a full-canvas frame against the previous one."""
+        box = dirty_bbox(previous, indices)
+        if box is None:
+            box = (0, 0, 1, 1)
+        left, top, right, bottom = box
+        region = indices[top:bottom, left:right]
+        candidates = [(self._encode(self._to_indexed(region), (left, top)), None)]
+
+        if self._transparent is not None:
+            unchanged = region == previous[top:bottom, left:right]
+            if unchanged.any():
+                masked = np.where(unchanged, self._transparent, region).astype(np.uint8)
+                candidates.append((self._encode(self._to_indexed(masked), (left, top)),
+                                   self._transparent))
+
+        block, transparency = min(candidates, key=lambda c: len(c[0]))
+        return block, 1, transparency  # Disposal 1: draw over the previous frame
+
+    def _flush(self):
+        """Write the pending frame with its accumulated delay."""
+        if self._pending is None:
+            return
+        block, disposal, transparency, duration_ms = self._pending
+        delay = max(0, round(duration_ms / 10))
+        flags = (disposal & 0x07) << 2
+        if transparency is not None:
+            flags |= 0x01
+        self._write(b'\x21\xF9\x04' + struct.pack('<BHB', flags, delay, transparency or 0) + b'\x00')
+        self._write(block)
+        self.frame_count += 1
+        self._pending = None
+
+    def write_frame(self, frame: np.ndarray | Image.Image, duration_ms: Optional[float] = None,
+                    position: tuple[int, int] = (0, 0), disposal: int = 0,
+                    transparency: Optional[int] = None):
+        """
+        Quantize and append a frame.
+
+        Args:
+            frame: RGB frame (numpy array or PIL Image), or a 'P' image or 2D
+                index array already mapped onto the writer palette
+            duration_ms: Frame delay in milliseconds (default: 1000 / fps)
+            position: (left, top) offset, for frames smaller than the canvas
+            disposal: GIF disposal method (0-3)
+            transparency: Palette index to treat as transparent, if any
+        """
+        if self._fp is None:
+            raise ValueError("Writer is closed")
+        if duration_ms is None:
+            duration_ms = 1000 / self.fps
+        self.duration_ms += duration_ms
+
+        indexed = self._to_indexed(frame)
+        left, top = position
+        if left + indexed.width > self.width or top + indexed.height > self.height:
+            raise ValueError(
+                f"Frame {indexed.size} at {position} does not fit canvas {self.width}x{self.height}"
+            )
+
+        full_canvas = position == (0, 0) and indexed.size == (self.width, self.height)
+        if full_canvas and transparency is None:
+            indices = np.asarray(indexed)
+            previous, self._previous = self._previous, indices
+
+            if previous is not None:
+                if (self.merge_duplicates and self._pending is not None
+                        and np.array_equal(previous, indices)):
+                    self._pending[3] += duration_ms
+                    self.merged_count += 1
+                    return
+                if self.crop_unchanged:
+                    block, disposal, transparency = self._encode_delta(previous, indices)
+                    self._flush()
+                    self._pending = [block, disposal, transparency, duration_ms]
+                    return
+        else:
+            # Caller-managed sub-frame: canvas contents are no longer tracked
+            self._previous = None
+
+        self._flush()
+        self._pending = [self._encode(indexed, position), disposal, transparency, duration_ms]
+
+    def close(self):
+        """Write any pending frame plus the GIF trailer and close the output."""
+        if self._fp is None:
+            return
+        self._flush()
+        self._write(b'\x3B')
+        if self._owns_fp:
+            self._fp.close()
+        else:
+            self._fp.flush()
+        self._fp = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
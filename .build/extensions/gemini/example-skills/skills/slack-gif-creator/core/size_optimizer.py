@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Size Optimizer - Find the best-looking GIF settings that fit a byte budget.
+
+Instead of fixed heuristics, candidate settings (colors, frame decimation,
+dimensions, dithering) are encoded in memory and measured. Every knob has an
+ordered list of values from best to worst quality; the search measures which
+knob saves the most bytes per step, bisects along it for the highest-quality
+value that fits, and moves on to the next knob only if that one alone cannot
+reach the target. Knobs maxed out on the way are then bisected back toward
+their best value, as far as the final settings still fit.
+"""
+
+import io
+import time
+from typing import Optional
+
+import numpy as np
+from PIL import Image
+
+from core.gif_writer import StreamingGIFWriter
+from core.palette import build_palette, quantize_frames
+from core.validators import EMOJI_SIZE_LIMIT_KB, MESSAGE_SIZE_LIMIT_KB
+
+
+SIZE_TARGETS = {
+    'emoji': EMOJI_SIZE_LIMIT_KB * 1024,
+    'message': MESSAGE_SIZE_LIMIT_KB * 1024,
+}
+
+# Knob values, best quality first
+COLOR_STEPS = (256, 192, 128, 96, 64, 48, 40, 32, 24, 16, 8)
+SCALE_STEPS = (1.0, 0.875, 0.75, 0.625, 0.5)
+DITHER_STEPS = ('floyd_steinberg', 'ordered', 'none')
+KNOBS = ('colors', 'keep_every', 'scale', 'dither')
+
+
+class SizeOptimizer:
+    """
+    Search encoder settings for the highest quality under a size limit.
+
+    Encoded sizes, resized frame stacks and palettes are cached, so settings
+    that share a prefix (same scale, same frames) reuse earlier work.
+
+    Example:
+        optimizer = SizeOptimizer(frames, fps=12, target='emoji')
+        result = optimizer.optimize()
+        print(result['settings'], result['size_bytes'], result['fits'])
+    """
+
+    def __init__(self, frames: list[np.ndarray], fps: int = 15,
+                 target: str | int = 'emoji', max_colors: int = 256,
+                 min_frames: int = 6, min_size: int = 64,
+                 palette_method: str = 'median_cut'):
+        """
+        Initialize optimizer.
+
+        Args:
+            frames: RGB frames (all the same size)
+            fps: Frames per second of the source animation
+            target: 'emoji' (64 KB), 'message' (2 MB) or a byte budget
+            max_colors: Upper bound on palette size
+            min_frames: Never decimate below this many frames
+            min_size: Never scale the shorter side below this many pixels
+            palette_method: Palette construction method (see core.palette)
+        """
+        if not frames:
+            raise ValueError("No frames to optimize.")
+        self.frames = [np.asarray(f) for f in frames]
+        self.fps = fps
+        self.target_bytes = SIZE_TARGETS[target] if isinstance(target, str) else int(target)
+        self.palette_method = palette_method
+        self.attempts: list[dict] = []
+
+        height, width = self.frames[0].shape[:2]
+        self.width = width
+        self.height = height
+
+        self.steps = {
+            'colors': tuple(c for c in COLOR_STEPS if c <= max_colors) or (max_colors,),
+            'keep_every': tuple(k for k in range(1, len(self.frames) + 1)
+                                if k == 1 or len(self.frames) // k >= min_frames)[:8],
+            'scale': tuple(s for s in SCALE_STEPS if s == 1.0 or min(width, height) * s >= min_size),
+            'dither': DITHER_STEPS,
+        }
+
+        self._sizes: dict[tuple, int] = {}
+        self._stacks: dict[tuple, np.ndarray] = {}
+        self._palettes: dict[tuple, object] = {}
+
+    def settings_for(self, position: dict[str, int]) -> dict:
+        """Translate knob step indices into concrete encoder settings."""
+        scale = self.steps['scale'][position['scale']]
+        return {
+            'colors': self.steps['colors'][position['colors']],
+            'keep_every': self.steps['keep_every'][position['keep_every']],
+            'width': max(1, round(self.width * scale)),
+            'height': max(1, round(self.height * scale)),
+            'dither': self.steps['dither'][position['dither']],
+        }
+
+    def _stack(self, width: int, height: int, keep_every: int) -> np.ndarray:
+        """Resized, decimated frame stack (cached)."""
+        key = (width, height, keep_every)
+        if key not in self._stacks:
+            frames = self.frames[::keep_every]
+            if (width, height) != (self.width, self.height):
+                frames = [np.asarray(Image.fromarray(f).resize((width, height), Image.Resampling.LANCZOS))
+                          for f in frames]
+            self._stacks[key] = np.stack(frames)
+        return self._stacks[key]
+
+    def encode(self, settings: dict, output=None) -> StreamingGIFWriter:
+        """
+        Encode frames with the given settings.
+
+        Args:
+            settings: Dict from settings_for()
+            output: Path or file object to write to (default: in-memory buffer)
+
+        Returns:
+            The closed writer (bytes_written, frame_count, duration_ms, ...)
+        """
+        stack = self._stack(settings['width'], settings['height'], settings['keep_every'])
+        palette_key = (settings['width'], settings['height'], settings['keep_every'], settings['colors'])
+        if palette_key not in self._palettes:
+            self._palettes[palette_key] = build_palette(stack, settings['colors'],
+                                                        method=self.palette_method)
+        palette = self._palettes[palette_key]
+        indices = quantize_frames(stack, palette, dither=settings['dither'])
+
+        # Lower the frame rate with decimation so the total duration is kept
+        buffer = io.BytesIO() if output is None else output
+        with StreamingGIFWriter(buffer, settings['width'], settings['height'], palette.to_image(),
+                                fps=self.fps / settings['keep_every']) as writer:
+            for frame in indices:
+                writer.write_frame(frame)
+        return writer
+
+    def measure(self, position: dict[str, int]) -> int:
+        """Encoded size for a knob position, recording timing per attempt."""
+        settings = self.settings_for(position)
+        key = tuple(sorted(settings.items()))
+        cached = key in self._sizes
+
+        start = time.perf_counter()
+        if not cached:
+            self._sizes[key] = self.encode(settings).bytes_written
+        elapsed = time.perf_counter() - start
+
+        size = self._sizes[key]
+        self.attempts.append({
+            'settings': settings,
+            'size_bytes': size,
+            'fits': size <= self.target_bytes,
+            'seconds': elapsed,
+            'cached': cached,
+        })
+        return size
+
+    def _bisect(self, position: dict[str, int], knob: str) -> Optional[int]:
+        """Lowest step index of ``knob`` that fits, or None if none does."""
+        last = len(self.steps[knob]) - 1
+        if self.measure({**position, knob: last}) > self.target_bytes:
+            return None
+        low, high = position[knob], last  # high always fits
+        while low < high:
+            middle = (low + high) // 2
+            if self.measure({**position, knob: middle}) <= self.target_bytes:
+                high = middle
+            else:
+                low = middle + 1
+        return high
+
+    def optimize(self) -> dict:
+        """
+        Run the search.
+
+        Returns:
+            Dict with the chosen 'settings', 'size_bytes', 'fits', the
+            'target_bytes', total 'seconds', and per-attempt 'attempts'
+        """
+        start = time.perf_counter()
+        position = {knob: 0 for knob in KNOBS}
+        size = self.measure(position)
+        free = [knob for knob in KNOBS if len(self.steps[knob]) > 1]
+        maxed = []
+
+        while size > self.target_bytes and free:
+            # Most effective knob: biggest saving from a single step down
+            savings = {knob: size - self.measure({**position, knob: position[knob] + 1})
+                       for knob in free}
+            knob = max(free, key=lambda k: savings[k])
+            free.remove(knob)
+
+            step = self._bisect(position, knob)
+            if step is None:
+                # This knob alone cannot reach the target: max it out, try the next
+                position[knob] = len(self.steps[knob]) - 1
+                maxed.append(knob)
+            else:
+                position[knob] = step
+            size = self.measure(position)
+
+        if size <= self.target_bytes:
+            # Later knobs may have made a maxed-out one's last steps unneeded;
+            # its last step fits here, so the bisection always finds a value
+            for knob in maxed:
+                position[knob] = self._bisect({**position, knob: 0}, knob)
+            size = self.measure(position)
+
+        return {
+            'settings': self.settings_for(position),
+            'size_bytes': size,
+            'fits': size <= self.target_bytes,
+            'target_bytes': self.target_bytes,
+            'seconds': time.perf_counter() - start,
+            'attempts': self.attempts,
+        }
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import codecs
+import mmap
+import os
+import re
+from dataclasses import dataclass
+from typing import Iterator, Sequence
+
+from patterns import SecretPattern
+
+
+# Non-ASCII characters that Python's case-insensitive matching folds onto
+# ASCII letters. A file containing any of them may match a case-insensitive
+# anchor without containing it byte for byte.
+_ASCII_FOLDS = {"i": "\u0130\u0131", "s": "\u017f", "k": "\u212a"}
+_ASCII_FOLD_BYTES = tuple(char.encode("utf-8") for chars in _ASCII_FOLDS.values() for char in chars)
+
+# Bytes decoded and scanned at a time by scan_region (cut at a newline)
+SCAN_CHUNK = 8 << 20
+
+_INLINE_FLAGS = re.compile(r"^\(\?([aiLmsux]+)\)")
+_FLAG_LETTERS = ((re.IGNORECASE, "i"), (re.MULTILINE, "m"), (re.DOTALL, "s"), (re.VERBOSE, "x"))
+
+
+@dataclass(frozen=True)
+class Finding:
+    file_path: str
+    line_number: int
+    rule_name: str
+    snippet: str
+
+
+def is_allowlisted(text: str, allowlist: list[re.Pattern[str]]) -> bool:
+    return any(pattern.search(text) for pattern in allowlist)
+
+
+def build_snippet(line: str, match: re.Match[str]) -> str:
+    start, end = match.span()
+    redacted = "<redacted>"
+    snippet = f"{line[:start]}{redacted}{line[end:]}".strip()
+    if len(snippet) > 200:
+        snippet = f"{snippet[:200]}..."
+    return snippet
+
+
+def match_line(
+    line: str,
+    patterns: Sequence[SecretPattern],
+    allowlist: list[re.Pattern[str]],
+) -> Iterator[tuple[SecretPattern, re.Match[str]]]:
+    """Yield the first non-allowlisted match of each pattern on one line."""
+    if is_allowlisted(line, allowlist):
+        return
+    for pattern in patterns:
+        match = pattern.regex.search(line)
+        if not match:
+            continue
+        if is_allowlisted(match.group(0), allowlist):
+            continue
+        yield pattern, match
+
+
+def _first_characters(anchors: Sequence[str]) -> str:
+    """Character class matching the first character of any anchor, in any case."""
+    chars = set()
+    for anchor in anchors:
+        first = anchor[0]
+        chars.update((first, first.lower(), first.upper()))
+        chars.update(_ASCII_FOLDS.get(first.lower(), ""))
+    return "[" + "".join(re.escape(char) for char in sorted(chars)) + "]"
+
+
+def _candidate_branch(pattern: SecretPattern) -> str:
+    """Rewrite a pattern as one branch of the combined candidate regex.
+
+    The candidate regex only has to match at least wherever the original
+    pattern does, so it is tuned for the regex engine's prefix scan: inline
+    flags become scoped, a leading ``\\b`` is dropped, and case-insensitive
+    branches get a lookahead on their anchors' first characters. Without
+    these the engine tries every branch at every offset of the file.
+    """
+    regex = pattern.regex
+    source = _INLINE_FLAGS.sub("", regex.pattern, count=1)
+    if source.startswith("\\b"):
+        source = source[2:]
+    flags = "".join(letter for flag, letter in _FLAG_LETTERS if regex.flags & flag)
+    branch = f"(?{flags}:{source})" if flags else f"(?:{source})"
+    if regex.flags & re.IGNORECASE and pattern.anchors:
+        branch = f"(?={_first_characters(pattern.anchors)}){branch}"
+    return branch
+
+
+class SecretMatcher:
+    """All secret patterns compiled into one alternation, with a literal prefilter.
+
+    The combined regex only locates candidate lines; every candidate line is
+    then checked with ``match_line`` so findings match a line-by-line scan.
+    """
+
+    def __init__(self, patterns: Sequence[SecretPattern]) -> None:
+        self.patterns = list(patterns)
+        self._combined: dict[tuple[int, ...], re.Pattern[str]] = {}
+        self._anchors: list[tuple[list[bytes], re.Pattern[bytes] | None]] = []
+        for pattern in self.patterns:
+            literals = [anchor.encode("utf-8") for anchor in pattern.anchors]
+            folded = None
+            if literals and pattern.regex.flags & re.IGNORECASE:
+                folded = re.compile(b"|".join(re.escape(item) for item in literals), re.IGNORECASE)
+            self._anchors.append((literals, folded))
+
+    def active(self, data: bytes | mmap.mmap) -> tuple[int, ...]:
+        """Indexes of patterns whose anchors occur somewhere in ``data``."""
+        folds = None
+        active = []
+        for index, (literals, folded) in enumerate(self._anchors):
+            if not literals:
+                active.append(index)
+            elif folded is None:
+                if any(data.find(literal) != -1 for literal in literals):
+                    active.append(index)
+            else:
+                if folds is None:
+                    folds = any(data.find(item) != -1 for item in _ASCII_FOLD_BYTES)
+                if folds or folded.search(data):
+                    active.append(index)
+        return tuple(active)
+
+    def combined(self, active: tuple[int, ...]) -> re.Pattern[str]:
+        """One regex matching (at least) wherever any active pattern matches."""
+        regex = self._combined.get(active)
+        if regex is None:
+            # Plain alternation: wrapping branches in (named) groups defeats
+            # the prefix scan, and candidate lines are re-checked per pattern
+            regex = re.compile("|".join(_candidate_branch(self.patterns[index]) for index in active))
+            self._combined[active] = regex
+        return regex
+
+    def scan_text(
+        self,
+        file_path: str,
+        text: str,
+        allowlist: list[re.Pattern[str]],
+        max_matches: int,
+        active: tuple[int, ...] | None = None,
+        first_line: int = 1,
+    ) -> list[Finding]:
+        """Scan decoded text in one pass, mapping match offsets to line numbers."""
+        findings: list[Finding] = []
+        if active is None:
+            active = tuple(range(len(self.patterns)))
+        if not active or max_matches <= 0:
+            return findings
+
+        regex = self.combined(active)
+        line_number = first_line
+        counted = 0
+        position = 0
+        while True:
+            hit = regex.search(text, position)
+            if hit is None:
+                break
+            start = text.rfind("\n", 0, hit.start()) + 1
+            line_number += text.count("\n", counted, start)
+            counted = start
+            # A match may run across newlines (``\s*``); check every line it touches
+            while True:
+                newline = text.find("\n", start)
+                stop = len(text) if newline == -1 else newline + 1
+                line = text[start:stop]
+                for pattern, match in match_line(line, self.patterns, allowlist):
+                    findings.append(
+                        Finding(
+                            file_path=file_path,
+                            line_number=line_number,
+                            rule_name=pattern.name,
+                            snippet=build_snippet(line, match),
+                        )
+                    )
+                    if len(findings) >= max_matches:
+                        return findings
+                if newline == -1 or stop >= hit.end():
+                    break
+                start = stop
+                line_number += 1
+                counted = start
+            position = stop
+        return findings
+
+
+_MATCHERS: dict[tuple[tuple[str, str, int], ...], SecretMatcher] = {}
+
+
+def matcher_for(patterns: Sequence[SecretPattern]) -> SecretMatcher:
+    """Shared matcher for a pattern list, so combined regexes compile once."""
+    key = tuple((p.name, p.regex.pattern, p.regex.flags) for p in patterns)
+    matcher = _MATCHERS.get(key)
+    if matcher is None:
+        matcher = SecretMatcher(patterns)
+        _MATCHERS[key] = matcher
+    return matcher
+
+
+def decode_text(data: bytes | mmap.mmap) -> str:
+    """Decode like text-mode ``open()``: UTF-8 with replacement, universal newlines."""
+    text, _ = codecs.utf_8_decode(data, "replace", True)
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def _chunk_end(data: bytes | mmap.mmap, start: int) -> int:
+    """End of the chunk starting at ``start``: just past a newline, or the end of ``data``."""
+    limit = start + SCAN_CHUNK
+    if limit >= len(data):
+        return len(data)
+    cut = data.rfind(b"\n", start, limit)
+    if cut == -1:  # one line longer than a chunk
+        cut = data.find(b"\n", limit)
+        if cut == -1:
+            return len(data)
+    return cut + 1
+
+
+def scan_region(
+    file_path: str,
+    data: bytes | mmap.mmap,
+    patterns: Sequence[SecretPattern],
+    allowlist: list[re.Pattern[str]],
+    max_matches: int,
+    start: int = 0,
+    first_line: int = 1,
+) -> tuple[list[Finding], int, int]:
+    """Scan ``data[start:]``, whose first line is line ``first_line``.
+
+    ``start`` must be 0 or just past a newline byte. Returns the findings plus
+    the byte offset just past the last newline in ``data`` and the number of
+    complete lines before it, so an append-only file can be resumed there.
+
+    The region is decoded and scanned in chunks of about SCAN_CHUNK bytes
+    that end on a newline, so memory stays flat however large the file is.
+    Findings come from single lines and no line is split between chunks, so
+    results match a scan of the whole region at once.
+    """
+    matcher = matcher_for(patterns)
+    offset = max(start, data.rfind(b"\n") + 1)
+    findings: list[Finding] = []
+    lines = first_line - 1
+    position = start
+    while position < len(data):
+        end = _chunk_end(data, position)
+        chunk = data[position:end]
+        active = matcher.active(chunk) if len(findings) < max_matches else ()
+        if active:
+            findings.extend(matcher.scan_text(
+                file_path, decode_text(chunk), allowlist, max_matches - len(findings), active, lines + 1,
+            ))
+        # Newlines before offset as decode_text sees them: \r\n and lone \r end a line too
+        head = chunk[:offset - position] if end > offset else chunk
+        lines += head.count(b"\n") + head.count(b"\r") - head.count(b"\r\n")
+        position = end
+    return findings, offset, lines
+
+
+def scan_mapped_file(
+    file_path: str,
+    patterns: Sequence[SecretPattern],
+    allowlist: list[re.Pattern[str]],
+    max_matches_per_file: int,
+) -> list[Finding]:
+    """Scan a whole file through a read-only memory map in a single pass.
+
+    Raises OSError if the file cannot be opened or mapped.
+    """
+    with open(file_path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            findings, _, _ = scan_region(file_path, data, patterns, allowlist, max_matches_per_file)
+    return findings
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import os
+import re
+import sys
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, Sequence
+
+from cache import ScanCache
+from engine import Finding, scan_mapped_file
+from patterns import SecretPattern
+
+
+# Chunks per worker: enough to balance uneven files, few enough to keep
+# per-task overhead low
+CHUNKS_PER_WORKER = 4
+
+_WORKER: dict[str, Any] = {}
+
+
+def plan_chunks(files: Sequence[tuple[str, int]], workers: int) -> list[list[str]]:
+    """Split (path, size) pairs into contiguous chunks of roughly equal bytes.
+
+    Chunks keep path order, so the earliest paths finish first and a
+    ``--max-matches`` cutoff can cancel everything after it.
+    """
+    total = sum(size for _, size in files)
+    budget = max(1, total // max(1, workers * CHUNKS_PER_WORKER))
+    chunks: list[list[str]] = []
+    current: list[str] = []
+    current_bytes = 0
+    for path, size in files:
+        current.append(path)
+        current_bytes += size
+        if current_bytes >= budget:
+            chunks.append(current)
+            current = []
+            current_bytes = 0
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _init_worker(
+    patterns: list[SecretPattern],
+    allowlist: list[re.Pattern[str]],
+    max_matches_per_file: int,
+    cache_version: str | None,
+) -> None:
+    _WORKER.update(
+        patterns=patterns,
+        allowlist=allowlist,
+        max_matches_per_file=max_matches_per_file,
+        cache_version=cache_version,
+    )
+
+
+def _scan_chunk(
+    jobs: list[tuple[str, str, dict[str, Any] | None]],
+) -> list[tuple[str, list[Finding], dict[str, Any] | None, dict[str, int]]]:
+    """Worker: scan files, returning findings and updated cache entries."""
+    patterns = _WORKER["patterns"]
+    allowlist = _WORKER["allowlist"]
+    limit = _WORKER["max_matches_per_file"]
+    version = _WORKER["cache_version"]
+    results = []
+    for file_path, key, entry in jobs:
+        new_entry = None
+        stats: dict[str, int] = {}
+        try:
+            if version is None:
+                findings = scan_mapped_file(file_path, patterns, allowlist, limit)
+            else:
+                cache = ScanCache("", version, {key: entry} if entry else None)
+                findings = cache.scan_file(file_path, key, patterns, allowlist, limit)
+                new_entry = cache.entries.get(key)
+                stats = cache.stats
+        except (OSError, ValueError) as exc:
+            print(f"specstory-guard: failed to read {file_path}: {exc}", file=sys.stderr)
+            findings = []
+        results.append((file_path, findings, new_entry, stats))
+    return results
+
+
+def scan_files_parallel(
+    files: Sequence[str],
+    root: str,
+    patterns: list[SecretPattern],
+    allowlist: list[re.Pattern[str]],
+    max_matches_per_file: int,
+    max_matches: int,
+    workers: int,
+    cache: ScanCache | None = None,
+    scan_in_parent: Callable[[str], list[Finding]] | None = None,
+) -> tuple[list[Finding], int]:
+    """Scan files across a process pool with the same result as a serial scan.
+
+    ``files`` must already be in report order. Findings are merged back in
+    that order, and once the files finished so far reach ``max_matches``,
+    the remaining work is cancelled. Cache hits and files handled by
+    ``scan_in_parent`` never reach the pool.
+
+    Returns the findings and how many leading files they cover.
+    """
+    results: dict[str, list[Finding]] = {}
+    pending: list[tuple[str, int]] = []
+    for file_path in files:
+        key = os.path.relpath(file_path, root)
+        if scan_in_parent is not None:
+            parent_findings = scan_in_parent(file_path)
+            if parent_findings is not None:
+                results[file_path] = parent_findings
+                continue
+        if cache is not None:
+            cached = cache.cached_findings(file_path, key, max_matches_per_file)
+            if cached is not None:
+                results[file_path] = cached
+                continue
+        try:
+            size = os.path.getsize(file_path)
+        except OSError:
+            size = 0
+        pending.append((file_path, size))
+
+    findings: list[Finding] = []
+    covered = 0
+
+    def advance() -> bool:
+        """Move the cutoff over finished files; True once max_matches is hit."""
+        nonlocal covered
+        while covered < len(files) and files[covered] in results:
+            findings.extend(results[files[covered]])
+            covered += 1
+            if len(findings) >= max_matches:
+                return True
+        return False
+
+    if advance() or not pending:
+        return findings, covered
+
+    cache_version = cache.version if cache is not None else None
+    chunks = plan_chunks(pending, workers)
+    workers = min(workers, len(chunks))
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(patterns, allowlist, max_matches_per_file, cache_version),
+    ) as pool:
+        outstanding: set[Future] = set()
+        for chunk in chunks:
+            jobs = []
+            for file_path in chunk:
+                key = os.path.relpath(file_path, root)
+                entry = cache.entries.get(key) if cache is not None else None
+                jobs.append((file_path, key, entry))
+            outstanding.add(pool.submit(_scan_chunk, jobs))
+
+        while outstanding:
+            done, outstanding = wait(outstanding, return_when=FIRST_COMPLETED)
+            for future in done:
+                for file_path, file_findings, entry, stats in future.result():
+                    results[file_path] = file_findings
+                    if cache is not None and entry is not None:
+                        cache.update(os.path.relpath(file_path, root), entry, stats)
+            if advance():
+                for future in outstanding:
+                    future.cancel()
+                break
+
+    return findings, covered
@@ -1,5 +1,7 @@
 """Utility functions for specstory yak shave analyzer."""
 
+import json
+import os
 import subprocess
 from pathlib import Path
 from typing import Optional
@@ -39,6 +41,122 @@ def get_git_author(filepath: Path) -> str:
     return "unknown"
 
 
+def _run_git(cwd: Path, *args: str, timeout: int = 30) -> Optional[str]:
+    """Stdout of a git command, or None if git is missing or the command fails."""
+    try:
+        result = subprocess.run(
+            ["git", *args],
+            capture_output=True,
+            encoding="utf-8",
+            errors="replace",
+            cwd=cwd,
+            timeout=timeout,
+        )
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+class GitAuthorResolver:
+    """
+    Session authors for a whole history directory from a single `git log`.
+
+    Maps each path to the author of the commit that added it, which is who
+    `git blame` credits for the first line of a session file. The map is
+    cached on disk keyed by HEAD, so an unchanged repository costs one git
+    call per run. Tracked paths the log does not list as added (renamed or
+    copied in) fall back to get_git_author(); untracked ones are "unknown"
+    without spawning blame.
+    """
+
+    def __init__(self, history_path: Path, cache_path: Optional[Path] = None):
+        self.history_path = history_path
+        self.cache_path = cache_path
+        self.stats = {"batched": 0, "blamed": 0}
+        self._loaded = False
+        self._toplevel: Optional[Path] = None
+        self._authors: dict[str, str] = {}
+        self._tracked: Optional[set[str]] = None
+
+    def author(self, filepath: Path) -> str:
+        """Git author of a session file, like get_git_author()."""
+        self._load()
+        if self._toplevel is None:
+            return get_git_author(filepath)
+        try:
+            key = filepath.resolve().relative_to(self._toplevel).as_posix()
+        except ValueError:
+            return get_git_author(filepath)
+
+        author = self._authors.get(key)
+        if author is not None:
+            self.stats["batched"] += 1
+            return author
+        if key not in self._tracked_paths():
+            return "unknown"
+        self.stats["blamed"] += 1
+        return get_git_author(filepath)
+
+    def _load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        output = _run_git(self.history_path, "rev-parse", "--show-toplevel", "HEAD")
+        if output is None:
+            return
+        toplevel, head = output.splitlines()[:2]
+
+        authors = self._read_cache(head)
+        if authors is None:
+            log = _run_git(
+                self.history_path,
+                "-c", "core.quotePath=false",
+                "log", "--format=%x01%aN", "--name-only", "--diff-filter=A", "HEAD", "--", ".",
+            )
+            if log is None:
+                return
+            authors = {}
+            author = None
+            for line in log.split("\n"):
+                if line.startswith("\x01"):
+                    author = line[1:].strip()
+                elif line and author is not None:
+                    # Newest first: a path added more than once keeps its latest add, as blame would
+                    authors.setdefault(line, author)
+            self._write_cache(head, authors)
+
+        self._toplevel = Path(toplevel)
+        self._authors = authors
+
+    def _tracked_paths(self) -> set[str]:
+        if self._tracked is None:
+            output = _run_git(self.history_path, "ls-files", "-z", "--full-name", "--", ".")
+            self._tracked = set(filter(None, (output or "").split("\0")))
+        return self._tracked
+
+    def _read_cache(self, head: str) -> Optional[dict[str, str]]:
+        if not self.cache_path:
+            return None
+        try:
+            payload = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(payload, dict) or payload.get("head") != head:
+            return None
+        return payload.get("authors") or {}
+
+    def _write_cache(self, head: str, authors: dict[str, str]):
+        if not self.cache_path:
+            return
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+            temp_path.write_text(json.dumps({"head": head, "authors": authors}), encoding="utf-8")
+            os.replace(temp_path, self.cache_path)
+        except OSError:
+            pass
+
+
 def detect_platform() -> str:
     """Detect the user's platform for installation instructions."""
     import platform
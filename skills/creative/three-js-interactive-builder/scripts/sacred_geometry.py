@@ -2,12 +2,32 @@
 """
 Sacred Geometry Vertex Generator
 Outputs JSON arrays of vertices for Three.js BufferGeometry
+
+Besides the readable JSON objects, every shape can be emitted as flat
+buffers (--format buffers or --format binary): a float32 position array
+(x, y, z per vertex) plus an optional index array, ready for
+THREE.BufferAttribute without re-parsing one object per vertex. Buffers are
+built with NumPy when it is installed and with the array module otherwise.
+
+Usage:
+    sacred_geometry.py torus 2 3 --segments 20000 --format binary -o knot
+    sacred_geometry.py --benchmark
 """
 
+import argparse
+import base64
 import json
 import math
+import sys
+import time
+from array import array
 from typing import List, Tuple
 
+try:
+    import numpy as np
+except ImportError:  # optional: vectorizes the buffer generators
+    np = None
+
 PHI = (1 + math.sqrt(5)) / 2  # Golden ratio
 
 
@@ -81,65 +101,68 @@ def golden_spiral(loops: int = 3, points_per_loop: int = 100, scale: float = 1.0
     return {"type": "golden_spiral", "points": points}
 
 
+PLATONIC_SOLIDS = {
+    "tetrahedron": {
+        "vertices": [
+            (1, 1, 1), (1, -1, -1), (-1, 1, -1), (-1, -1, 1)
+        ],
+        "faces": [(0, 1, 2), (0, 2, 3), (0, 3, 1), (1, 3, 2)]
+    },
+    "cube": {
+        "vertices": [
+            (-1, -1, -1), (1, -1, -1), (1, 1, -1), (-1, 1, -1),
+            (-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1)
+        ],
+        "faces": [
+            (0, 1, 2, 3), (4, 7, 6, 5), (0, 4, 5, 1),
+            (2, 6, 7, 3), (0, 3, 7, 4), (1, 5, 6, 2)
+        ]
+    },
+    "octahedron": {
+        "vertices": [
+            (1, 0, 0), (-1, 0, 0), (0, 1, 0),
+            (0, -1, 0), (0, 0, 1), (0, 0, -1)
+        ],
+        "faces": [
+            (0, 2, 4), (0, 4, 3), (0, 3, 5), (0, 5, 2),
+            (1, 4, 2), (1, 3, 4), (1, 5, 3), (1, 2, 5)
+        ]
+    },
+    "icosahedron": {
+        "vertices": [
+            (0, 1, PHI), (0, -1, PHI), (0, 1, -PHI), (0, -1, -PHI),
+            (1, PHI, 0), (-1, PHI, 0), (1, -PHI, 0), (-1, -PHI, 0),
+            (PHI, 0, 1), (-PHI, 0, 1), (PHI, 0, -1), (-PHI, 0, -1)
+        ],
+        "faces": [
+            (0, 1, 8), (0, 8, 4), (0, 4, 5), (0, 5, 9), (0, 9, 1),
+            (1, 6, 8), (8, 6, 10), (8, 10, 4), (4, 10, 2), (4, 2, 5),
+            (5, 2, 11), (5, 11, 9), (9, 11, 7), (9, 7, 1), (1, 7, 6),
+            (3, 6, 7), (3, 7, 11), (3, 11, 2), (3, 2, 10), (3, 10, 6)
+        ]
+    },
+    "dodecahedron": {
+        "vertices": [
+            (1, 1, 1), (1, 1, -1), (1, -1, 1), (1, -1, -1),
+            (-1, 1, 1), (-1, 1, -1), (-1, -1, 1), (-1, -1, -1),
+            (0, 1/PHI, PHI), (0, 1/PHI, -PHI), (0, -1/PHI, PHI), (0, -1/PHI, -PHI),
+            (1/PHI, PHI, 0), (-1/PHI, PHI, 0), (1/PHI, -PHI, 0), (-1/PHI, -PHI, 0),
+            (PHI, 0, 1/PHI), (PHI, 0, -1/PHI), (-PHI, 0, 1/PHI), (-PHI, 0, -1/PHI)
+        ],
+        "faces": [
+            (0, 8, 10, 2, 16), (0, 16, 17, 1, 12), (0, 12, 13, 4, 8),
+            (1, 17, 3, 11, 9), (1, 9, 5, 13, 12), (2, 10, 6, 15, 14),
+            (2, 14, 3, 17, 16), (3, 14, 15, 7, 11), (4, 13, 5, 19, 18),
+            (4, 18, 6, 10, 8), (5, 9, 11, 7, 19), (6, 18, 19, 7, 15)
+        ]
+    }
+}
+
+
 def platonic_solid(solid_type: str) -> dict:
     """Generate vertices and faces for Platonic solids."""
-    solids = {
-        "tetrahedron": {
-            "vertices": [
-                (1, 1, 1), (1, -1, -1), (-1, 1, -1), (-1, -1, 1)
-            ],
-            "faces": [(0, 1, 2), (0, 2, 3), (0, 3, 1), (1, 3, 2)]
-        },
-        "cube": {
-            "vertices": [
-                (-1, -1, -1), (1, -1, -1), (1, 1, -1), (-1, 1, -1),
-                (-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1)
-            ],
-            "faces": [
-                (0, 1, 2, 3), (4, 7, 6, 5), (0, 4, 5, 1),
-                (2, 6, 7, 3), (0, 3, 7, 4), (1, 5, 6, 2)
-            ]
-        },
-        "octahedron": {
-            "vertices": [
-                (1, 0, 0), (-1, 0, 0), (0, 1, 0),
-                (0, -1, 0), (0, 0, 1), (0, 0, -1)
-            ],
-            "faces": [
-                (0, 2, 4), (0, 4, 3), (0, 3, 5), (0, 5, 2),
-                (1, 4, 2), (1, 3, 4), (1, 5, 3), (1, 2, 5)
-            ]
-        },
-        "icosahedron": {
-            "vertices": [
-                (0, 1, PHI), (0, -1, PHI), (0, 1, -PHI), (0, -1, -PHI),
-                (1, PHI, 0), (-1, PHI, 0), (1, -PHI, 0), (-1, -PHI, 0),
-                (PHI, 0, 1), (-PHI, 0, 1), (PHI, 0, -1), (-PHI, 0, -1)
-            ],
-            "faces": [
-                (0, 1, 8), (0, 8, 4), (0, 4, 5), (0, 5, 9), (0, 9, 1),
-                (1, 6, 8), (8, 6, 10), (8, 10, 4), (4, 10, 2), (4, 2, 5),
-                (5, 2, 11), (5, 11, 9), (9, 11, 7), (9, 7, 1), (1, 7, 6),
-                (3, 6, 7), (3, 7, 11), (3, 11, 2), (3, 2, 10), (3, 10, 6)
-            ]
-        },
-        "dodecahedron": {
-            "vertices": [
-                (1, 1, 1), (1, 1, -1), (1, -1, 1), (1, -1, -1),
-                (-1, 1, 1), (-1, 1, -1), (-1, -1, 1), (-1, -1, -1),
-                (0, 1/PHI, PHI), (0, 1/PHI, -PHI), (0, -1/PHI, PHI), (0, -1/PHI, -PHI),
-                (1/PHI, PHI, 0), (-1/PHI, PHI, 0), (1/PHI, -PHI, 0), (-1/PHI, -PHI, 0),
-                (PHI, 0, 1/PHI), (PHI, 0, -1/PHI), (-PHI, 0, 1/PHI), (-PHI, 0, -1/PHI)
-            ],
-            "faces": [
-                (0, 8, 10, 2, 16), (0, 16, 17, 1, 12), (0, 12, 13, 4, 8),
-                (1, 17, 3, 11, 9), (1, 9, 5, 13, 12), (2, 10, 6, 15, 14),
-                (2, 14, 3, 17, 16), (3, 14, 15, 7, 11), (4, 13, 5, 19, 18),
-                (4, 18, 6, 10, 8), (5, 9, 11, 7, 19), (6, 18, 19, 7, 15)
-            ]
-        }
-    }
-    
+    solids = PLATONIC_SOLIDS
+
     if solid_type not in solids:
         raise ValueError(f"Unknown solid: {solid_type}. Options: {list(solids.keys())}")
     
@@ -185,36 +208,308 @@ def torus_knot_points(p: int = 2, q: int = 3, radius: float = 1.0,
     return {"type": f"torus_knot_{p}_{q}", "points": points}
 
 
+# --- Flat buffers for BufferGeometry ------------------------------------------
+#
+# geometry_buffers() returns {"type", "mode", "position", "index"?, "radius"?}
+# where position is interleaved x, y, z float32 values, index holds uint16 or
+# uint32 vertex indices and radius one float32 per circle. "mode" names the
+# Three.js object to build: Points, Line, LineLoop, LineSegments or Mesh.
+
+def _float32(values):
+    if np is not None:
+        return np.asarray(values, dtype="<f4").ravel()
+    return array("f", values)
+
+
+def _indices(values, vertex_count):
+    """uint16 indices when every vertex fits, else uint32 (as Three.js expects)."""
+    code = "H" if vertex_count <= 0xFFFF else "I"
+    if np is not None:
+        return np.asarray(values, dtype="<u2" if code == "H" else "<u4").ravel()
+    return array(code, values)
+
+
+def _ring(count: int, ring_radius: float, phase: float = 0.0):
+    """x, y coordinates of count points evenly spaced on a circle."""
+    if np is not None:
+        angle = 2 * np.pi * np.arange(count) / count + phase
+        return ring_radius * np.cos(angle), ring_radius * np.sin(angle)
+    angles = [(2 * math.pi * i) / count + phase for i in range(count)]
+    return [ring_radius * math.cos(a) for a in angles], [ring_radius * math.sin(a) for a in angles]
+
+
+def _interleave(x, y, z=None):
+    """Flat float32 x, y, z positions; z defaults to 0."""
+    if np is not None:
+        x = np.asarray(x, dtype=np.float64)
+        xyz = np.zeros((len(x), 3), dtype="<f4")
+        xyz[:, 0] = x
+        xyz[:, 1] = y
+        if z is not None:
+            xyz[:, 2] = z
+        return xyz.ravel()
+    z = z if z is not None else [0.0] * len(x)
+    return _float32([c for point in zip(x, y, z) for c in point])
+
+
+def _circle_buffers(kind: str, rings, radius: float) -> dict:
+    xs, ys = [0.0], [0.0]
+    for count, ring_radius, phase in rings:
+        x, y = _ring(count, ring_radius, phase)
+        xs.extend(x.tolist() if np is not None else x)
+        ys.extend(y.tolist() if np is not None else y)
+    return {"type": kind, "mode": "Points", "position": _interleave(xs, ys), "radius": _float32([radius] * len(xs))}
+
+
+def flower_of_life_buffers(radius: float = 1.0, rings: int = 2) -> dict:
+    """Circle centers as points, with one radius per circle."""
+    return _circle_buffers("flower_of_life", [(6 * ring, radius * ring, 0.0) for ring in range(1, rings + 1)], radius)
+
+
+def metatrons_cube_buffers(radius: float = 1.0) -> dict:
+    """Circle centers plus an index pair per connecting line (LineSegments)."""
+    result = _circle_buffers("metatrons_cube", [(6, radius, 0.0), (6, 2 * radius, math.pi / 6)], radius * 0.3)
+    count = len(result["radius"])
+    if np is not None:
+        start, end = np.triu_indices(count, k=1)
+        pairs = np.stack([start, end], axis=1)
+    else:
+        pairs = [v for i in range(count) for j in range(i + 1, count) for v in (i, j)]
+    result["mode"] = "LineSegments"
+    result["index"] = _indices(pairs, count)
+    return result
+
+
+def golden_spiral_buffers(loops: int = 3, points_per_loop: int = 100, scale: float = 1.0) -> dict:
+    total_points = loops * points_per_loop
+    if np is not None:
+        theta = np.arange(total_points) / points_per_loop * 2 * np.pi
+        r = scale * PHI ** (theta / (2 * np.pi))
+        x, y = r * np.cos(theta), r * np.sin(theta)
+    else:
+        theta = [(i / points_per_loop) * 2 * math.pi for i in range(total_points)]
+        r = [scale * (PHI ** (t / (2 * math.pi))) for t in theta]
+        x = [ri * math.cos(t) for ri, t in zip(r, theta)]
+        y = [ri * math.sin(t) for ri, t in zip(r, theta)]
+    return {"type": "golden_spiral", "mode": "Line", "position": _interleave(x, y)}
+
+
+def platonic_solid_buffers(solid_type: str) -> dict:
+    """Vertices plus faces fan-triangulated into a triangle index (Mesh)."""
+    if solid_type not in PLATONIC_SOLIDS:
+        raise ValueError(f"Unknown solid: {solid_type}. Options: {list(PLATONIC_SOLIDS.keys())}")
+    data = PLATONIC_SOLIDS[solid_type]
+    triangles = [
+        v for face in data["faces"] for k in range(1, len(face) - 1) for v in (face[0], face[k], face[k + 1])
+    ]
+    return {
+        "type": solid_type,
+        "mode": "Mesh",
+        "position": _float32([c for vertex in data["vertices"] for c in vertex]),
+        "index": _indices(triangles, len(data["vertices"])),
+    }
+
+
+def star_polygon_buffers(points: int = 6, outer_radius: float = 1.0, inner_radius: float = 0.5) -> dict:
+    if np is not None:
+        i = np.arange(points * 2)
+        angle = np.pi * i / points - np.pi / 2
+        radius = np.where(i % 2 == 0, outer_radius, inner_radius)
+        x, y = radius * np.cos(angle), radius * np.sin(angle)
+    else:
+        angles = [(math.pi * i) / points - math.pi / 2 for i in range(points * 2)]
+        radii = [outer_radius if i % 2 == 0 else inner_radius for i in range(points * 2)]
+        x = [r * math.cos(a) for r, a in zip(radii, angles)]
+        y = [r * math.sin(a) for r, a in zip(radii, angles)]
+    return {"type": f"star_{points}", "mode": "LineLoop", "position": _interleave(x, y)}
+
+
+def torus_knot_buffers(p: int = 2, q: int = 3, radius: float = 1.0,
+                       tube_radius: float = 0.3, segments: int = 200) -> dict:
+    if np is not None:
+        t = np.arange(segments) / segments * 2 * np.pi * p
+        r = radius + tube_radius * np.cos(q * t / p)
+        x, y, z = r * np.cos(t), r * np.sin(t), tube_radius * np.sin(q * t / p)
+    else:
+        t = [(i / segments) * 2 * math.pi * p for i in range(segments)]
+        r = [radius + tube_radius * math.cos(q * ti / p) for ti in t]
+        x = [ri * math.cos(ti) for ri, ti in zip(r, t)]
+        y = [ri * math.sin(ti) for ri, ti in zip(r, t)]
+        z = [tube_radius * math.sin(q * ti / p) for ti in t]
+    return {"type": f"torus_knot_{p}_{q}", "mode": "LineLoop", "position": _interleave(x, y, z)}
+
+
+# Buffer arrays and their BufferAttribute item sizes
+BUFFER_ITEM_SIZES = {"position": 3, "radius": 1, "index": 1}
+
+
+def _component_type(values) -> str:
+    code = values.dtype.str[1:] if np is not None and hasattr(values, "dtype") else values.typecode
+    return {"f4": "float32", "f": "float32", "u2": "uint16", "H": "uint16", "u4": "uint32", "I": "uint32"}[code]
+
+
+def _little_endian_bytes(values) -> bytes:
+    if isinstance(values, array) and sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def buffer_layout(result: dict):
+    """
+    Pack the buffers of a geometry_buffers() result into one little-endian blob.
+
+    Returns:
+        Tuple of (header, blob): header has "type", "mode" and one accessor per
+        array with componentType, itemSize, count, byteOffset and byteLength
+    """
+    header = {"type": result["type"], "mode": result["mode"], "accessors": {}}
+    blob = bytearray()
+    for name, item_size in BUFFER_ITEM_SIZES.items():
+        if name not in result:
+            continue
+        data = _little_endian_bytes(result[name])
+        blob.extend(b"\0" * (-len(blob) % 4))  # typed array views need aligned offsets
+        header["accessors"][name] = {
+            "componentType": _component_type(result[name]),
+            "itemSize": item_size,
+            "count": len(result[name]) // item_size,
+            "byteOffset": len(blob),
+            "byteLength": len(data),
+        }
+        blob.extend(data)
+    header["byteLength"] = len(blob)
+    return header, bytes(blob)
+
+
+def to_buffer_json(result: dict) -> dict:
+    """glTF-style JSON: the accessor header plus the blob as a base64 data URI."""
+    header, blob = buffer_layout(result)
+    header["uri"] = "data:application/octet-stream;base64," + base64.b64encode(blob).decode("ascii")
+    return header
+
+
+GENERATORS = {
+    "flower": (flower_of_life, flower_of_life_buffers),
+    "metatron": (metatrons_cube, metatrons_cube_buffers),
+    "spiral": (golden_spiral, golden_spiral_buffers),
+    "platonic": (platonic_solid, platonic_solid_buffers),
+    "star": (star_polygon, star_polygon_buffers),
+    "torus": (torus_knot_points, torus_knot_buffers),
+}
+
+
+def generator_kwargs(geom_type: str, params: List[str], segments=None) -> dict:
+    """Keyword arguments for a generator from the positional CLI parameters."""
+    if geom_type == "flower":
+        return {"rings": int(params[0]) if params else 2}
+    if geom_type == "metatron":
+        return {}
+    if geom_type == "spiral":
+        kwargs = {"loops": int(params[0]) if params else 3}
+        if segments:
+            kwargs["points_per_loop"] = segments
+        return kwargs
+    if geom_type == "platonic":
+        return {"solid_type": params[0] if params else "icosahedron"}
+    if geom_type == "star":
+        return {"points": int(params[0]) if params else 6}
+    if geom_type == "torus":
+        kwargs = {"p": int(params[0]) if len(params) > 0 else 2, "q": int(params[1]) if len(params) > 1 else 3}
+        if segments:
+            kwargs["segments"] = segments
+        return kwargs
+    raise ValueError(f"Unknown type: {geom_type}")
+
+
+def _best_time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark(repeat: int = 3) -> List[Tuple]:
+    """
+    Time generation plus serialization, dict/JSON path versus buffers.
+
+    Returns:
+        Rows of (case, json_seconds, json_bytes, buffer_seconds, buffer_bytes)
+    """
+    cases = [
+        ("torus 2 3, 100k segments", "torus", {"segments": 100_000}),
+        ("spiral 10 loops x 10k", "spiral", {"loops": 10, "points_per_loop": 10_000}),
+        ("metatron", "metatron", {}),
+        ("platonic dodecahedron", "platonic", {"solid_type": "dodecahedron"}),
+    ]
+    rows = []
+    for label, geom_type, kwargs in cases:
+        make_dicts, make_buffers = GENERATORS[geom_type]
+        json_bytes = len(json.dumps(make_dicts(**kwargs), indent=2))
+        buffer_bytes = buffer_layout(make_buffers(**kwargs))[1]
+        rows.append((
+            label,
+            _best_time(lambda: json.dumps(make_dicts(**kwargs), indent=2), repeat),
+            json_bytes,
+            _best_time(lambda: buffer_layout(make_buffers(**kwargs)), repeat),
+            len(buffer_bytes),
+        ))
+    return rows
+
+
+def print_benchmark(rows: List[Tuple]):
+    print(f"Buffers built with {'NumPy ' + np.__version__ if np is not None else 'the array module (NumPy not installed)'}")
+    print(f"{'case':<30} {'json ms':>9} {'json KB':>9} {'buffer ms':>10} {'buffer KB':>10} {'speedup':>8}")
+    for label, json_s, json_bytes, buffer_s, buffer_bytes in rows:
+        print(f"{label:<30} {json_s * 1000:9.2f} {json_bytes / 1024:9.1f} "
+              f"{buffer_s * 1000:10.2f} {buffer_bytes / 1024:10.1f} {json_s / buffer_s:7.1f}x")
+
+
 if __name__ == "__main__":
-    import sys
-    
-    if len(sys.argv) < 2:
-        print("Usage: sacred_geometry.py <type> [params...]")
+    parser = argparse.ArgumentParser(description="Sacred geometry vertex data for Three.js")
+    parser.add_argument("type", nargs="?", choices=sorted(GENERATORS), help="Geometry type")
+    parser.add_argument("params", nargs="*", help="Type parameters: flower RINGS, spiral LOOPS, platonic SOLID, star POINTS, torus P Q")
+    parser.add_argument("--segments", type=int, help="Torus knot segments or spiral points per loop")
+    parser.add_argument("--format", choices=["json", "buffers", "binary"], default="json",
+                        help="json: one object per vertex (default); buffers: JSON header with a base64 buffer; "
+                             "binary: OUTPUT.bin plus OUTPUT.json header")
+    parser.add_argument("-o", "--output", help="Output path (prefix for --format binary)")
+    parser.add_argument("--benchmark", action="store_true", help="Compare the dict/JSON path with the buffer path")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        print_benchmark(benchmark())
+        sys.exit(0)
+
+    if not args.type:
+        parser.print_usage()
         print("Types: flower, metatron, spiral, platonic, star, torus")
         sys.exit(1)
-    
-    geom_type = sys.argv[1]
-    
-    if geom_type == "flower":
-        rings = int(sys.argv[2]) if len(sys.argv) > 2 else 2
-        result = flower_of_life(rings=rings)
-    elif geom_type == "metatron":
-        result = metatrons_cube()
-    elif geom_type == "spiral":
-        loops = int(sys.argv[2]) if len(sys.argv) > 2 else 3
-        result = golden_spiral(loops=loops)
-    elif geom_type == "platonic":
-        solid = sys.argv[2] if len(sys.argv) > 2 else "icosahedron"
-        result = platonic_solid(solid)
-    elif geom_type == "star":
-        points = int(sys.argv[2]) if len(sys.argv) > 2 else 6
-        result = star_polygon(points=points)
-    elif geom_type == "torus":
-        p = int(sys.argv[2]) if len(sys.argv) > 2 else 2
-        q = int(sys.argv[3]) if len(sys.argv) > 3 else 3
-        result = torus_knot_points(p=p, q=q)
+
+    make_dicts, make_buffers = GENERATORS[args.type]
+    kwargs = generator_kwargs(args.type, args.params, args.segments)
+
+    if args.format == "binary":
+        if not args.output:
+            parser.error("--format binary needs -o/--output")
+        header, blob = buffer_layout(make_buffers(**kwargs))
+        header["uri"] = f"{args.output.rsplit('/', 1)[-1]}.bin"
+        with open(f"{args.output}.bin", "wb") as f:
+            f.write(blob)
+        with open(f"{args.output}.json", "w") as f:
+            json.dump(header, f, indent=2)
+        print(f"Wrote {args.output}.bin ({len(blob)} bytes) and {args.output}.json", file=sys.stderr)
+        sys.exit(0)
+
+    if args.format == "buffers":
+        text = json.dumps(to_buffer_json(make_buffers(**kwargs)))
     else:
-        print(f"Unknown type: {geom_type}")
-        sys.exit(1)
-    
-    print(json.dumps(result, indent=2))
+        text = json.dumps(make_dicts(**kwargs), indent=2)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
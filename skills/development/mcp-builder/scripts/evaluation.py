@@ -5,18 +5,21 @@ This script evaluates MCP servers by running test questions against them using C
 
 import argparse
 import asyncio
+import functools
 import json
 import re
 import sys
 import time
 import traceback
 import xml.etree.ElementTree as ET
+from concurrent.futures import Executor, ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
 from anthropic import Anthropic
 
-from connections import create_connection
+from connections import MCPConnectionPool, checkout_wait, create_connection
+from response_cache import CACHE_MODES, CachedModelClient, CachedToolConnection
 
 EVALUATION_PROMPT = """You are an AI assistant with access to tools.
 
@@ -83,18 +86,53 @@ def extract_xml_content(text: str, tag: str) -> str | None:
     return matches[-1].strip() if matches else None
 
 
+async def call_tool_timed(
+    connection: Any,
+    tool_name: str,
+    tool_input: dict[str, Any],
+) -> tuple[str, float, float]:
+    """Call one tool, returning (response text, seconds queued, seconds running).
+
+    Queued time is spent waiting for a free pooled session, so it stays 0
+    without a pool (--pool-size 1); errors are returned as the response text.
+    """
+    checkout_wait.set(0.0)
+    tool_start_ts = time.time()
+    try:
+        tool_result = await connection.call_tool(tool_name, tool_input)
+        tool_response = json.dumps(tool_result) if isinstance(tool_result, (dict, list)) else str(tool_result)
+    except Exception as e:
+        tool_response = f"Error executing tool {tool_name}: {str(e)}\n"
+        tool_response += traceback.format_exc()
+    queued = checkout_wait.get()
+    return tool_response, queued, time.time() - tool_start_ts - queued
+
+
+async def create_message(client: Anthropic, executor: Executor | None, **kwargs: Any) -> Any:
+    """Run the blocking `client.messages.create` on `executor` (None: the loop's default).
+
+    A call that has started cannot be cancelled: cancelling the awaiting
+    task abandons it, but its thread runs until the API answers or the
+    client's own request timeout expires.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(client.messages.create, **kwargs))
+
+
 async def agent_loop(
     client: Anthropic,
     model: str,
     question: str,
     tools: list[dict[str, Any]],
     connection: Any,
+    executor: Executor | None = None,
 ) -> tuple[str, dict[str, Any]]:
     """Run the agent loop with MCP tools."""
     messages = [{"role": "user", "content": question}]
 
-    response = await asyncio.to_thread(
-        client.messages.create,
+    response = await create_message(
+        client,
+        executor,
         model=model,
         max_tokens=4096,
         system=EVALUATION_PROMPT,
@@ -107,35 +145,31 @@ async def agent_loop(
     tool_metrics = {}
 
     while response.stop_reason == "tool_use":
-        tool_use = next(block for block in response.content if block.type == "tool_use")
-        tool_name = tool_use.name
-        tool_input = tool_use.input
-
-        tool_start_ts = time.time()
-        try:
-            tool_result = await connection.call_tool(tool_name, tool_input)
-            tool_response = json.dumps(tool_result) if isinstance(tool_result, (dict, list)) else str(tool_result)
-        except Exception as e:
-            tool_response = f"Error executing tool {tool_name}: {str(e)}\n"
-            tool_response += traceback.format_exc()
-        tool_duration = time.time() - tool_start_ts
-
-        if tool_name not in tool_metrics:
-            tool_metrics[tool_name] = {"count": 0, "durations": []}
-        tool_metrics[tool_name]["count"] += 1
-        tool_metrics[tool_name]["durations"].append(tool_duration)
-
-        messages.append({
-            "role": "user",
-            "content": [{
+        # Run every tool call of the turn at once and answer them together
+        tool_uses = [block for block in response.content if block.type == "tool_use"]
+        outcomes = await asyncio.gather(*(
+            call_tool_timed(connection, tool_use.name, tool_use.input)
+            for tool_use in tool_uses
+        ))
+
+        tool_results = []
+        for tool_use, (tool_response, queued, duration) in zip(tool_uses, outcomes):
+            if tool_use.name not in tool_metrics:
+                tool_metrics[tool_use.name] = {"count": 0, "durations": [], "queued": []}
+            tool_metrics[tool_use.name]["count"] += 1
+            tool_metrics[tool_use.name]["durations"].append(duration)
+            tool_metrics[tool_use.name]["queued"].append(queued)
+            tool_results.append({
                 "type": "tool_result",
                 "tool_use_id": tool_use.id,
                 "content": tool_response,
-            }]
-        })
+            })
 
-        response = await asyncio.to_thread(
-            client.messages.create,
+        messages.append({"role": "user", "content": tool_results})
+
+        response = await create_message(
+            client,
+            executor,
             model=model,
             max_tokens=4096,
             system=EVALUATION_PROMPT,
@@ -158,12 +192,13 @@ async def evaluate_single_task(
     tools: list[dict[str, Any]],
     connection: Any,
     task_index: int,
+    executor: Executor | None = None,
 ) -> dict[str, Any]:
     """Evaluate a single QA pair with the given tools."""
     start_time = time.time()
 
     print(f"Task {task_index + 1}: Running task with question: {qa_pair['question']}")
-    response, tool_metrics = await agent_loop(client, model, qa_pair["question"], tools, connection)
+    response, tool_metrics = await agent_loop(client, model, qa_pair["question"], tools, connection, executor)
 
     response_value = extract_xml_content(response, "response")
     summary = extract_xml_content(response, "summary")
@@ -217,15 +252,84 @@ TASK_TEMPLATE = """
 """
 
 
+def failed_task_result(qa_pair: dict[str, Any], duration_seconds: float, error: str) -> dict[str, Any]:
+    """Result for a task that timed out or raised, so it is reported instead of aborting the run."""
+    return {
+        "question": qa_pair["question"],
+        "expected": qa_pair["answer"],
+        "actual": None,
+        "score": 0,
+        "total_duration": duration_seconds,
+        "tool_calls": {},
+        "num_tool_calls": 0,
+        "summary": None,
+        "feedback": error,
+    }
+
+
+async def run_tasks(
+    client: Anthropic,
+    model: str,
+    qa_pairs: list[dict[str, Any]],
+    tools: list[dict[str, Any]],
+    connection: Any,
+    concurrency: int = 1,
+    task_timeout: float | None = None,
+) -> list[dict[str, Any]]:
+    """Evaluate QA pairs with at most `concurrency` tasks in flight.
+
+    Tasks are independent and mostly wait on model and tool calls, so they
+    share one client and one MCP session. Model calls run on a thread pool
+    sized to `concurrency`, so the default executor's thread limit does not
+    cap it. Results are returned in QA pair order regardless of completion
+    order. A task that exceeds `task_timeout` seconds or raises is scored as
+    incorrect; a model call it was waiting on keeps its thread until the
+    call returns (see create_message).
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="model")
+
+    async def run_task(i: int, qa_pair: dict[str, Any]) -> dict[str, Any]:
+        async with semaphore:
+            print(f"Processing task {i + 1}/{len(qa_pairs)}")
+            start_time = time.time()
+            try:
+                return await asyncio.wait_for(
+                    evaluate_single_task(client, model, qa_pair, tools, connection, i, executor),
+                    timeout=task_timeout,
+                )
+            except asyncio.TimeoutError:
+                print(f"Task {i + 1}: Timed out after {task_timeout}s")
+                return failed_task_result(qa_pair, time.time() - start_time, f"Task timed out after {task_timeout}s")
+            except Exception as e:
+                print(f"Task {i + 1}: Failed with {type(e).__name__}: {e}")
+                return failed_task_result(
+                    qa_pair, time.time() - start_time, f"Task failed: {e}\n{traceback.format_exc()}"
+                )
+
+    try:
+        return list(await asyncio.gather(*(run_task(i, qa_pair) for i, qa_pair in enumerate(qa_pairs))))
+    finally:
+        # Do not wait for model calls abandoned by timed-out tasks
+        executor.shutdown(wait=False)
+
+
 async def run_evaluation(
     eval_path: Path,
     connection: Any,
     model: str = "claude-3-7-sonnet-20250219",
+    concurrency: int = 1,
+    task_timeout: float | None = None,
+    client: Any = None,
 ) -> str:
-    """Run evaluation with MCP server tools."""
+    """Run evaluation with MCP server tools.
+
+    `client` defaults to an Anthropic client; any object with a compatible
+    `messages.create` can be passed instead.
+    """
     print("🚀 Starting Evaluation")
 
-    client = Anthropic()
+    client = client or Anthropic()
 
     tools = await connection.list_tools()
     print(f"📋 Loaded {len(tools)} tools from MCP server")
@@ -233,11 +337,9 @@ async def run_evaluation(
     qa_pairs = parse_evaluation_file(eval_path)
     print(f"📋 Loaded {len(qa_pairs)} evaluation tasks")
 
-    results = []
-    for i, qa_pair in enumerate(qa_pairs):
-        print(f"Processing task {i + 1}/{len(qa_pairs)}")
-        result = await evaluate_single_task(client, model, qa_pair, tools, connection, i)
-        results.append(result)
+    started = time.time()
+    results = await run_tasks(client, model, qa_pairs, tools, connection, concurrency, task_timeout)
+    print(f"⏱️  Ran {len(results)} tasks in {time.time() - started:.2f}s (concurrency {max(1, concurrency)})")
 
     correct = sum(r["score"] for r in results)
     accuracy = (correct / len(results)) * 100 if results else 0
@@ -316,6 +418,12 @@ Examples:
 
   # Evaluate an HTTP MCP server with custom model
   python evaluation.py -t http -u https://example.com/mcp -m claude-3-5-sonnet-20241022 eval.xml
+
+  # Reuse cached model responses and tool results from earlier runs
+  python evaluation.py -t stdio -c python -a my_server.py --cache replay eval.xml
+
+  # Run 8 tasks at a time over 4 server processes, giving up on any task after 5 minutes
+  python evaluation.py -t stdio -c python -a my_server.py -j 8 -P 4 --task-timeout 300 eval.xml
         """,
     )
 
@@ -333,6 +441,12 @@ Examples:
     remote_group.add_argument("-H", "--header", nargs="+", dest="headers", help="HTTP headers in 'Key: Value' format (sse/http only)")
 
     parser.add_argument("-o", "--output", type=Path, help="Output file for evaluation report (default: stdout)")
+    parser.add_argument("-j", "--concurrency", type=int, default=1, help="Number of tasks to run in parallel (default: 1)")
+    parser.add_argument("-P", "--pool-size", type=int, default=1, help="Number of MCP sessions to open and share between tasks (default: 1)")
+    parser.add_argument("--cache", choices=CACHE_MODES, default="off", help="Model/tool response cache: record refreshes it, replay reuses it and records misses, strict fails on misses (default: off)")
+    parser.add_argument("--cache-dir", type=Path, default=Path(".eval_cache"), help="Cache directory (default: .eval_cache)")
+    parser.add_argument("--server-version", help="Version string in tool cache keys (default: the version the server reports)")
+    parser.add_argument("--task-timeout", type=float, help="Seconds before a task is abandoned and scored as incorrect (default: none)")
 
     args = parser.parse_args()
 
@@ -343,24 +457,46 @@ Examples:
     headers = parse_headers(args.headers) if args.headers else None
     env_vars = parse_env_vars(args.env) if args.env else None
 
+    connection_args = dict(
+        transport=args.transport,
+        command=args.command,
+        args=args.args,
+        env=env_vars,
+        url=args.url,
+        headers=headers,
+    )
     try:
-        connection = create_connection(
-            transport=args.transport,
-            command=args.command,
-            args=args.args,
-            env=env_vars,
-            url=args.url,
-            headers=headers,
-        )
+        if args.pool_size > 1:
+            connection = MCPConnectionPool(args.pool_size, **connection_args)
+        else:
+            connection = create_connection(**connection_args)
     except ValueError as e:
         print(f"Error: {e}")
         sys.exit(1)
 
+    client = None
+    if args.cache != "off":
+        client = CachedModelClient(Anthropic(), args.cache_dir, args.cache)
+        connection = CachedToolConnection(connection, args.cache_dir, args.cache, args.server_version)
+
     print(f"🔗 Connecting to MCP server via {args.transport}...")
 
     async with connection:
         print("✅ Connected successfully")
-        report = await run_evaluation(args.eval_file, connection, args.model)
+        report = await run_evaluation(
+            args.eval_file,
+            connection,
+            args.model,
+            concurrency=args.concurrency,
+            task_timeout=args.task_timeout,
+            client=client,
+        )
+        if client is not None:
+            model_stats, tool_stats = client.store.stats, connection.store.stats
+            print(
+                f"💾 Cache ({args.cache}): model {model_stats['hits']} hits / {model_stats['misses']} misses, "
+                f"tools {tool_stats['hits']} hits / {tool_stats['misses']} misses"
+            )
 
         if args.output:
             args.output.write_text(report)
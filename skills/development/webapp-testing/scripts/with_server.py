@@ -2,6 +2,10 @@
 """
 Start one or more servers, wait for them to be ready, run a command, then clean up.
 
+All servers start at once and are checked for readiness in parallel. Each
+server's output is drained continuously (so a chatty server never blocks on
+a full pipe) and can be saved with --log-dir.
+
 Usage:
     # Single server
     python scripts/with_server.py --server "npm run dev" --port 5173 -- python automation.py
@@ -12,76 +16,261 @@ Usage:
       --server "cd backend && python server.py" --port 3000 \
       --server "cd frontend && npm run dev" --port 5173 \
       -- python test.py
+
+    # Wait for an HTTP health endpoint and keep the server logs
+    python scripts/with_server.py --server "npm start" --port 3000 --health /api/health \
+      --log-dir /tmp/server-logs -- python test.py
+
+    # Keep servers warm across many commands (POSIX only)
+    python scripts/with_server.py --daemon --server "npm run dev" --port 5173
+    python scripts/with_server.py --reuse -- python test_login.py
+    python scripts/with_server.py --reuse -- python test_checkout.py
+    python scripts/with_server.py --stop
+
+The daemon records its servers in <state-dir>/state.json (default
+.with_server/) and shuts them down after --idle-timeout seconds without a
+--reuse command running. --reuse with --server/--port starts the daemon
+first if it is not running yet.
 """
 
+import json
+import os
+import signal
 import subprocess
 import socket
+import threading
 import time
 import sys
 import argparse
+import urllib.error
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
 
-def is_server_ready(port, timeout=30):
-    """Wait for server to be ready by polling the port."""
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        try:
-            with socket.create_connection(('localhost', port), timeout=1):
+try:
+    import fcntl
+except ImportError:  # daemon mode is POSIX only
+    fcntl = None
+
+# Readiness polling: first retry after INITIAL_BACKOFF, doubling up to MAX_BACKOFF
+INITIAL_BACKOFF = 0.05
+MAX_BACKOFF = 0.5
+
+# Seconds a server must stay up after its port opens before it counts as
+# ready, so a server that failed to bind behind another listener is caught
+READY_GRACE = 0.3
+
+# Output lines kept per server to show when it fails to start
+LOG_TAIL_LINES = 20
+
+# Daemon mode: state directory, idle shutdown and supervisor poll interval
+DEFAULT_STATE_DIR = '.with_server'
+DEFAULT_IDLE_TIMEOUT = 600
+IDLE_POLL_INTERVAL = 1.0
+
+
+def is_port_open(port, timeout=1):
+    """Check once whether something accepts connections on the port."""
+    try:
+        with socket.create_connection(('localhost', port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def is_http_healthy(port, path, timeout=2):
+    """Check once whether GET <path> answers with a non-error status."""
+    url = f"http://localhost:{port}/{path.lstrip('/')}"
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return response.status < 400
+    except (urllib.error.URLError, OSError, ValueError):
+        return False
+
+
+def is_server_ready(port, timeout=30, health=None, process=None):
+    """Wait for server to be ready, polling with exponential backoff.
+
+    Ready means the port accepts connections and, if a health path is given,
+    it answers with a 2xx/3xx status. Gives up early if `process` exits, and
+    only counts an open port once `process` has outlived READY_GRACE, since
+    the listener may belong to something else.
+    """
+    deadline = time.monotonic() + timeout
+    delay = INITIAL_BACKOFF
+    while True:
+        if is_port_open(port) and (not health or is_http_healthy(port, health)):
+            if process is None:
                 return True
-        except (socket.error, ConnectionRefusedError):
-            time.sleep(0.5)
-    return False
+            grace_end = time.monotonic() + READY_GRACE
+            while process.poll() is None:
+                if time.monotonic() >= grace_end:
+                    return True
+                time.sleep(INITIAL_BACKOFF)
+            return False
+        if process is not None and process.poll() is not None:
+            return False
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, MAX_BACKOFF)
 
 
-def main():
-    parser = argparse.ArgumentParser(description='Run command with one or more servers')
-    parser.add_argument('--server', action='append', dest='servers', required=True, help='Server command (can be repeated)')
-    parser.add_argument('--port', action='append', dest='ports', type=int, required=True, help='Port for each server (must match --server count)')
-    parser.add_argument('--timeout', type=int, default=30, help='Timeout in seconds per server (default: 30)')
-    parser.add_argument('command', nargs=argparse.REMAINDER, help='Command to run after server(s) ready')
+class ManagedServer:
+    """A server process whose combined stdout/stderr is drained by a background thread."""
 
-    args = parser.parse_args()
+    def __init__(self, index, cmd, port, health=None, log_path=None):
+        self.index = index
+        self.cmd = cmd
+        self.port = port
+        self.health = health
+        self.log_path = log_path
+        self.process = None
+        self.startup_time = None
+        self.tail = deque(maxlen=LOG_TAIL_LINES)
+        self._drain_thread = None
 
-    # Remove the '--' separator if present
-    if args.command and args.command[0] == '--':
-        args.command = args.command[1:]
+    def start(self):
+        # Use shell=True to support commands with cd and &&; on POSIX the server
+        # gets its own process group so stop() also reaches what the shell started
+        self.process = subprocess.Popen(
+            self.cmd,
+            shell=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            start_new_session=(os.name == 'posix'),
+        )
+        self._started_at = time.monotonic()
+        self._drain_thread = threading.Thread(target=self._drain, name=f"server-{self.index}-log", daemon=True)
+        self._drain_thread.start()
 
-    if not args.command:
-        print("Error: No command specified to run")
-        sys.exit(1)
+    def _drain(self):
+        log_file = open(self.log_path, 'wb') if self.log_path else None
+        try:
+            for line in iter(self.process.stdout.readline, b''):
+                self.tail.append(line)
+                if log_file:
+                    log_file.write(line)
+                    log_file.flush()
+        finally:
+            if log_file:
+                log_file.close()
 
-    # Parse server configurations
+    def wait_ready(self, timeout):
+        """Block until ready; records and returns the startup time, or None on failure."""
+        if not is_server_ready(self.port, timeout=timeout, health=self.health, process=self.process):
+            return None
+        self.startup_time = time.monotonic() - self._started_at
+        return self.startup_time
+
+    def failure_reason(self, timeout):
+        code = self.process.poll()
+        if code is not None:
+            return f"exited with code {code} before becoming ready"
+        target = f"http://localhost:{self.port}/{self.health.lstrip('/')}" if self.health else f"port {self.port}"
+        return f"not ready on {target} within {timeout}s"
+
+    def _signal(self, sig):
+        if os.name != 'posix':
+            if sig == signal.SIGTERM:
+                self.process.terminate()
+            else:
+                self.process.kill()
+            return
+        try:
+            os.killpg(self.process.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def stop(self):
+        try:
+            self._signal(signal.SIGTERM)
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._signal(getattr(signal, 'SIGKILL', signal.SIGTERM))
+            self.process.wait()
+        if self._drain_thread:
+            self._drain_thread.join(timeout=1)
+
+
+def start_servers(servers, timeout):
+    """Start all servers at once and wait for them in parallel.
+
+    Raises RuntimeError naming every server that failed, with its last output.
+    """
+    for server in servers:
+        print(f"Starting server {server.index}/{len(servers)}: {server.cmd}")
+        server.start()
+
+    print(f"Waiting for {len(servers)} server(s)...")
+    with ThreadPoolExecutor(max_workers=len(servers)) as pool:
+        for server, startup_time in zip(servers, pool.map(lambda s: s.wait_ready(timeout), servers)):
+            if startup_time is not None:
+                print(f"Server ready on port {server.port} in {startup_time:.2f}s")
+
+    failed = [server for server in servers if server.startup_time is None]
+    if failed:
+        messages = []
+        for server in failed:
+            message = f"Server {server.index} ({server.cmd}) {server.failure_reason(timeout)}"
+            if server.tail:
+                output = b''.join(server.tail).decode('utf-8', 'replace').rstrip()
+                message += f"\nLast output:\n{output}"
+            messages.append(message)
+        raise RuntimeError("\n".join(messages))
+
+
+def build_servers(args, log_dir=None):
+    """ManagedServers for the --server/--port/--health arguments; exits on a mismatch."""
     if len(args.servers) != len(args.ports):
         print("Error: Number of --server and --port arguments must match")
         sys.exit(1)
 
-    servers = []
-    for cmd, port in zip(args.servers, args.ports):
-        servers.append({'cmd': cmd, 'port': port})
+    health = args.health or [None]
+    if len(health) == 1:
+        health = health * len(args.servers)
+    elif len(health) != len(args.servers):
+        print("Error: Give --health once for all servers or once per --server")
+        sys.exit(1)
 
-    server_processes = []
+    if log_dir:
+        log_dir.mkdir(parents=True, exist_ok=True)
 
-    try:
-        # Start all servers
-        for i, server in enumerate(servers):
-            print(f"Starting server {i+1}/{len(servers)}: {server['cmd']}")
+    return [
+        ManagedServer(
+            index=i + 1,
+            cmd=cmd,
+            port=port,
+            health=path or None,
+            log_path=log_dir / f"server-{i + 1}.log" if log_dir else None,
+        )
+        for i, (cmd, port, path) in enumerate(zip(args.servers, args.ports, health))
+    ]
 
-            # Use shell=True to support commands with cd and &&
-            process = subprocess.Popen(
-                server['cmd'],
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            server_processes.append(process)
 
-            # Wait for this server to be ready
-            print(f"Waiting for server on port {server['port']}...")
-            if not is_server_ready(server['port'], timeout=args.timeout):
-                raise RuntimeError(f"Server failed to start on port {server['port']} within {args.timeout}s")
+def stop_servers(servers):
+    running = [server for server in servers if server.process is not None]
+    print(f"\nStopping {len(running)} server(s)...")
+    for server in running:
+        server.stop()
+        print(f"Server {server.index} stopped")
+    print("All servers stopped")
 
-            print(f"Server ready on port {server['port']}")
 
-        print(f"\nAll {len(servers)} server(s) ready")
+def run_once(args):
+    """Start the servers, run the command, stop the servers."""
+    servers = build_servers(args, args.log_dir)
+
+    started = time.monotonic()
+    try:
+        start_servers(servers, args.timeout)
+        print(f"\nAll {len(servers)} server(s) ready in {time.monotonic() - started:.2f}s")
+        if args.log_dir:
+            print(f"Server logs: {args.log_dir}")
 
         # Run the command
         print(f"Running: {' '.join(args.command)}\n")
@@ -90,17 +279,303 @@ def main():
 
     finally:
         # Clean up all servers
-        print(f"\nStopping {len(server_processes)} server(s)...")
-        for i, process in enumerate(server_processes):
-            try:
-                process.terminate()
-                process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                process.kill()
-                process.wait()
-            print(f"Server {i+1} stopped")
-        print("All servers stopped")
+        stop_servers(servers)
+
+
+# --- Daemon mode -------------------------------------------------------------
+#
+# A detached supervisor process (this script with --supervise) owns the
+# servers. It writes <state-dir>/state.json once they are ready and removes it
+# when it exits. Each --reuse command holds a lease file named after its PID
+# in <state-dir>/leases/ and touches state.json when it finishes; the
+# supervisor stops the servers once no lease is held and state.json has not
+# been touched for --idle-timeout seconds. Commands that find no daemon
+# take an exclusive lock on <state-dir>/lock before starting one, so
+# concurrent --reuse runs share a single supervisor.
+
+def state_path(state_dir):
+    return state_dir / 'state.json'
+
+
+def read_state(state_dir):
+    """The daemon state, or None if no daemon has written one."""
+    try:
+        with open(state_path(state_dir)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_state(state_dir, state):
+    tmp_path = state_dir / 'state.json.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, state_path(state_dir))
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def active_leases(state_dir):
+    """Number of leases held by running processes; stale leases are removed."""
+    lease_dir = state_dir / 'leases'
+    count = 0
+    for lease in lease_dir.glob('*') if lease_dir.is_dir() else ():
+        if lease.name.isdigit() and pid_alive(int(lease.name)):
+            count += 1
+        else:
+            lease.unlink(missing_ok=True)
+    return count
+
+
+def wait_until_idle(servers, state_dir, idle_timeout):
+    """Block until a server exits or nothing has used the servers for idle_timeout seconds."""
+    last_used = time.time()
+    while True:
+        time.sleep(IDLE_POLL_INTERVAL)
+        for server in servers:
+            code = server.process.poll()
+            if code is not None:
+                print(f"Server {server.index} exited with code {code}; shutting down")
+                return
+        if active_leases(state_dir):
+            last_used = time.time()
+            continue
+        try:
+            last_used = max(last_used, state_path(state_dir).stat().st_mtime)
+        except OSError:
+            print("State file removed; shutting down")
+            return
+        if time.time() - last_used > idle_timeout:
+            print(f"Idle for {idle_timeout}s; shutting down")
+            return
+
+
+def supervise(args):
+    """Body of the detached daemon process."""
+    state_dir = args.state_dir
+    servers = build_servers(args, args.log_dir or state_dir)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        start_servers(servers, args.timeout)
+        write_state(state_dir, {
+            'pid': os.getpid(),
+            'idle_timeout': args.idle_timeout,
+            'log_dir': str((args.log_dir or state_dir).resolve()),
+            'servers': [
+                {'cmd': server.cmd, 'port': server.port, 'health': server.health,
+                 'pid': server.process.pid, 'startup_time': round(server.startup_time, 3)}
+                for server in servers
+            ],
+        })
+        print(f"All {len(servers)} server(s) ready; supervisor PID {os.getpid()}", flush=True)
+        wait_until_idle(servers, state_dir, args.idle_timeout)
+    except RuntimeError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        state = read_state(state_dir)
+        if state and state.get('pid') == os.getpid():
+            state_path(state_dir).unlink(missing_ok=True)
+        stop_servers(servers)
+
+
+def live_state(state_dir):
+    """The state of a running daemon, clearing the state file of a dead one."""
+    state = read_state(state_dir)
+    if state is None:
+        return None
+    if not pid_alive(state['pid']):
+        state_path(state_dir).unlink(missing_ok=True)
+        return None
+    return state
+
+
+def start_daemon(args):
+    """Launch the supervisor and wait until its servers are ready. Returns the daemon state."""
+    state_dir = args.state_dir
+    state_dir.mkdir(parents=True, exist_ok=True)
+    argv = [sys.executable, os.path.abspath(__file__), '--supervise',
+            '--state-dir', str(state_dir.resolve()),
+            '--timeout', str(args.timeout), '--idle-timeout', str(args.idle_timeout)]
+    for cmd, port in zip(args.servers, args.ports):
+        argv += ['--server', cmd, '--port', str(port)]
+    for path in args.health or ():
+        argv += ['--health', path]
+    if args.log_dir:
+        argv += ['--log-dir', str(args.log_dir.resolve())]
+
+    log_path = state_dir / 'supervisor.log'
+    print(f"Starting {len(args.servers)} server(s) in the background (log: {log_path})")
+    started = time.monotonic()
+    with open(log_path, 'a') as log:
+        log_start = log.tell()
+        supervisor = subprocess.Popen(
+            argv,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            start_new_session=True,
+            env=dict(os.environ, PYTHONUNBUFFERED='1'),
+        )
+
+    delay = INITIAL_BACKOFF
+    while True:
+        state = read_state(state_dir)
+        if state and state['pid'] == supervisor.pid:
+            print(f"All {len(state['servers'])} server(s) ready in {time.monotonic() - started:.2f}s")
+            return state
+        if supervisor.poll() is not None:
+            with open(log_path) as log:
+                log.seek(log_start)
+                output = log.read().rstrip()
+            raise RuntimeError(f"Server daemon failed to start:\n{output}")
+        time.sleep(delay)
+        delay = min(delay * 2, MAX_BACKOFF)
+
+
+def same_servers(state, args):
+    return [(s['cmd'], s['port']) for s in state['servers']] == list(zip(args.servers, args.ports))
+
+
+@contextmanager
+def state_lock(state_dir):
+    """Hold an exclusive lock on <state-dir>/lock, so only one caller starts a daemon."""
+    state_dir.mkdir(parents=True, exist_ok=True)
+    with open(state_dir / 'lock', 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def ensure_daemon(args):
+    """State of a daemon running the requested servers, starting one if needed."""
+    state = live_state(args.state_dir)
+    if state is None:
+        with state_lock(args.state_dir):
+            # Another command may have started the daemon while we waited
+            state = live_state(args.state_dir)
+            if state is None:
+                if not args.servers:
+                    raise RuntimeError(f"No warm servers running in {args.state_dir}; start them with --daemon "
+                                       f"or pass --server/--port to --reuse")
+                return start_daemon(args)
+    if args.servers and not same_servers(state, args):
+        raise RuntimeError(f"The daemon in {args.state_dir} runs different servers; "
+                           f"stop it with --stop first")
+    return state
+
+
+def run_reused(args):
+    """Run the command against the warm servers, holding a lease while it runs."""
+    # Take the lease before checking the servers, so the idle timeout
+    # cannot stop them between the check and the command
+    lease_dir = args.state_dir / 'leases'
+    lease_dir.mkdir(parents=True, exist_ok=True)
+    lease = lease_dir / str(os.getpid())
+    lease.touch()
+    try:
+        state = ensure_daemon(args)
+        down = [s['port'] for s in state['servers'] if not is_port_open(s['port'])]
+        if down:
+            raise RuntimeError(f"Warm server(s) not accepting connections on port(s) "
+                               f"{', '.join(map(str, down))}; see {state['log_dir']}")
+
+        ports = ', '.join(str(s['port']) for s in state['servers'])
+        print(f"Reusing server(s) on port(s) {ports}")
+        print(f"Running: {' '.join(args.command)}\n")
+        return subprocess.run(args.command).returncode
+    finally:
+        lease.unlink(missing_ok=True)
+        try:
+            os.utime(state_path(args.state_dir))  # restart the idle clock
+        except OSError:
+            pass
+
+
+def stop_daemon(state_dir, timeout=15):
+    state = live_state(state_dir)
+    if state is None:
+        print(f"No warm servers running in {state_dir}")
+        return
+    os.kill(state['pid'], signal.SIGTERM)
+    deadline = time.monotonic() + timeout
+    while pid_alive(state['pid']) and time.monotonic() < deadline:
+        time.sleep(0.1)
+    print(f"Stopped server daemon (PID {state['pid']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run command with one or more servers')
+    parser.add_argument('--server', action='append', dest='servers', default=[], help='Server command (can be repeated)')
+    parser.add_argument('--port', action='append', dest='ports', type=int, default=[], help='Port for each server (must match --server count)')
+    parser.add_argument('--health', action='append', dest='health', help='HTTP path that must answer 2xx/3xx before a server counts as ready; give once for all servers or once per server ("" to skip one)')
+    parser.add_argument('--log-dir', type=Path, help='Save each server\'s output to <log-dir>/server-N.log')
+    parser.add_argument('--timeout', type=int, default=30, help='Timeout in seconds per server (default: 30)')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--daemon', action='store_true', help='Start the servers in the background and exit once they are ready')
+    mode.add_argument('--reuse', action='store_true', help='Run the command against the daemon\'s servers (starting it first if --server is given)')
+    mode.add_argument('--stop', action='store_true', help='Stop the daemon and its servers')
+    mode.add_argument('--supervise', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--idle-timeout', type=int, default=DEFAULT_IDLE_TIMEOUT, help=f'Daemon mode: stop the servers after this many idle seconds (default: {DEFAULT_IDLE_TIMEOUT})')
+    parser.add_argument('--state-dir', type=Path, default=Path(DEFAULT_STATE_DIR), help=f'Daemon mode: state, lease and log directory (default: {DEFAULT_STATE_DIR})')
+    parser.add_argument('command', nargs=argparse.REMAINDER, help='Command to run after server(s) ready')
+
+    args = parser.parse_args()
+
+    # Remove the '--' separator if present
+    if args.command and args.command[0] == '--':
+        args.command = args.command[1:]
+
+    daemon_mode = args.daemon or args.reuse or args.stop or args.supervise
+    if daemon_mode and os.name != 'posix':
+        print("Error: --daemon, --reuse and --stop are only supported on POSIX systems")
+        sys.exit(1)
+
+    if args.supervise:
+        supervise(args)
+        return
+
+    if args.stop:
+        stop_daemon(args.state_dir)
+        return
+
+    if not args.servers and not args.reuse:
+        print("Error: At least one --server and --port is required")
+        sys.exit(1)
+
+    if args.daemon:
+        try:
+            state = ensure_daemon(args)
+        except RuntimeError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(f"Server daemon PID {state['pid']}; logs in {state['log_dir']}")
+        print("Run commands with --reuse; stop with --stop")
+        return
+
+    if not args.command:
+        print("Error: No command specified to run")
+        sys.exit(1)
+
+    if args.reuse:
+        try:
+            sys.exit(run_reused(args))
+        except RuntimeError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
+    run_once(args)
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
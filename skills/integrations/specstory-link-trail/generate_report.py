@@ -2,7 +2,8 @@
 """
 Generate a markdown report from parsed WebFetch data.
 
-Reads JSON from parse_webfetch.py and produces a formatted report with:
+Reads JSON (an array, or NDJSON with one result per line) from
+parse_webfetch.py and produces a formatted report with:
 - Sessions grouped by file/date
 - Successful vs failed fetches separated
 - Deduplication with fetch counts
@@ -12,6 +13,8 @@ Usage:
     python generate_report.py <json_file>
     python generate_report.py -              # Read from stdin
     cat data.json | python generate_report.py -
+    python parse_webfetch.py --ndjson --workers 0 .specstory/history/*.md | \
+        python generate_report.py -
 
 Output: Markdown report to stdout
 """
@@ -21,7 +24,7 @@ import json
 import re
 from collections import defaultdict
 from datetime import datetime
-from typing import Optional
+from typing import Iterable, Iterator, Optional, TextIO
 
 
 def extract_date_from_filename(filename: str) -> Optional[str]:
@@ -103,134 +106,194 @@ def format_error(error: str, error_raw: Optional[str] = None) -> str:
     return error_descriptions.get(error, error or 'Unknown error')
 
 
-def generate_report(data: list[dict]) -> str:
-    """Generate markdown report from parsed WebFetch data."""
-    if not data:
-        return "# Link Trail Report\n\nNo WebFetch instances found.\n"
-
-    # Group by file
-    by_file = defaultdict(list)
-    for item in data:
-        by_file[item['file']].append(item)
-
-    # Sort files by date (extracted from filename)
-    sorted_files = sorted(
-        by_file.keys(),
-        key=lambda f: extract_date_from_filename(f) or '0000-00-00',
-        reverse=True
-    )
-
-    # Calculate global stats
-    total_fetches = len(data)
-    successful = sum(1 for d in data if d['success'])
-    failed = total_fetches - successful
-
-    # Track unique URLs across all files
-    all_urls = defaultdict(int)
-    for item in data:
+class SessionGroup:
+    """Fetches of one session file, deduplicated by URL as they arrive."""
+
+    def __init__(self):
+        self.total = 0
+        self.successful = 0
+        self.failed = 0
+        # url -> [count, first item's summary] / [count, first item's error, error_raw]
+        self.success_by_url: dict[str, list] = {}
+        self.failure_by_url: dict[str, list] = {}
+
+    def add(self, item: dict):
+        self.total += 1
+        url = item['url'] or 'Unknown'
+        if item['success']:
+            self.successful += 1
+            entry = self.success_by_url.get(url)
+            if entry is None:
+                self.success_by_url[url] = [1, item.get('summary', 'No summary')]
+            else:
+                entry[0] += 1
+        else:
+            self.failed += 1
+            entry = self.failure_by_url.get(url)
+            if entry is None:
+                self.failure_by_url[url] = [1, item.get('error'), item.get('error_raw')]
+            else:
+                entry[0] += 1
+
+
+class ReportBuilder:
+    """
+    Aggregate parsed WebFetch results one at a time.
+
+    Only per-URL counters and per-session groups are kept, so results can
+    be streamed in without holding them all in memory.
+    """
+
+    def __init__(self):
+        self.total_fetches = 0
+        self.successful = 0
+        self.by_file: dict[str, SessionGroup] = {}
+        self.all_urls: dict[str, int] = defaultdict(int)
+
+    def add(self, item: dict):
+        self.total_fetches += 1
+        if item['success']:
+            self.successful += 1
         if item['url']:
-            all_urls[item['url']] += 1
-
-    unique_urls = len(all_urls)
-    duplicate_fetches = sum(1 for count in all_urls.values() if count > 1)
-
-    # Build report
-    lines = []
-    lines.append("# Link Trail Report")
-    lines.append("")
-    lines.append("## Summary")
-    lines.append("")
-    lines.append(f"- **Total WebFetch calls:** {total_fetches}")
-    lines.append(f"- **Unique URLs:** {unique_urls}")
-    lines.append(f"- **Successful:** {successful} ({successful/total_fetches*100:.0f}%)")
-    lines.append(f"- **Failed:** {failed} ({failed/total_fetches*100:.0f}%)")
-    if duplicate_fetches:
-        lines.append(f"- **URLs fetched multiple times:** {duplicate_fetches}")
-    lines.append(f"- **Sessions analyzed:** {len(by_file)}")
-    lines.append("")
-
-    # Report by session
-    lines.append("---")
-    lines.append("")
-
-    for filepath in sorted_files:
-        items = by_file[filepath]
-        date = extract_date_from_filename(filepath)
-        title = extract_session_title(filepath)
-
-        lines.append(f"## {date or 'Unknown Date'}: {title or 'Session'}")
+            self.all_urls[item['url']] += 1
+        group = self.by_file.get(item['file'])
+        if group is None:
+            group = self.by_file[item['file']] = SessionGroup()
+        group.add(item)
+
+    def add_all(self, items: Iterable[dict]) -> 'ReportBuilder':
+        for item in items:
+            self.add(item)
+        return self
+
+    def render(self) -> str:
+        """Markdown report of everything added so far."""
+        if not self.total_fetches:
+            return "# Link Trail Report\n\nNo WebFetch instances found.\n"
+
+        by_file = self.by_file
+        all_urls = self.all_urls
+
+        # Sort files by date (extracted from filename)
+        sorted_files = sorted(
+            by_file.keys(),
+            key=lambda f: extract_date_from_filename(f) or '0000-00-00',
+            reverse=True
+        )
+
+        # Calculate global stats
+        total_fetches = self.total_fetches
+        successful = self.successful
+        failed = total_fetches - successful
+
+        unique_urls = len(all_urls)
+        duplicate_fetches = sum(1 for count in all_urls.values() if count > 1)
+
+        # Build report
+        lines = []
+        lines.append("# Link Trail Report")
         lines.append("")
-        lines.append(f"**File:** `{filepath.split('/')[-1]}`")
-        lines.append(f"**Total fetches:** {len(items)}")
+        lines.append("## Summary")
+        lines.append("")
+        lines.append(f"- **Total WebFetch calls:** {total_fetches}")
+        lines.append(f"- **Unique URLs:** {unique_urls}")
+        lines.append(f"- **Successful:** {successful} ({successful/total_fetches*100:.0f}%)")
+        lines.append(f"- **Failed:** {failed} ({failed/total_fetches*100:.0f}%)")
+        if duplicate_fetches:
+            lines.append(f"- **URLs fetched multiple times:** {duplicate_fetches}")
+        lines.append(f"- **Sessions analyzed:** {len(by_file)}")
         lines.append("")
 
-        # Separate successful and failed
-        successes = [i for i in items if i['success']]
-        failures = [i for i in items if not i['success']]
-
-        # Deduplicate within session
-        success_by_url = defaultdict(list)
-        for item in successes:
-            url = item['url'] or 'Unknown'
-            success_by_url[url].append(item)
+        # Report by session
+        lines.append("---")
+        lines.append("")
 
-        failure_by_url = defaultdict(list)
-        for item in failures:
-            url = item['url'] or 'Unknown'
-            failure_by_url[url].append(item)
+        for filepath in sorted_files:
+            group = by_file[filepath]
+            date = extract_date_from_filename(filepath)
+            title = extract_session_title(filepath)
 
-        if successes:
-            lines.append(f"### Successful ({len(successes)})")
+            lines.append(f"## {date or 'Unknown Date'}: {title or 'Session'}")
+            lines.append("")
+            lines.append(f"**File:** `{filepath.split('/')[-1]}`")
+            lines.append(f"**Total fetches:** {group.total}")
             lines.append("")
-            lines.append("| URL | Summary |")
-            lines.append("|-----|---------|")
 
-            for url, items_list in sorted(success_by_url.items()):
-                display_url = truncate_url(url)
-                summary = items_list[0].get('summary', 'No summary')
-                count_note = f" (x{len(items_list)})" if len(items_list) > 1 else ""
-                # Escape pipe characters in summary
-                summary = (summary or 'No summary').replace('|', '\\|')
-                lines.append(f"| {display_url}{count_note} | {summary} |")
+            if group.successful:
+                lines.append(f"### Successful ({group.successful})")
+                lines.append("")
+                lines.append("| URL | Summary |")
+                lines.append("|-----|---------|")
 
-            lines.append("")
+                for url, (count, summary) in sorted(group.success_by_url.items()):
+                    display_url = truncate_url(url)
+                    count_note = f" (x{count})" if count > 1 else ""
+                    # Escape pipe characters in summary
+                    summary = (summary or 'No summary').replace('|', '\\|')
+                    lines.append(f"| {display_url}{count_note} | {summary} |")
+
+                lines.append("")
 
-        if failures:
-            lines.append(f"### Failed ({len(failures)})")
+            if group.failed:
+                lines.append(f"### Failed ({group.failed})")
+                lines.append("")
+                lines.append("| URL | Error |")
+                lines.append("|-----|-------|")
+
+                for url, (count, error, error_raw) in sorted(group.failure_by_url.items()):
+                    display_url = truncate_url(url)
+                    error = format_error(error, error_raw)
+                    count_note = f" (x{count})" if count > 1 else ""
+                    lines.append(f"| {display_url}{count_note} | {error} |")
+
+                lines.append("")
+
+            lines.append("---")
             lines.append("")
-            lines.append("| URL | Error |")
-            lines.append("|-----|-------|")
-
-            for url, items_list in sorted(failure_by_url.items()):
-                display_url = truncate_url(url)
-                error = format_error(
-                    items_list[0].get('error'),
-                    items_list[0].get('error_raw')
-                )
-                count_note = f" (x{len(items_list)})" if len(items_list) > 1 else ""
-                lines.append(f"| {display_url}{count_note} | {error} |")
 
+        # Add URL index if there are URLs fetched multiple times
+        multi_fetch_urls = {url: count for url, count in all_urls.items() if count > 1}
+        if multi_fetch_urls:
+            lines.append("## URLs Fetched Multiple Times")
+            lines.append("")
+            lines.append("| URL | Times Fetched |")
+            lines.append("|-----|---------------|")
+            for url, count in sorted(multi_fetch_urls.items(), key=lambda x: -x[1]):
+                lines.append(f"| {truncate_url(url)} | {count} |")
             lines.append("")
 
+        # Footer
         lines.append("---")
-        lines.append("")
+        lines.append(f"*Generated by link-trail skill*")
 
-    # Add URL index if there are URLs fetched multiple times
-    multi_fetch_urls = {url: count for url, count in all_urls.items() if count > 1}
-    if multi_fetch_urls:
-        lines.append("## URLs Fetched Multiple Times")
-        lines.append("")
-        lines.append("| URL | Times Fetched |")
-        lines.append("|-----|---------------|")
-        for url, count in sorted(multi_fetch_urls.items(), key=lambda x: -x[1]):
-            lines.append(f"| {truncate_url(url)} | {count} |")
-        lines.append("")
+        return '\n'.join(lines)
 
-    # Footer
-    lines.append("---")
-    lines.append(f"*Generated by link-trail skill*")
 
-    return '\n'.join(lines)
+def generate_report(data: Iterable[dict]) -> str:
+    """Generate markdown report from parsed WebFetch data."""
+    return ReportBuilder().add_all(data).render()
+
+
+def read_items(handle: TextIO) -> Iterator[dict]:
+    """
+    Parsed results from a JSON array or NDJSON stream.
+
+    A leading ``[`` means the whole input is one JSON array; anything else
+    is read one JSON object per line.
+    """
+    first = ''
+    while not first:
+        line = handle.readline()
+        if not line:
+            return
+        first = line.strip()
+    if first.startswith('['):
+        yield from json.loads(line + handle.read())
+        return
+    yield json.loads(first)
+    for line in handle:
+        if line.strip():
+            yield json.loads(line)
 
 
 def main():
@@ -243,10 +306,10 @@ def main():
 
     try:
         if input_source == '-':
-            data = json.load(sys.stdin)
+            report = generate_report(read_items(sys.stdin))
         else:
             with open(input_source, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+                report = generate_report(read_items(f))
     except json.JSONDecodeError as e:
         print(f"Error: Invalid JSON input: {e}", file=sys.stderr)
         sys.exit(1)
@@ -254,7 +317,6 @@ def main():
         print(f"Error: File not found: {input_source}", file=sys.stderr)
         sys.exit(1)
 
-    report = generate_report(data)
     print(report)
 
 
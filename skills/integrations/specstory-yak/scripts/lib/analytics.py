@@ -0,0 +1,127 @@
+"""Batch scoring and cross-session aggregates for team dashboards.
+
+Sessions are reduced to a feature matrix (one row per session) and scored
+in one vectorized pass with NumPy when it is installed; without it the same
+formulas run row by row, so results never depend on NumPy being present.
+"""
+
+from datetime import datetime
+from typing import Callable, Optional
+
+from .models import SessionAnalysis
+from .scoring import (
+    DEFAULT_CLASSIFIER,
+    FEATURES,
+    WEIGHTS,
+    DomainClassifier,
+    factor_scores,
+    score_breakdown,
+    session_features,
+    weighted_total,
+)
+
+try:
+    import numpy as np
+except ImportError:  # optional: only speeds up batch scoring
+    np = None
+
+
+def _score_columns(features) -> tuple[list[int], dict]:
+    """Final scores and per-factor score lists for a feature matrix."""
+    if np is None:
+        rows = [factor_scores(*row) for row in features]
+        columns = {factor: [scores[factor] for scores in rows] for factor in WEIGHTS}
+        return [int(weighted_total(scores)) for scores in rows], columns
+
+    matrix = np.asarray(features, dtype=np.int64).reshape(-1, len(FEATURES))
+    columns = factor_scores(*matrix.T, minimum=np.minimum, where=np.where)
+    totals = np.trunc(weighted_total(columns)).astype(np.int64).tolist()
+    return totals, {factor: column.tolist() for factor, column in columns.items()}
+
+
+def score_matrix(features) -> list[int]:
+    """
+    Yak shave scores for a feature matrix, equal to compute_yak_shave_score
+    for every row.
+    """
+    return _score_columns(features)[0]
+
+
+def score_sessions(analyses: list[SessionAnalysis],
+                   classifier: DomainClassifier = DEFAULT_CLASSIFIER) -> list[int]:
+    """
+    Score many sessions in one pass.
+
+    Each session's yak_shave_score, is_yak_shave and score_breakdown are set
+    from the batch result, as analyze_session would set them.
+    """
+    totals, columns = _score_columns([session_features(a, classifier) for a in analyses])
+    for i, analysis in enumerate(analyses):
+        analysis.yak_shave_score = totals[i]
+        analysis.is_yak_shave = totals[i] > 40
+        analysis.score_breakdown = score_breakdown(
+            analysis, {factor: column[i] for factor, column in columns.items()}, classifier)
+    return totals
+
+
+def week_of(analysis: SessionAnalysis) -> str:
+    """ISO week (e.g. 2026-W04) of a session's timestamp, or "unknown"."""
+    try:
+        year, week, _ = datetime.fromisoformat(analysis.timestamp).isocalendar()
+    except ValueError:
+        return "unknown"
+    return f"{year}-W{week:02d}"
+
+
+def author_of(analysis: SessionAnalysis) -> str:
+    return analysis.author or "unknown"
+
+
+def aggregate_scores(analyses: list[SessionAnalysis], scores: list[int],
+                     key: Callable[[SessionAnalysis], str]) -> list[dict]:
+    """
+    Per-group totals of session scores, sorted by group key.
+
+    Each row has the group key, session count, average and peak score, and
+    how many sessions were yak shaves (score above 40).
+    """
+    keys = [key(a) for a in analyses]
+    if not keys:
+        return []
+
+    if np is None:
+        groups: dict[str, list[int]] = {}
+        for group, score in zip(keys, scores):
+            groups.setdefault(group, []).append(score)
+        return [
+            {"key": group, "sessions": len(values), "average": sum(values) / len(values),
+             "peak": max(values), "yak_shaves": sum(1 for v in values if v > 40)}
+            for group, values in sorted(groups.items())
+        ]
+
+    labels, inverse = np.unique(np.asarray(keys, dtype=object), return_inverse=True)
+    values = np.asarray(scores, dtype=np.int64)
+    counts = np.bincount(inverse, minlength=len(labels))
+    totals = np.bincount(inverse, weights=values, minlength=len(labels))
+    yaks = np.bincount(inverse, weights=values > 40, minlength=len(labels))
+    peaks = np.full(len(labels), np.iinfo(np.int64).min)
+    np.maximum.at(peaks, inverse, values)
+    return [
+        {"key": str(label), "sessions": int(count), "average": float(total / count),
+         "peak": int(peak), "yak_shaves": int(yak)}
+        for label, count, total, peak, yak in zip(labels, counts, totals, peaks, yaks)
+    ]
+
+
+def session_trends(analyses: list[SessionAnalysis], scores: Optional[list[int]] = None) -> dict:
+    """
+    Per-author and per-week aggregates for format_report and JSON output.
+
+    Uses each session's yak_shave_score unless scores are given.
+    """
+    if scores is None:
+        scores = [a.yak_shave_score for a in analyses]
+    return {
+        "by_author": aggregate_scores(analyses, scores, author_of),
+        "by_week": aggregate_scores(analyses, scores, week_of),
+    }
@@ -7,11 +7,21 @@ generated frames, with automatic optimization for Slack's requirements.
 """
 
 from pathlib import Path
-from typing import Optional
-import imageio.v3 as imageio
+from typing import Callable, Iterable, Optional
+import itertools
 from PIL import Image
 import numpy as np
 
+from core.gif_writer import ReservoirSampler, StreamingGIFWriter
+from core.palette import Palette, build_palette, quantize_frames
+from core.size_optimizer import SizeOptimizer
+
+
+def _frame_similarity(prev_frame: np.ndarray, curr_frame: np.ndarray) -> float:
+    """Normalized similarity (0.0-1.0) between two RGB frames."""
+    diff = np.abs(prev_frame.astype(np.float32) - curr_frame.astype(np.float32))
+    return 1.0 - (np.mean(diff) / 255.0)
+
 
 class GIFBuilder:
     """Builder for creating optimized GIFs from frames."""
@@ -37,6 +47,10 @@ class GIFBuilder:
         Args:
             frame: Frame as numpy array or PIL Image (will be converted to RGB)
         """
+        self.frames.append(self._normalize_frame(frame))
+
+    def _normalize_frame(self, frame: np.ndarray | Image.Image) -> np.ndarray:
+        """Convert a frame to an RGB array at the builder's dimensions."""
         if isinstance(frame, Image.Image):
             frame = np.array(frame.convert('RGB'))
 
@@ -46,67 +60,60 @@ class GIFBuilder:
             pil_frame = pil_frame.resize((self.width, self.height), Image.Resampling.LANCZOS)
             frame = np.array(pil_frame)
 
-        self.frames.append(frame)
+        return frame
 
     def add_frames(self, frames: list[np.ndarray | Image.Image]):
         """Add multiple frames at once."""
         for frame in frames:
             self.add_frame(frame)
 
-    def optimize_colors(self, num_colors: int = 128, use_global_palette: bool = True) -> list[np.ndarray]:
+    def quantize(self, num_colors: int = 128, method: str = 'median_cut',
+                 dither: str = 'floyd_steinberg', workers: Optional[int] = None) -> tuple[np.ndarray, Palette]:
+        """
+        Map all frames onto one global palette, keeping them as palette indices.
+
+        Args:
+            num_colors: Target number of colors (8-256)
+            method: Palette construction - 'median_cut' (default), 'octree' (faster) or 'kmeans'
+            dither: 'floyd_steinberg', 'ordered' (fast, vectorized) or 'none'
+            workers: Process count for Floyd-Steinberg dithering (None = in-process)
+
+        Returns:
+            Tuple of ((N, H, W) uint8 index array, Palette)
+        """
+        if not self.frames:
+            raise ValueError("No frames to quantize. Add frames with add_frame() first.")
+
+        palette = build_palette(self.frames, num_colors, method=method)
+        indices = quantize_frames(np.stack(self.frames), palette, dither=dither, workers=workers)
+        return indices, palette
+
+    def optimize_colors(self, num_colors: int = 128, use_global_palette: bool = True,
+                        method: str = 'median_cut', dither: str = 'floyd_steinberg',
+                        workers: Optional[int] = None) -> list[np.ndarray]:
         """
         Reduce colors in all frames using quantization.
 
         Args:
             num_colors: Target number of colors (8-256)
             use_global_palette: Use a single palette for all frames (better compression)
+            method: Global palette construction - 'median_cut' (default), 'octree' (faster) or 'kmeans'
+            dither: 'floyd_steinberg', 'ordered' or 'none' (global palette only)
+            workers: Process count for Floyd-Steinberg dithering
 
         Returns:
             List of color-optimized frames
         """
-        optimized = []
-
         if use_global_palette and len(self.frames) > 1:
-            # Create a global palette from all frames
-            # Sample frames to build palette
-            sample_size = min(5, len(self.frames))
-            sample_indices = [int(i * len(self.frames) / sample_size) for i in range(sample_size)]
-            sample_frames = [self.frames[i] for i in sample_indices]
-
-            # Combine sample frames into a single image for palette generation
-            # Flatten each frame to get all pixels, then stack them
-            all_pixels = np.vstack([f.reshape(-1, 3) for f in sample_frames])  # (total_pixels, 3)
-
-            # Create a properly-shaped RGB image from the pixel data
-            # We'll make a roughly square image from all the pixels
-            total_pixels = len(all_pixels)
-            width = min(512, int(np.sqrt(total_pixels)))  # Reasonable width, max 512
-            height = (total_pixels + width - 1) // width  # Ceiling division
-
-            # Pad if necessary to fill the rectangle
-            pixels_needed = width * height
-            if pixels_needed > total_pixels:
-                padding = np.zeros((pixels_needed - total_pixels, 3), dtype=np.uint8)
-                all_pixels = np.vstack([all_pixels, padding])
-
-            # Reshape to proper RGB image format (H, W, 3)
-            img_array = all_pixels[:pixels_needed].reshape(height, width, 3).astype(np.uint8)
-            combined_img = Image.fromarray(img_array, mode='RGB')
-
-            # Generate global palette
-            global_palette = combined_img.quantize(colors=num_colors, method=2)
-
-            # Apply global palette to all frames
-            for frame in self.frames:
-                pil_frame = Image.fromarray(frame)
-                quantized = pil_frame.quantize(palette=global_palette, dither=1)
-                optimized.append(np.array(quantized.convert('RGB')))
-        else:
-            # Use per-frame quantization
-            for frame in self.frames:
-                pil_frame = Image.fromarray(frame)
-                quantized = pil_frame.quantize(colors=num_colors, method=2, dither=1)
-                optimized.append(np.array(quantized.convert('RGB')))
+            indices, palette = self.quantize(num_colors, method=method, dither=dither, workers=workers)
+            return list(palette.to_rgb(indices))
+
+        # Use per-frame quantization
+        optimized = []
+        for frame in self.frames:
+            pil_frame = Image.fromarray(frame)
+            quantized = pil_frame.quantize(colors=num_colors, method=2, dither=1)
+            optimized.append(np.array(quantized.convert('RGB')))
 
         return optimized
 
@@ -128,12 +135,7 @@ class GIFBuilder:
 
         for i in range(1, len(self.frames)):
             # Compare with previous frame
-            prev_frame = np.array(deduplicated[-1], dtype=np.float32)
-            curr_frame = np.array(self.frames[i], dtype=np.float32)
-
-            # Calculate similarity (normalized)
-            diff = np.abs(prev_frame - curr_frame)
-            similarity = 1.0 - (np.mean(diff) / 255.0)
+            similarity = _frame_similarity(deduplicated[-1], self.frames[i])
 
             # Keep frame if sufficiently different
             # High threshold (0.995) means only remove truly identical frames
@@ -146,7 +148,9 @@ class GIFBuilder:
         return removed_count
 
     def save(self, output_path: str | Path, num_colors: int = 128,
-             optimize_for_emoji: bool = False, remove_duplicates: bool = True) -> dict:
+             optimize_for_emoji: bool = False, remove_duplicates: bool = True,
+             palette_method: str = 'median_cut', dither: str = 'floyd_steinberg',
+             workers: Optional[int] = None, delta_encode: bool = True) -> dict:
         """
         Save frames as optimized GIF for Slack.
 
@@ -155,6 +159,11 @@ class GIFBuilder:
             num_colors: Number of colors to use (fewer = smaller file)
             optimize_for_emoji: If True, optimize for <64KB emoji size
             remove_duplicates: Remove duplicate consecutive frames
+            palette_method: 'median_cut' (default), 'octree' (faster) or 'kmeans'
+            dither: 'floyd_steinberg', 'ordered' (fast) or 'none'
+            workers: Process count for Floyd-Steinberg dithering
+            delta_encode: Store only the changed region of each frame, with
+                unchanged pixels transparent and identical frames merged
 
         Returns:
             Dictionary with file info (path, size, dimensions, frame_count)
@@ -193,19 +202,161 @@ class GIFBuilder:
                 keep_every = max(1, len(self.frames) // 12)
                 self.frames = [self.frames[i] for i in range(0, len(self.frames), keep_every)]
 
-        # Optimize colors with global palette
-        optimized_frames = self.optimize_colors(num_colors, use_global_palette=True)
+        # Optimize colors with global palette, keeping frames indexed
+        indices, palette = self.quantize(num_colors, method=palette_method,
+                                         dither=dither, workers=workers)
+
+        # Save GIF (infinite loop)
+        with StreamingGIFWriter(output_path, self.width, self.height, palette.to_image(),
+                                fps=self.fps, loop=0, crop_unchanged=delta_encode,
+                                transparent_unchanged=delta_encode,
+                                merge_duplicates=delta_encode) as writer:
+            for frame in indices:
+                writer.write_frame(frame)
+
+        return self._report(output_path, writer, num_colors, optimize_for_emoji)
+
+    def save_stream(self, output_path: str | Path,
+                    frames: Iterable[np.ndarray | Image.Image] | Callable[[], Iterable[np.ndarray | Image.Image]],
+                    num_colors: int = 128, optimize_for_emoji: bool = False,
+                    remove_duplicates: bool = True, keep_every: int = 1,
+                    warmup_frames: int = 4, sample_pixels: int = 65536,
+                    palette_method: str = 'median_cut', dither: str = 'floyd_steinberg',
+                    delta_encode: bool = True) -> dict:
+        """
+        Save frames as a GIF without holding the whole animation in memory.
+
+        Frames are normalized, quantized against a global palette and written
+        as they arrive, so memory stays at a few frames regardless of length.
+        Frames already added with add_frame() are not used.
+
+        Args:
+            output_path: Where to save the GIF
+            frames: Iterable of frames (e.g. a generator), or a zero-argument
+                callable returning one. A callable enables two-pass mode: the
+                first pass reservoir-samples pixels from every frame to build
+                the palette, the second pass encodes. A plain iterable builds
+                the palette from its first ``warmup_frames`` frames.
+            num_colors: Number of colors to use (fewer = smaller file)
+            optimize_for_emoji: Resize to 128x128 and cap colors at 48. Frames
+                are not decimated automatically since the count is unknown;
+                use keep_every instead.
+            remove_duplicates: Skip frames nearly identical to the previous one
+            keep_every: Keep every nth frame (1 = keep all)
+            warmup_frames: Frames buffered for the palette in single-pass mode
+            sample_pixels: Reservoir size for palette sampling
+            palette_method: 'median_cut' (default), 'octree' (faster) or 'kmeans'
+            dither: 'floyd_steinberg', 'ordered' (fast) or 'none'
+            delta_encode: Store only the changed region of each frame, with
+                unchanged pixels transparent and identical frames merged
+
+        Returns:
+            Dictionary with file info (path, size, dimensions, frame_count)
+        """
+        output_path = Path(output_path)
+
+        if optimize_for_emoji:
+            if self.width > 128 or self.height > 128:
+                print(f"  Resizing from {self.width}x{self.height} to 128x128 for emoji")
+                self.width = 128
+                self.height = 128
+            num_colors = min(num_colors, 48)  # More aggressive color limit for emoji
+
+        def decimate(source):
+            return itertools.islice(source, 0, None, max(1, keep_every))
 
-        # Calculate frame duration in milliseconds
-        frame_duration = 1000 / self.fps
+        # Pass 1: sample pixels for the global palette
+        sampler = ReservoirSampler(capacity=sample_pixels)
+        if callable(frames):
+            for frame in decimate(frames()):
+                sampler.add(self._normalize_frame(frame))
+            stream = decimate(frames())
+            head = []
+        else:
+            stream = decimate(frames)
+            head = [self._normalize_frame(f) for f in itertools.islice(stream, warmup_frames)]
+            for frame in head:
+                sampler.add(frame)
+
+        if sampler.seen == 0:
+            raise ValueError("No frames to save.")
+        palette = build_palette(None, num_colors, method=palette_method, pixels=sampler.pixels)
+
+        # Pass 2: quantize and write frame by frame
+        removed = 0
+        prev_frame = None
+        with StreamingGIFWriter(output_path, self.width, self.height, palette.to_image(),
+                                fps=self.fps, dither=dither == 'floyd_steinberg',
+                                crop_unchanged=delta_encode, transparent_unchanged=delta_encode,
+                                merge_duplicates=delta_encode) as writer:
+            for frame in itertools.chain(head, (self._normalize_frame(f) for f in stream)):
+                if (remove_duplicates and prev_frame is not None
+                        and _frame_similarity(prev_frame, frame) >= 0.98):
+                    removed += 1
+                    continue
+                prev_frame = frame
+                if dither != 'floyd_steinberg':
+                    frame = palette.map(frame, dither=dither)
+                writer.write_frame(frame)
+
+        if removed > 0:
+            print(f"  Removed {removed} duplicate frames")
+
+        return self._report(output_path, writer, num_colors, optimize_for_emoji)
+
+    def save_for_slack(self, output_path: str | Path, target: str | int = 'emoji',
+                       max_colors: int = 256, min_frames: int = 6,
+                       palette_method: str = 'median_cut') -> dict:
+        """
+        Save with the highest-quality settings that fit a Slack size limit.
+
+        Searches colors, frame decimation, dimensions and dithering by
+        encoding candidates in memory (see core.size_optimizer) instead of
+        applying fixed emoji heuristics.
+
+        Args:
+            output_path: Where to save the GIF
+            target: 'emoji' (64 KB), 'message' (2 MB) or a byte budget
+            max_colors: Upper bound on palette size
+            min_frames: Never decimate below this many frames
+            palette_method: 'median_cut' (default), 'octree' (faster) or 'kmeans'
+
+        Returns:
+            Dictionary with file info, plus 'settings' chosen by the search and
+            'search' (per-attempt settings, sizes and timings)
+        """
+        if not self.frames:
+            raise ValueError("No frames to save. Add frames with add_frame() first.")
+
+        output_path = Path(output_path)
+        frames = self.frames
+        if target == 'emoji' and (self.width > 128 or self.height > 128):
+            print(f"  Resizing from {self.width}x{self.height} to 128x128 for emoji")
+            frames = [np.array(Image.fromarray(f).resize((128, 128), Image.Resampling.LANCZOS))
+                      for f in frames]
+
+        optimizer = SizeOptimizer(frames, fps=self.fps, target=target, max_colors=max_colors,
+                                  min_frames=min_frames, palette_method=palette_method)
+        result = optimizer.optimize()
+        settings = result['settings']
+        print(f"  Searched {len(result['attempts'])} settings in {result['seconds']:.1f}s: "
+              f"{settings['width']}x{settings['height']}, {settings['colors']} colors, "
+              f"every {settings['keep_every']} frame(s), {settings['dither']} dither")
+
+        writer = optimizer.encode(settings, output=output_path)
+        info = self._report(output_path, writer, settings['colors'], target == 'emoji')
+        info['settings'] = settings
+        info['search'] = result
+        if not result['fits']:
+            print(f"\n⚠️  WARNING: No setting reached {result['target_bytes'] / 1024:.0f} KB; "
+                  "saved the smallest one found")
+        return info
 
-        # Save GIF
-        imageio.imwrite(
-            output_path,
-            optimized_frames,
-            duration=frame_duration,
-            loop=0  # Infinite loop
-        )
+    def _report(self, output_path: Path, writer: StreamingGIFWriter, num_colors: int,
+                optimize_for_emoji: bool) -> dict:
+        """Collect and print info about a saved GIF."""
+        # Identical frames merged into longer delays still count as frames
+        frame_count = writer.frame_count + writer.merged_count
 
         # Get file info
         file_size_kb = output_path.stat().st_size / 1024
@@ -215,10 +366,11 @@ class GIFBuilder:
             'path': str(output_path),
             'size_kb': file_size_kb,
             'size_mb': file_size_mb,
-            'dimensions': f'{self.width}x{self.height}',
-            'frame_count': len(optimized_frames),
-            'fps': self.fps,
-            'duration_seconds': len(optimized_frames) / self.fps,
+            'dimensions': f'{writer.width}x{writer.height}',
+            'frame_count': frame_count,
+            'encoded_frames': writer.frame_count,
+            'fps': writer.fps,
+            'duration_seconds': writer.duration_ms / 1000,
             'colors': num_colors
         }
 
@@ -226,8 +378,10 @@ class GIFBuilder:
         print(f"\n✓ GIF created successfully!")
         print(f"  Path: {output_path}")
         print(f"  Size: {file_size_kb:.1f} KB ({file_size_mb:.2f} MB)")
-        print(f"  Dimensions: {self.width}x{self.height}")
-        print(f"  Frames: {len(optimized_frames)} @ {self.fps} fps")
+        print(f"  Dimensions: {writer.width}x{writer.height}")
+        print(f"  Frames: {frame_count} @ {writer.fps:g} fps")
+        if writer.merged_count:
+            print(f"  Encoded as {writer.frame_count} frames (identical frames merged)")
         print(f"  Duration: {info['duration_seconds']:.1f}s")
         print(f"  Colors: {num_colors}")
 
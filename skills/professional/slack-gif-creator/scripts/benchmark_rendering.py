@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark serial vs parallel frame rendering for every animation template.
+
+Usage:
+    python scripts/benchmark_rendering.py
+    python scripts/benchmark_rendering.py --frames 60 --workers 8 --repeat 3
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from core.frame_scheduler import parallel_available
+from templates.bounce import create_bounce_animation
+from templates.explode import create_explode_animation
+from templates.fade import create_fade_animation
+from templates.flip import create_flip_animation
+from templates.kaleidoscope import create_kaleidoscope_animation
+from templates.morph import create_morph_animation
+from templates.move import create_move_animation
+from templates.pulse import create_pulse_animation
+from templates.shake import create_shake_animation
+from templates.slide import create_slide_animation
+from templates.spin import create_spin_animation
+from templates.wiggle import create_wiggle_animation
+from templates.zoom import create_zoom_animation
+
+
+EMOJI_A = {'emoji': '😊', 'size': 100}
+EMOJI_B = {'emoji': '😂', 'size': 100}
+
+TEMPLATES = {
+    'bounce': (create_bounce_animation, {}),
+    'explode': (create_explode_animation, {}),
+    'fade': (create_fade_animation, {}),
+    'flip': (create_flip_animation, {'object1_data': EMOJI_A, 'object2_data': EMOJI_B}),
+    'kaleidoscope': (create_kaleidoscope_animation, {}),
+    'morph': (create_morph_animation, {'object1_data': EMOJI_A, 'object2_data': EMOJI_B}),
+    'move': (create_move_animation, {}),
+    'pulse': (create_pulse_animation, {}),
+    'shake': (create_shake_animation, {}),
+    'slide': (create_slide_animation, {}),
+    'spin': (create_spin_animation, {}),
+    'wiggle': (create_wiggle_animation, {}),
+    'zoom': (create_zoom_animation, {}),
+}
+
+
+def time_render(create, kwargs: dict, num_frames: int, workers, repeat: int) -> tuple[float, list]:
+    """Best-of-N wall time for one template; returns (seconds, frames)."""
+    best = float('inf')
+    frames = []
+    for _ in range(repeat):
+        random.seed(0)  # Same random layout for serial and parallel runs
+        start = time.perf_counter()
+        frames = create(num_frames=num_frames, workers=workers, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark template frame rendering')
+    parser.add_argument('--frames', type=int, default=30, help='Frames per animation')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes for the parallel run')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is kept)')
+    parser.add_argument('--json', action='store_true', help='Output JSON')
+    args = parser.parse_args()
+
+    if not parallel_available():
+        print("Warning: fork start method unavailable; parallel runs fall back to serial",
+              file=sys.stderr)
+
+    results = []
+    for name, (create, kwargs) in TEMPLATES.items():
+        try:
+            serial, serial_frames = time_render(create, kwargs, args.frames, None, args.repeat)
+            parallel, parallel_frames = time_render(create, kwargs, args.frames, args.workers, args.repeat)
+        except Exception as e:
+            results.append({'template': name, 'error': str(e)})
+            continue
+
+        identical = len(serial_frames) == len(parallel_frames) and all(
+            np.array_equal(np.asarray(a), np.asarray(b))
+            for a, b in zip(serial_frames, parallel_frames)
+        )
+        results.append({
+            'template': name,
+            'serial_seconds': serial,
+            'parallel_seconds': parallel,
+            'speedup': serial / parallel if parallel > 0 else 0.0,
+            'identical': identical,
+        })
+
+    if args.json:
+        print(json.dumps({'frames': args.frames, 'workers': args.workers, 'results': results}, indent=2))
+        return
+
+    print(f"{args.frames} frames, {args.workers} workers (best of {args.repeat})\n")
+    print(f"{'template':<14}{'serial':>10}{'parallel':>10}{'speedup':>9}  identical")
+    for row in results:
+        if 'error' in row:
+            print(f"{row['template']:<14}  skipped: {row['error']}")
+            continue
+        print(f"{row['template']:<14}{row['serial_seconds']:>9.3f}s{row['parallel_seconds']:>9.3f}s"
+              f"{row['speedup']:>8.2f}x  {'yes' if row['identical'] else 'NO'}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,16 +4,29 @@ Spec Validator - Checks specification completeness by stage
 
 Usage:
     validate_spec.py <spec-dir> [--stage specify|plan|tasks|all]
+    validate_spec.py --batch [root ...] [--stage ...] [--json] [--jobs N] [--no-cache] [--cache-path FILE]
 
 Examples:
     validate_spec.py specs/001-user-auth --stage specify
     validate_spec.py specs/002-chat --stage plan
     validate_spec.py specs/003-payments --stage all
+    validate_spec.py --batch                   # every specs/NNN-* directory
+    validate_spec.py --batch . --json          # all NNN-* spec dirs in a monorepo
+
+Batch mode validates spec directories in a process pool and caches each
+result per stage in the user cache dir (never inside the repo), keyed by the
+size and mtime of every file in the directory; unchanged directories are not
+re-validated.
 """
 
 import argparse
+import functools
+import hashlib
+import json
+import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 STAGES = ("specify", "plan", "tasks", "all")
@@ -24,6 +37,12 @@ REQUIRED_SPEC_SECTIONS = [
     "Success Criteria",
 ]
 
+CLARIFICATION_MARKER = "[NEEDS CLARIFICATION"
+
+# Spec directories are named NNN-feature-name (see init_spec_dir.py)
+SPEC_DIR_PATTERN = re.compile(r"^\d{3}-")
+SKIP_DIRS = {".git", "node_modules", "__pycache__", ".venv", "venv"}
+
 
 def check_file_exists(path: Path, label: str, errors: list[str]) -> bool:
     """Check that a file exists and is non-empty."""
@@ -36,16 +55,37 @@ def check_file_exists(path: Path, label: str, errors: list[str]) -> bool:
     return True
 
 
-def check_sections(content: str, sections: list[str], filename: str, errors: list[str]) -> None:
+@functools.lru_cache(maxsize=None)
+def _terms_pattern(terms: tuple[str, ...]) -> re.Pattern:
+    # Longest first, so a term that prefixes another cannot shadow it
+    ordered = sorted({t.lower() for t in terms}, key=len, reverse=True)
+    return re.compile("|".join(re.escape(t) for t in ordered))
+
+
+def scan_terms(content: str, terms: list[str]) -> dict[str, int]:
+    """
+    Case-insensitive occurrence counts of every term, from one lowercase
+    pass and one regex scan. Terms must not overlap one another in the text.
+    """
+    found: dict[str, int] = {}
+    for match in _terms_pattern(tuple(terms)).finditer(content.lower()):
+        found[match.group()] = found.get(match.group(), 0) + 1
+    return {term: found.get(term.lower(), 0) for term in terms}
+
+
+def check_sections(content: str, sections: list[str], filename: str, errors: list[str],
+                   counts: dict[str, int] | None = None) -> None:
     """Verify that expected markdown sections are present."""
+    if counts is None:
+        counts = scan_terms(content, sections)
     for section in sections:
-        if section.lower() not in content.lower():
+        if not counts[section]:
             errors.append(f"{filename}: missing section '{section}'")
 
 
 def count_markers(content: str, marker: str) -> int:
     """Count occurrences of a marker string."""
-    return content.lower().count(marker.lower())
+    return scan_terms(content, [marker])[marker]
 
 
 def validate_specify(spec_dir: Path) -> tuple[list[str], list[str]]:
@@ -58,12 +98,13 @@ def validate_specify(spec_dir: Path) -> tuple[list[str], list[str]]:
         return errors, warnings
 
     content = spec_md.read_text()
+    counts = scan_terms(content, REQUIRED_SPEC_SECTIONS + [CLARIFICATION_MARKER])
 
     # Required sections
-    check_sections(content, REQUIRED_SPEC_SECTIONS, "spec.md", errors)
+    check_sections(content, REQUIRED_SPEC_SECTIONS, "spec.md", errors, counts)
 
     # Clarification markers
-    clarification_count = count_markers(content, "[NEEDS CLARIFICATION")
+    clarification_count = counts[CLARIFICATION_MARKER]
     if clarification_count > 3:
         warnings.append(
             f"spec.md: {clarification_count} [NEEDS CLARIFICATION] markers (recommended max: 3)"
@@ -136,23 +177,25 @@ def validate_tasks(spec_dir: Path) -> tuple[list[str], list[str]]:
     return errors, warnings
 
 
+VALIDATORS = {
+    "specify": validate_specify,
+    "plan": validate_plan,
+    "tasks": validate_tasks,
+}
+
+
+def validate_stages(spec_dir: Path, stage: str) -> dict[str, tuple[list[str], list[str]]]:
+    """Errors and warnings for each stage that was run."""
+    stages_to_run = STAGES[:-1] if stage == "all" else [stage]
+    return {s: VALIDATORS[s](spec_dir) for s in stages_to_run}
+
+
 def run_validation(spec_dir: Path, stage: str) -> int:
     """Run validation for the specified stage(s). Returns exit code."""
     all_errors: list[str] = []
     all_warnings: list[str] = []
 
-    stages_to_run = STAGES[:-1] if stage == "all" else [stage]
-
-    for s in stages_to_run:
-        if s == "specify":
-            errs, warns = validate_specify(spec_dir)
-        elif s == "plan":
-            errs, warns = validate_plan(spec_dir)
-        elif s == "tasks":
-            errs, warns = validate_tasks(spec_dir)
-        else:
-            continue
-
+    for s, (errs, warns) in validate_stages(spec_dir, stage).items():
         if errs or warns:
             print(f"\n[{s}]")
         for e in errs:
@@ -175,20 +218,188 @@ def run_validation(spec_dir: Path, stage: str) -> int:
         return 0
 
 
+def find_spec_dirs(roots: list[Path]) -> list[Path]:
+    """NNN-* spec directories under the roots (a root may itself be one), sorted."""
+    found: set[Path] = set()
+    for root in roots:
+        root = root.resolve()
+        if SPEC_DIR_PATTERN.match(root.name):
+            found.add(root)
+            continue
+        for dirpath, dirnames, _ in os.walk(root):
+            keep = []
+            for name in dirnames:
+                if SPEC_DIR_PATTERN.match(name):
+                    found.add(Path(dirpath) / name)
+                elif name not in SKIP_DIRS and not name.startswith("."):
+                    keep.append(name)
+            dirnames[:] = keep  # spec dirs are not searched for nested spec dirs
+    return sorted(found)
+
+
+def dir_fingerprint(spec_dir: Path) -> str:
+    """Hash of the path, size and mtime of everything in the directory."""
+    digest = hashlib.sha256()
+    for dirpath, dirnames, filenames in os.walk(spec_dir):
+        dirnames.sort()
+        for name in sorted(filenames) + dirnames:
+            path = os.path.join(dirpath, name)
+            st = os.stat(path)
+            rel = os.path.relpath(path, spec_dir)
+            digest.update(f"{rel}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def rules_version() -> str:
+    """Hash of this script, so edited validation rules invalidate the cache."""
+    return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+
+
+def default_cache_path(root: Path) -> Path:
+    """Per-root cache file in the user cache dir, so nothing is written into the spec tree."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(Path.home(), ".cache")
+    key = hashlib.sha256(str(root.resolve()).encode("utf-8")).hexdigest()[:16]
+    return Path(cache_home) / "speckit" / f"validate-spec-{key}.json"
+
+
+def load_cache(path: Path) -> dict:
+    """Cached entries by spec dir path, then by stage."""
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("rules") != rules_version():
+        return {}
+    return cache.get("specs", {})
+
+
+def save_cache(path: Path, entries: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump({"rules": rules_version(), "specs": entries}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def validate_entry(spec_dir: Path, stage: str) -> dict:
+    """Batch worker: fingerprint and validate one spec directory."""
+    fingerprint = dir_fingerprint(spec_dir)
+    stages = validate_stages(spec_dir, stage)
+    return {
+        "fingerprint": fingerprint,
+        "stage": stage,
+        "errors": [f"[{s}] {e}" for s, (errs, _) in stages.items() for e in errs],
+        "warnings": [f"[{s}] {w}" for s, (_, warns) in stages.items() for w in warns],
+    }
+
+
+def run_batch(roots: list[Path], stage: str, jobs: int | None = None, use_cache: bool = True,
+              cache_path: Path | None = None) -> list[dict]:
+    """
+    Validate every spec directory under the roots.
+
+    The cache defaults to default_cache_path() of the first root (of its
+    parent when that root is a spec dir). Results for each stage are kept
+    side by side, and dirs that no longer exist are dropped when it is
+    saved. Returns one result per directory with path, status ("pass",
+    "warn" or "fail"), errors, warnings and cached.
+    """
+    spec_dirs = find_spec_dirs(roots)
+    if cache_path is None:
+        root = roots[0].resolve()
+        cache_path = default_cache_path(root.parent if root in spec_dirs else root)
+    cache = load_cache(cache_path) if use_cache else {}
+
+    entries: dict[str, dict] = {}
+    cached: set[str] = set()
+    pending: list[Path] = []
+    for spec_dir in spec_dirs:
+        key = str(spec_dir)
+        hit = cache.get(key, {}).get(stage)
+        if hit and hit["fingerprint"] == dir_fingerprint(spec_dir):
+            entries[key] = hit
+            cached.add(key)
+        else:
+            pending.append(spec_dir)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            for spec_dir, entry in zip(pending, pool.map(validate_entry, pending, [stage] * len(pending), chunksize=8)):
+                entries[str(spec_dir)] = entry
+
+    if use_cache:
+        for key, entry in entries.items():
+            cache[key] = {**cache.get(key, {}), stage: entry}
+        save_cache(cache_path, {key: stages for key, stages in cache.items() if os.path.isdir(key)})
+
+    results = []
+    for spec_dir in spec_dirs:
+        entry = entries[str(spec_dir)]
+        status = "fail" if entry["errors"] else "warn" if entry["warnings"] else "pass"
+        results.append({
+            "path": os.path.relpath(spec_dir),
+            "status": status,
+            "errors": entry["errors"],
+            "warnings": entry["warnings"],
+            "cached": str(spec_dir) in cached,
+        })
+    return results
+
+
+def print_batch(results: list[dict], stage: str, as_json: bool) -> None:
+    totals = {status: sum(1 for r in results if r["status"] == status) for status in ("pass", "warn", "fail")}
+    summary = {"stage": stage, "specs": len(results), **totals,
+               "cached": sum(1 for r in results if r["cached"])}
+    if as_json:
+        print(json.dumps({"summary": summary, "results": results}, indent=2))
+        return
+    for r in results:
+        print(f"{r['status'].upper():<5} {r['path']}{'  (cached)' if r['cached'] else ''}")
+        for e in r["errors"]:
+            print(f"  ERROR: {e}")
+        for w in r["warnings"]:
+            print(f"  WARN:  {w}")
+    print()
+    print(f"{summary['specs']} spec dir(s): {totals['pass']} passed, {totals['warn']} with warnings, "
+          f"{totals['fail']} failed ({summary['cached']} from cache)")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Validate spec directory completeness by stage."
     )
-    parser.add_argument("spec_dir", help="Path to feature spec directory")
+    parser.add_argument("spec_dir", nargs="*", help="Path to feature spec directory (with --batch: roots to search, default ./specs)")
     parser.add_argument(
         "--stage",
         choices=STAGES,
         default="all",
         help="Validation stage (default: all)",
     )
+    parser.add_argument("--batch", action="store_true", help="Validate every NNN-* spec directory under the given roots")
+    parser.add_argument("--json", action="store_true", help="Batch mode: print a machine-readable summary")
+    parser.add_argument("-j", "--jobs", type=int, help="Batch mode: worker processes (default: one per CPU)")
+    parser.add_argument("--no-cache", action="store_true", help="Batch mode: ignore and do not write the result cache")
+    parser.add_argument("--cache-path", type=Path,
+                        help="Batch mode: result cache file (default: under $XDG_CACHE_HOME/speckit)")
     args = parser.parse_args()
 
-    spec_dir = Path(args.spec_dir).resolve()
+    if args.batch:
+        roots = [Path(p) for p in args.spec_dir] or [Path("specs")]
+        missing = [str(root) for root in roots if not root.is_dir()]
+        if missing:
+            print(f"Error: not a directory: {', '.join(missing)}")
+            sys.exit(1)
+        results = run_batch(roots, args.stage, jobs=args.jobs, use_cache=not args.no_cache,
+                            cache_path=args.cache_path)
+        print_batch(results, args.stage, args.json)
+        sys.exit(1 if any(r["status"] == "fail" for r in results) else 0)
+
+    if len(args.spec_dir) != 1:
+        parser.error("expected one spec directory (use --batch for several)")
+
+    spec_dir = Path(args.spec_dir[0]).resolve()
     if not spec_dir.is_dir():
         print(f"Error: not a directory: {spec_dir}")
         sys.exit(1)